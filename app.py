@@ -1,15 +1,36 @@
 import streamlit as st
-import requests
 import json
 import re
-import copy
+import os
+import hashlib
+import threading
+import time
 import traceback
 import base64
+from urllib.parse import quote
 from dotenv import load_dotenv
+from requests import RequestException, Timeout
 
 # Import the ontology builder and profile generator
 from drug_ontology import DrugOntologyBuilder, DrugAssetProfileGenerator, generate_asset_markdown, generate_enhanced_asset_markdown
 
+# Import the data access layer
+import http_client
+from augmentation_cache import augmentation_key, get_augmentation_cache
+from claude_stream import ClaudeStreamError, StreamDeadlineExceededError, read_message_stream
+from circuit_breaker import OPEN, HALF_OPEN, all_circuit_breakers
+from deadline import Deadline, current_deadline, deadline_scope
+from fetch_engine import FetchEngine, SourceEmptyError, SourceProgress, SourceUnavailableError
+from http_client import DeadlineExceededError, RateLimitedError
+from label_warehouse import get_label_warehouse
+from literature_store import get_literature_store, parse_pubmed_xml
+from model_router import get_model_router
+from pubchem_resolver import get_pubchem_resolver, PubChemLookupError
+from singleflight import get_flight_group
+from synonym_index import canonical_drug_name, drug_synonyms, get_synonym_index
+from trials_snapshot import get_trials_snapshot, summarize_study
+from typeahead import get_typeahead, warm_typeahead
+
 # Custom function to add the sidebar logo and navigation
 def add_sidebar_and_styling():
     # Add custom CSS for styling the sidebar and overall app appearance
@@ -208,6 +229,122 @@ def add_sidebar_and_styling():
     ''', unsafe_allow_html=True)
 
 
+def render_source_health():
+    """Show the circuit breaker state of each data source in the sidebar."""
+    breakers = all_circuit_breakers()
+    if not breakers:
+        return
+
+    st.sidebar.markdown("**Data Source Health**")
+    for breaker in breakers:
+        if breaker.state == OPEN:
+            st.sidebar.markdown(f"🔴 {breaker.name}: down, retrying in {breaker.retry_in():.0f}s")
+        elif breaker.state == HALF_OPEN:
+            st.sidebar.markdown(f"🟡 {breaker.name}: probing")
+        else:
+            st.sidebar.markdown(f"🟢 {breaker.name}: available")
+
+
+def render_progressive_profile(placeholder, drug_name, drug_data, landed_sources):
+    """
+    Render the profile sections whose sources have already landed into a placeholder.
+    Called repeatedly while the fetch is running, so each call replaces the previous preview.
+    """
+    profile = DrugAssetProfileGenerator().generate_asset_profile(drug_name, drug_data, partial=True)
+    markdown_text = f"# {profile['Asset Profile']} Asset Profile\n\n"
+
+    # Identifiers and approval status come from FDA
+    if "FDA" in landed_sources:
+        identifiers = profile["Identifiers"]
+        markdown_text += "## Identifiers\n\n"
+        for label in ["Brand Name", "Generic Name", "Approval Date", "Manufacturer", "BLA/NDA Number"]:
+            markdown_text += f"**{label}:** {identifiers[label]}  \n"
+        if "PubChem" in landed_sources:
+            markdown_text += f"**Chemical Formula:** {identifiers['Chemical Formula']}  \n"
+        markdown_text += "\n"
+
+        status = profile["Approval Status"]
+        markdown_text += "## Approval Status\n\n"
+        markdown_text += f"**Status:** {status['Status']}  \n"
+        markdown_text += f"**Drug Class:** {status['Drug Class']}  \n"
+        markdown_text += f"**Type:** {status['Type']}  \n\n"
+
+    # Indications and mechanism come from the DailyMed label
+    if "DailyMed" in landed_sources:
+        markdown_text += "## Indications & Usage\n\n"
+        for indication in profile["Indications & Usage"]:
+            markdown_text += f"- {indication}\n"
+        markdown_text += "\n"
+        markdown_text += "## Mechanism of Action\n\n"
+        markdown_text += f"{profile['Mechanism of Action']}\n\n"
+
+    # Clinical evidence comes from ClinicalTrials.gov
+    if "ClinicalTrials.gov" in landed_sources:
+        markdown_text += "## Clinical Evidence Summary\n\n"
+        if drug_data.get("clinical_trials_total"):
+            markdown_text += f"{drug_data['clinical_trials_total']} registered trials\n\n"
+        for evidence in profile["Clinical Evidence Summary"]:
+            markdown_text += f"- **{evidence['trial_name']}** ({evidence['phase']}): {evidence['population']}\n"
+        markdown_text += "\n"
+
+    # Literature comes from PubMed
+    if "PubMed" in landed_sources:
+        articles = [entry for entry in drug_data.get("pubmed", []) if entry.get("source") == "PubMed"]
+        markdown_text += "## Literature\n\n"
+        for article in articles:
+            fields = article.get("fields")
+            if fields:
+                markdown_text += f"- PMID {fields['pmid']} ({fields['year']}): {fields['title']}\n"
+            else:
+                markdown_text += f"- PMID {article.get('pmid', '')}: {article.get('text', '')[:150]}...\n"
+        markdown_text += "\n"
+
+    # Note which sources are still outstanding
+    selected_sources = st.session_state.get('data_sources', ALL_DATA_SOURCES)
+    waiting_for = [name for name in ["FDA", "DailyMed", "PubChem", "ClinicalTrials.gov", "PubMed"]
+                   if name in selected_sources and name not in landed_sources]
+    if waiting_for:
+        markdown_text += f"_Waiting for: {', '.join(waiting_for)}..._\n"
+    elif "Sorcero AI" in selected_sources and "Sorcero AI" not in landed_sources:
+        markdown_text += "_All sources received; finalizing profile..._\n"
+
+    placeholder.markdown(markdown_text, unsafe_allow_html=True)
+
+
+def correct_drug_name(drug_name):
+    """
+    Return the drug name to look up, replacing a misspelled name with its closest known name.
+    Names are only replaced when a synonym index is loaded, so the input is known to be unindexed;
+    the built-in vocabulary alone is too small, and its closest match is only offered as a suggestion.
+    Unknown names without a close match are kept, with completions offered as hints.
+    """
+    try:
+        engine = get_typeahead()
+        if engine.is_known(drug_name):
+            return drug_name
+
+        corrected = engine.correct(drug_name)
+        if corrected and get_synonym_index() is not None:
+            st.info(f"Showing results for **{corrected}** instead of \"{drug_name}\".")
+            return corrected
+        if corrected:
+            st.info(f"Showing results for \"{drug_name}\". Did you mean **{corrected}**?")
+            return drug_name
+
+        # Offer canonical names so indexed misspellings are never suggested
+        completions = []
+        for completion in engine.complete(drug_name, limit=10):
+            canonical = canonical_drug_name(completion)
+            if canonical not in completions:
+                completions.append(canonical)
+        completions = completions[:5]
+        if completions:
+            st.info(f"\"{drug_name}\" is not a known drug name. Did you mean: {', '.join(completions)}?")
+    except Exception as e:
+        print(f"Error correcting drug name: {str(e)}")
+    return drug_name
+
+
 # Function to get base64 encoded string for an image
 def get_base64_of_image(image_path):
     """Get base64 encoded string for an image."""
@@ -231,10 +368,229 @@ def set_page_config():
 # Load environment variables
 load_dotenv()
 
+# Build the drug name typeahead in the background so the first lookup does not wait for it
+warm_typeahead()
+
+# Data sources the user can choose to query, in display order
+ALL_DATA_SOURCES = ["FDA", "DailyMed", "ClinicalTrials.gov", "PubMed", "PubChem", "Sorcero AI"]
+
+# Shared engines used to query independent upstream sources concurrently; the
+# top-level sources are guarded by circuit breakers so known-down upstreams are skipped
+_fetch_engine = FetchEngine(max_workers=8, circuit_breakers=True)
+_openfda_engine = FetchEngine(max_workers=3)
+
+# Total time budget for a profile fetch, and the share of it the upstream sources may use
+PROFILE_BUDGET_SECONDS = float(os.getenv("PROFILE_BUDGET_SECONDS", "90"))
+SOURCE_BUDGET_SECONDS = float(os.getenv("SOURCE_BUDGET_SECONDS", "15"))
+
+# Fields Sorcero AI can supply, in schema order, with their schema lines, prompt guidance, output token allowance,
+# the data source whose gap they fill and how that gap is described to the user
+AUGMENTATION_FIELDS = {
+    "fda_data": {
+        "schema": """  "fda_data": {
+    "brand_name": "string",
+    "approval_date": "string (format: YYYY-MM-DD)",
+    "manufacturer": "string",
+    "bla_nda_number": "string",
+    "regulatory_status": "string"
+  }""",
+        "instruction": "",
+        "max_tokens": 200,
+        "source": "FDA",
+        "label": "FDA approval information"
+    },
+    "indications": {
+        "schema": '    "indications": "string - detailed list of all approved indications"',
+        "instruction": "",
+        "max_tokens": 500,
+        "source": "DailyMed",
+        "label": "Indications"
+    },
+    "mechanism_of_action": {
+        "schema": '    "mechanism_of_action": "string - detailed molecular explanation with receptor targets"',
+        "instruction": "For the mechanism of action, include molecular details about receptor binding, enzyme inhibition, or other relevant processes.\n",
+        "max_tokens": 400,
+        "source": "DailyMed",
+        "label": "Mechanism of action"
+    },
+    "chemical_data": {
+        "schema": """  "chemical_data": {
+    "formula": "string - chemical formula using standard notation",
+    "structure_type": "string - chemical structure classification",
+    "chemical_class": "string - broader chemical classification"
+  }""",
+        "instruction": "For chemical formula, use standard chemical notation.\n",
+        "max_tokens": 150,
+        "source": "PubChem",
+        "label": "Chemical data"
+    },
+    "clinical_trials": {
+        "schema": """  "clinical_trials": [
+    {
+      "trial_id": "string (NCT number if available)",
+      "phase": "string (e.g., Phase 3)",
+      "population": "string (patient population studied)",
+      "results": "string (key efficacy findings with metrics)",
+      "safety": "string (adverse events and percentages)"
+    }
+  ]""",
+        "instruction": "For clinical trials, focus on pivotal trials that led to approval when available.\n",
+        "max_tokens": 2000,
+        "source": "ClinicalTrials.gov",
+        "label": "Clinical trials"
+    },
+}
+
+# Output tokens allowed for the JSON structure itself, and the overall cap
+AUGMENTATION_BASE_TOKENS = 100
+AUGMENTATION_MAX_TOKENS = 4000
+
+# Sections of the profile requested from Claude as separate, concurrent requests
+AUGMENTATION_SECTIONS = {
+    "regulatory": ["fda_data"],
+    "label": ["indications", "mechanism_of_action"],
+    "chemistry": ["chemical_data"],
+    "trials": ["clinical_trials"],
+}
+
+# Claude requests in flight at once, shared by every session in the process
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4"))
+_claude_engine = FetchEngine(max_workers=len(AUGMENTATION_SECTIONS))
+_claude_slots = threading.BoundedSemaphore(CLAUDE_MAX_CONCURRENCY)
+
+
+class ClaudeSlotTimeoutError(DeadlineExceededError):
+    """Raised when no Claude request slot frees up before the current deadline."""
+
+# Seconds an interactive user waits for any one section; models expected to be slower are passed over
+AUGMENT_LATENCY_BUDGET = float(os.getenv("AUGMENT_LATENCY_BUDGET", "30"))
+
+# Messages API base URL (overridable to point at a local stub) and whether answers are streamed
+ANTHROPIC_API_URL = os.getenv("ANTHROPIC_API_URL", "https://api.anthropic.com").rstrip("/")
+ANTHROPIC_STREAMING = os.getenv("ANTHROPIC_STREAMING", "1") not in ("0", "false", "False")
+
+# Skip Claude augmentation when less than this much of the budget is left
+MIN_AUGMENT_SECONDS = float(os.getenv("MIN_AUGMENT_SECONDS", "10"))
+
 
 # Function to fetch drug data from external APIs
-def fetch_drug_data(drug_name):
-    """Fetch comprehensive data for a drug from various APIs with enhanced error handling."""
+def fetch_drug_data(drug_name, budget=PROFILE_BUDGET_SECONDS, on_update=None):
+    """
+    Fetch comprehensive data for a drug from various APIs with enhanced error handling.
+    Only the sources selected in the "Data Sources to Query" option are queried.
+    The whole fetch, including Claude augmentation, is bounded by the given budget in seconds.
+    If given, on_update(source_name, data) is called with a partial data snapshot as each source lands.
+    Brand, generic and code names are resolved to one canonical name first, so every fetcher and cache
+    keys on it and concurrent lookups of the same drug with the same options share a single in-flight fetch,
+    whose progress is replayed to every waiting caller's on_update.
+    """
+    drug_id = canonical_drug_name(drug_name)
+    selected_sources = tuple(sorted(st.session_state.get('data_sources', ALL_DATA_SOURCES)))
+    flight_key = (
+        drug_id,
+        st.session_state.get('model_option', "claude-3-opus-20240229"),
+        selected_sources
+    )
+    return get_flight_group("fetch_drug_data").do_with_updates(
+        flight_key, _fetch_drug_data, drug_id, Deadline(budget), selected_sources, on_update=on_update,
+        on_wait=lambda: st.info(f"Waiting on an identical lookup of {drug_id} already in progress..."))
+
+
+def _fetch_drug_data(drug_name, deadline, selected_sources=ALL_DATA_SOURCES, on_update=None):
+    """Query the selected sources for a drug, join the results and augment missing fields with Claude."""
+
+    # Query every selected source concurrently; dependent steps are chained inside each fetcher.
+    # Sources share a sub-budget so that time is left for augmentation.
+    tasks = {
+        "FDA": (fetch_fda_source, (drug_name,)),
+        "DailyMed": (fetch_dailymed_source, (drug_name,)),
+        "PubChem": (get_pubchem_info, (drug_name,)),
+        "ClinicalTrials.gov": (fetch_clinical_trials_source, (drug_name,)),
+        "PubMed": (fetch_pubmed_source, (drug_name,)),
+    }
+    tasks = {name: task for name, task in tasks.items() if name in selected_sources}
+
+    # Rebuild the partial dataset as each source lands so the caller can render it progressively
+    results = {}
+    for result in _fetch_engine.iter_results(tasks, deadline=deadline.child(SOURCE_BUDGET_SECONDS)):
+        results[result.name] = result
+        if on_update is not None:
+            on_update(result.name, assemble_drug_data(drug_name, results)[0])
+
+    report_source_problems(results)
+    data, successful_sources, _ = assemble_drug_data(drug_name, results)
+
+    # Record how each source fared so the profile can flag its gaps
+    data["source_status"] = {}
+    for name, result in results.items():
+        if result.short_circuited:
+            data["source_status"][name] = "circuit open"
+        elif result.timed_out:
+            data["source_status"][name] = "timeout"
+        elif isinstance(result.error, RateLimitedError):
+            data["source_status"][name] = "rate limited"
+        elif result.upstream_failed:
+            data["source_status"][name] = "error"
+        else:
+            data["source_status"][name] = "ok" if name in successful_sources else "no data"
+    for name in ALL_DATA_SOURCES:
+        if name not in selected_sources:
+            data["source_status"][name] = "not selected"
+
+    # Claude augmentation is itself a source the user can deselect, and it only fills in the sections
+    # of selected sources that came back empty
+    missing_fields = find_missing_fields(data, selected_sources)
+    if "Sorcero AI" in selected_sources and missing_fields:
+        # Display which data sources were successful and which need augmentation
+        st.info(
+            f"Successfully gathered data from: {', '.join(successful_sources) if successful_sources else 'No sources'}")
+        missing_sources = [AUGMENTATION_FIELDS[field]["label"] for field in missing_fields]
+
+        if missing_sources and deadline.remaining() < MIN_AUGMENT_SECONDS:
+            st.warning("Time budget exhausted; skipping Sorcero AI augmentation.")
+            data["source_status"]["Sorcero AI"] = "timeout"
+        elif missing_sources:
+            st.info(f"Using Sorcero AI to supplement missing data: {', '.join(missing_sources)}")
+
+            # Use Claude to augment missing data within the remaining budget
+            try:
+                # The augmented data is already merged with our existing data
+                with deadline_scope(deadline):
+                    data = augment_drug_data_with_claude(
+                        drug_name, data,
+                        on_update=(lambda partial_data: on_update("Sorcero AI", partial_data)) if on_update else None,
+                        selected_sources=selected_sources)
+                st.success(f"Successfully augmented data with Sorcero AI.")
+                if on_update is not None:
+                    on_update("Sorcero AI", data)
+            except Exception as e:
+                st.error(f"Error augmenting data with Sorcero AI: {str(e)}")
+                traceback_str = traceback.format_exc()
+                st.error(f"Traceback: {traceback_str}")
+
+    return data
+
+
+def report_source_problems(results):
+    """Surface sources that were skipped, missed the deadline or failed, so the gap is not mistaken for missing data."""
+    for name, result in results.items():
+        if result.short_circuited:
+            st.warning(f"{str(result.error)}.")
+        elif result.timed_out:
+            st.warning(f"{name} did not respond in time; its data is missing from this profile.")
+        elif isinstance(result.error, RateLimitedError):
+            st.warning(f"{name} rate limit reached; its data is missing from this profile.")
+        elif name == "PubChem" and not result.ok:
+            st.warning(f"Error fetching PubChem data: {str(result.error)}.")
+        elif name == "PubMed" and not result.ok:
+            st.warning(str(result.error))
+
+
+def assemble_drug_data(drug_name, results):
+    """
+    Join the source results that have landed so far into the app's data structure.
+    Returns the data together with the list of successful sources and whether anything is missing.
+    """
 
     # Initialize data structure
     data = {
@@ -250,373 +606,367 @@ def fetch_drug_data(drug_name):
     # Track which data sources were successfully queried
     successful_sources = []
 
-    # FDA Purple Book data - using openFDA API
-    try:
-        # Use the improved openFDA API call
-        fda_data = fetch_openfda_data(drug_name)
-
-        if fda_data and fda_data.get("drug_info"):
-            # Extract relevant information from structured response
-            drug_info = fda_data.get("drug_info", {})
-            latest_submission = drug_info.get("latest_submission", {})
-
-            # Get product info
-            products = drug_info.get("products", [])
-            product_info = products[0] if products else {}
-
-            # Extract key data points
-            brand_name = product_info.get("brand_name", drug_name.upper())
-            manufacturer = drug_info.get("sponsor_name", "Unknown Manufacturer")
-            approval_date = latest_submission.get("submission_status_date", "Unknown")
-            application_number = drug_info.get("application_number", "Unknown")
-
-            data["fda_purple_book"] = {
-                "source": "FDA Purple Book",
-                "text": f"{brand_name} - New Molecular Entity. Approved by FDA on {approval_date}. " +
-                        f"Manufacturer: {manufacturer}. " +
-                        f"BLA/NDA Number: {application_number}. " +
-                        f"Current Regulatory Status: {latest_submission.get('submission_status', 'Approved')}.",
-                "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name}
-            }
+    # FDA Purple Book data
+    fda_data = {}
+    fda_result = results.get("FDA")
+    if fda_result is not None and fda_result.ok:
+        fda_data = fda_result.value.get("fda_data", {})
+        if fda_result.value.get("fda_purple_book"):
+            data["fda_purple_book"] = fda_result.value["fda_purple_book"]
             successful_sources.append("FDA")
         else:
-            # Fallback to original FDA API method
-            fda_url = f"https://api.fda.gov/drug/drugsfda.json?search=openfda.generic_name:{drug_name}+OR+openfda.brand_name:{drug_name}"
-            fda_response = requests.get(fda_url)
-
-            if fda_response.status_code == 200:
-                fda_data = fda_response.json()
-                if 'results' in fda_data and len(fda_data['results']) > 0:
-                    result = fda_data['results'][0]
-
-                    # Extract relevant information
-                    brand_name = result.get('openfda', {}).get('brand_name', [drug_name.upper()])[
-                        0] if 'openfda' in result else drug_name.upper()
-                    manufacturer = result.get('sponsor_name', 'Unknown Manufacturer')
-                    approval_date = result.get('products', [{}])[0].get('approval_date', 'Unknown') if len(
-                        result.get('products', [])) > 0 else 'Unknown'
-                    application_number = result.get('application_number', 'Unknown')
-
-                    data["fda_purple_book"] = {
-                        "source": "FDA Purple Book",
-                        "text": f"{brand_name} - New Molecular Entity. Approved by FDA on {approval_date}. " +
-                                f"Manufacturer: {manufacturer}. " +
-                                f"BLA/NDA Number: {application_number}. " +
-                                f"Current Regulatory Status: Approved.",
-                        "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name}
-                    }
-                    successful_sources.append("FDA")
-                else:
-                    missing_data = True
-                    #st.warning("Limited FDA data found.")
-            else:
-                missing_data = True
-                #st.warning(f"Could not fetch FDA data (Status: {fda_response.status_code}).")
-    except Exception as e:
+            missing_data = True
+    else:
         missing_data = True
-        #st.warning(f"Error fetching FDA data: {str(e)}.")
-
-    # DailyMed data with enhanced parsing
-    try:
-        # First try DailyMed API to get basic data
-        dailymed_url = f"https://dailymed.nlm.nih.gov/dailymed/services/v2/spls.json?drug_name={drug_name}"
 
-        # Add specific headers that DailyMed expects
-        headers = {
-            'Accept': 'application/json',
-            'User-Agent': 'PharmDExplorer/1.0 (research application; contact@example.com)'
-        }
-
-        dailymed_response = requests.get(dailymed_url, headers=headers)
-
-        if dailymed_response.status_code == 200:
-            dailymed_data = dailymed_response.json()
-            if 'data' in dailymed_data and len(dailymed_data['data']) > 0:
-                # Get the set ID for the first result
-                set_id = dailymed_data['data'][0].get('setid')
-
-                # Fetch the full label using the set ID
-                label_url = f"https://dailymed.nlm.nih.gov/dailymed/services/v2/spls/{set_id}.json"
-                label_response = requests.get(label_url, headers=headers)
-
-                if label_response.status_code == 200:
-                    label_data = label_response.json()
-
-                    # Extract indications and usage with improved parsing
-                    indications = "Indications not available."
-                    mechanism = "Mechanism of action not available."
-
-                    if 'data' in label_data and 'sections' in label_data['data']:
-                        for section in label_data['data']['sections']:
-                            if 'title' in section:
-                                # More flexible matching for indications section
-                                if any(term in section['title'].upper() for term in ['INDICATIONS', 'USAGE', 'USES']):
-                                    indications = section.get('text', 'Indications not available.')
-                                # More flexible matching for mechanism section
-                                elif any(term in section['title'].upper() for term in
-                                         ['MECHANISM', 'ACTION', 'PHARMACOLOGY', 'HOW IT WORKS']):
-                                    mechanism = section.get('text', 'Mechanism of action not available.')
-                                # Look in clinical pharmacology section as fallback for mechanism
-                                elif 'CLINICAL PHARMACOLOGY' in section['title'].upper():
-                                    if mechanism == "Mechanism of action not available.":
-                                        mechanism = section.get('text', 'Mechanism of action not available.')
-
-                    # Try to use openFDA label data if available as a supplementary source
-                    if fda_data and fda_data.get("label_info"):
-                        label_info = fda_data.get("label_info", {})
-
-                        # If we didn't find indications, check openFDA
-                        if indications == "Indications not available.":
-                            fda_indications = label_info.get("indications_usage", ["Indications not available."])
-                            if fda_indications and fda_indications[0] != "Not available":
-                                indications = " ".join(fda_indications)
-
-                        # If we didn't find mechanism, check openFDA
-                        if mechanism == "Mechanism of action not available.":
-                            fda_mechanism = label_info.get("mechanism_of_action",
-                                                           ["Mechanism of action not available."])
-                            if fda_mechanism and fda_mechanism[0] != "Not available":
-                                mechanism = " ".join(fda_mechanism)
-                            else:
-                                # Try clinical pharmacology section as fallback
-                                fda_pharmacology = label_info.get("clinical_pharmacology", ["Not available"])
-                                if fda_pharmacology and fda_pharmacology[0] != "Not available":
-                                    mechanism = " ".join(fda_pharmacology)
-
-                    # Get the appropriate brand name
-                    brand_name = data.get('fda_purple_book', {}).get('metadata', {}).get('brand_name',
-                                                                                         drug_name.upper())
-
-                    data["daily_med"] = {
-                        "source": "DailyMed",
-                        "text": f"{brand_name} ({drug_name.lower()}) is a pharmaceutical agent indicated for: " +
-                                indications + " " +
-                                "Mechanism of Action: " + mechanism,
-                        "metadata": {"drug_name": drug_name.lower(), "document_type": "label"}
-                    }
-                    successful_sources.append("DailyMed")
+    # DailyMed data, supplemented with openFDA label sections once both have arrived
+    dailymed_result = results.get("DailyMed")
+    if dailymed_result is not None and dailymed_result.ok and dailymed_result.value:
+        indications = dailymed_result.value["indications"]
+        mechanism = dailymed_result.value["mechanism"]
+
+        # Try to use openFDA label data if available as a supplementary source
+        label_info = fda_data.get("label_info") if fda_data else None
+        if not label_info:
+            label_info = local_label_info(drug_name)
+        if label_info:
+            # If we didn't find indications, check openFDA
+            if indications == "Indications not available.":
+                fda_indications = label_info.get("indications_usage", ["Indications not available."])
+                if fda_indications and fda_indications[0] != "Not available":
+                    indications = " ".join(fda_indications)
+
+            # If we didn't find mechanism, check openFDA
+            if mechanism == "Mechanism of action not available.":
+                fda_mechanism = label_info.get("mechanism_of_action",
+                                               ["Mechanism of action not available."])
+                if fda_mechanism and fda_mechanism[0] != "Not available":
+                    mechanism = " ".join(fda_mechanism)
                 else:
-                    missing_data = True
-                    #st.warning(f"Could not fetch DailyMed label data (Status: {label_response.status_code}).")
-            else:
-                missing_data = True
-                #st.warning("Limited DailyMed data found.")
-        else:
-            missing_data = True
-            #st.warning(f"Could not fetch DailyMed data (Status: {dailymed_response.status_code})")
-    except Exception as e:
-        missing_data = True
-        #st.warning(f"Error fetching DailyMed data: {str(e)}.")
+                    # Try clinical pharmacology section as fallback
+                    fda_pharmacology = label_info.get("clinical_pharmacology", ["Not available"])
+                    if fda_pharmacology and fda_pharmacology[0] != "Not available":
+                        mechanism = " ".join(fda_pharmacology)
 
-    # Fetch PubChem data for chemical formula
-    try:
-        chemical_data = get_pubchem_info(drug_name)
-        if chemical_data:
-            # Add chemical information to PubMed section
-            data["pubmed"].append({
-                "source": "PubChem",
-                "pmid": "CHEM-1",
-                "text": f"Chemical Formula: {chemical_data.get('formula', 'Not available')}. " +
-                        f"Molecular Weight: {chemical_data.get('weight', 'Not available')}. " +
-                        f"Structure Type: {chemical_data.get('structure_type', 'Not available')}.",
-                "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"}
-            })
-            successful_sources.append("PubChem")
-    except Exception as e:
-        st.warning(f"Error fetching PubChem data: {str(e)}.")
+        # Get the appropriate brand name
+        brand_name = data.get('fda_purple_book', {}).get('metadata', {}).get('brand_name',
+                                                                             drug_name.upper())
 
-    # ClinicalTrials.gov data with improved query and parsing
-    # Update the ClinicalTrials.gov API request in your fetch_drug_data function
-    try:
-        # Create a fallback list of possible drug names for the search
-        drug_names = [drug_name]
-
-        # For known brand names, add generic names to improve search success
-        brand_to_generic = {
-            "keytruda": "pembrolizumab",
-            "opdivo": "nivolumab",
-            "humira": "adalimumab",
-            "enbrel": "etanercept",
-            "remicade": "infliximab",
-            # Add more mappings as needed
+        data["daily_med"] = {
+            "source": "DailyMed",
+            "text": f"{brand_name} ({drug_name.lower()}) is a pharmaceutical agent indicated for: " +
+                    indications + " " +
+                    "Mechanism of Action: " + mechanism,
+            "metadata": {"drug_name": drug_name.lower(), "document_type": "label"},
+            "fields": {"brand_name": brand_name, "indications": indications, "mechanism_of_action": mechanism}
         }
+        successful_sources.append("DailyMed")
+    else:
+        missing_data = True
 
-        # If we have a mapping for this drug, add the generic name as a fallback
-        if drug_name.lower() in brand_to_generic:
-            drug_names.append(brand_to_generic[drug_name.lower()])
-
-        # Try each name until we get a success
-        clinical_trials_found = False
-
-        for name in drug_names:
-            # Use the updated API format from ClinicalTrials.gov (as of 2023)
-            ct_url = f"https://clinicaltrials.gov/api/v2/studies?query.term={name}&pageSize=10&format=json"
-            ct_response = requests.get(ct_url)
-
-            if ct_response.status_code == 200:
-                ct_data = ct_response.json()
-
-                # API v2 has a different structure
-                if 'studies' in ct_data and len(ct_data['studies']) > 0:
-                    for study in ct_data['studies']:
-                        # Extract study information with the new structure
-                        protocol = study.get('protocolSection', {})
-                        identification = protocol.get('identificationModule', {})
-
-                        trial_id = identification.get('nctId', 'Unknown')
-
-                        # Phase extraction
-                        design = protocol.get('designModule', {})
-                        phase = design.get('phases', ['Unknown'])[0] if 'phases' in design and design[
-                            'phases'] else 'Unknown'
-
-                        # Description extraction
-                        description = protocol.get('descriptionModule', {}).get('briefSummary',
-                                                                                'No description available')
-
-                        # Population extraction
-                        eligibility = protocol.get('eligibilityModule', {})
-                        criteria = eligibility.get('eligibilityCriteria', 'Study population not specified')
-                        population = criteria.split('\n')[0] if '\n' in criteria else criteria[:100] + '...'
-
-                        # Results and safety extraction simplified
-                        results = "See ClinicalTrials.gov for complete results."
-                        safety = "Safety data available on ClinicalTrials.gov"
-
-                        # Add the trial to our data
-                        data["clinical_trials"].append({
-                            "source": "ClinicalTrials.gov",
-                            "trial_id": trial_id,
-                            "text": f"Study {trial_id}: A {phase} study of " +
-                                    f"{name} in {population}... " +
-                                    f"Description: {description[:150]}... " +
-                                    f"Results: {results}",
-                            "metadata": {"drug_name": name.lower(), "phase": phase if phase != 'Unknown' else ''}
-                        })
-
-                    clinical_trials_found = True
-                    successful_sources.append("ClinicalTrials.gov")
-                    break  # Exit the loop if we found trials
-
-            # If this particular name didn't work, try the next one
-
-        if not clinical_trials_found:
-            missing_data = True
-            #st.warning(f"Could not fetch clinical trials data for any of: {', '.join(drug_names)}")
+    # PubChem data for chemical formula
+    pubchem_result = results.get("PubChem")
+    if pubchem_result is not None and pubchem_result.ok and pubchem_result.value:
+        chemical_data = pubchem_result.value
 
-    except Exception as e:
+        # Add chemical information to PubMed section
+        data["pubmed"].append({
+            "source": "PubChem",
+            "pmid": "CHEM-1",
+            "text": f"Chemical Formula: {chemical_data.get('formula', 'Not available')}. " +
+                    f"Molecular Weight: {chemical_data.get('weight', 'Not available')}. " +
+                    f"Structure Type: {chemical_data.get('structure_type', 'Not available')}.",
+            "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"},
+            "fields": {"formula": chemical_data.get('formula', 'Not available'),
+                       "weight": chemical_data.get('weight', 'Not available'),
+                       "structure_type": chemical_data.get('structure_type', 'Not available'),
+                       "chemical_class": chemical_data.get('chemical_class', 'Not specified')}
+        })
+        successful_sources.append("PubChem")
+
+    # ClinicalTrials.gov data
+    ct_result = results.get("ClinicalTrials.gov")
+    if ct_result is not None and ct_result.ok and ct_result.value["trials"]:
+        data["clinical_trials"].extend(ct_result.value["trials"])
+        data["clinical_trials_total"] = ct_result.value["total"]
+        successful_sources.append("ClinicalTrials.gov")
+    else:
         missing_data = True
-        #st.warning(f"Error fetching clinical trials data: {str(e)}.")
 
     # PubMed data
-    try:
-        # Use PubMed API to get publication data with more specific query
-        pm_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={drug_name}+AND+(pharmacology[sb]+OR+mechanism+OR+clinical+trial[pt])&retmode=json&retmax=5"
-        pm_response = requests.get(pm_url)
-
-        if pm_response.status_code == 200:
-            pm_data = pm_response.json()
-            if 'esearchresult' in pm_data and 'idlist' in pm_data['esearchresult']:
-                pmids = pm_data['esearchresult']['idlist']
-
-                if pmids:
-                    # Fetch details for each PubMed ID
-                    pm_details_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi?db=pubmed&id={','.join(pmids)}&retmode=json"
-                    pm_details_response = requests.get(pm_details_url)
-
-                    if pm_details_response.status_code == 200:
-                        pm_details_data = pm_details_response.json()
-
-                        for pmid in pmids:
-                            if pmid in pm_details_data.get('result', {}):
-                                article = pm_details_data['result'][pmid]
-                                title = article.get('title', 'No title available')
-                                abstract = article.get('abstract', 'No abstract available')
-                                year = article.get('pubdate', '').split()[0] if 'pubdate' in article else 'Unknown'
-
-                                # Try to identify mechanistic or pharmacological articles
-                                is_mechanism = any(term in title.lower() or term in abstract.lower()
-                                                   for term in ['mechanism', 'pharmacology', 'receptor', 'binding',
-                                                                'agonist', 'antagonist', 'enzyme', 'molecular'])
-
-                                data["pubmed"].append({
-                                    "source": "PubMed",
-                                    "pmid": pmid,
-                                    "text": f"{title}. " +
-                                            f"Abstract: {abstract[:300]}..." +
-                                            (f" [MECHANISM/PHARMACOLOGY]" if is_mechanism else ""),
-                                    "metadata": {"drug_name": drug_name.lower(), "publication_year": year,
-                                                 "is_mechanism": is_mechanism}
-                                })
-
-                        if data["pubmed"]:
-                            successful_sources.append("PubMed")
-                        else:
-                            missing_data = True
-                            #st.warning("No PubMed article details found.")
-                    else:
-                        missing_data = True
-                        st.warning(
-                            f"Could not fetch PubMed article details (Status: {pm_details_response.status_code}).")
-                else:
-                    missing_data = True
-                    st.warning("No PubMed articles found.")
-            else:
-                missing_data = True
-                st.warning("Limited PubMed data found.")
-        else:
-            missing_data = True
-            st.warning(f"Could not fetch PubMed data (Status: {pm_response.status_code}).")
-    except Exception as e:
+    pubmed_result = results.get("PubMed")
+    if pubmed_result is not None and pubmed_result.ok and pubmed_result.value:
+        data["pubmed"].extend(pubmed_result.value)
+        successful_sources.append("PubMed")
+    else:
         missing_data = True
-        st.warning(f"Error fetching PubMed data: {str(e)}.")
-
-    # Always check if we're missing data or if key fields are empty
-    missing_critical_data = (
-            not data["fda_purple_book"] or
-            not data["daily_med"] or
-            len(data["clinical_trials"]) == 0 or
-            len(data["pubmed"]) == 0 or
-            "Indications not available" in data.get("daily_med", {}).get("text", "") or
-            "Mechanism of action not available" in data.get("daily_med", {}).get("text", "")
-    )
 
-    if missing_data or missing_critical_data:
-        # Display which data sources were successful and which need augmentation
-        st.info(
-            f"Successfully gathered data from: {', '.join(successful_sources) if successful_sources else 'No sources'}")
-        missing_sources = []
-        if not data["fda_purple_book"]:
-            missing_sources.append("FDA approval information")
-        if not data["daily_med"] or "Indications not available" in data.get("daily_med", {}).get("text", ""):
-            missing_sources.append("Indications")
-        if not data["daily_med"] or "Mechanism of action not available" in data.get("daily_med", {}).get("text", ""):
-            missing_sources.append("Mechanism of action")
-        if len(data["clinical_trials"]) == 0:
-            missing_sources.append("Clinical trials")
-        if len(data["pubmed"]) == 0:
-            missing_sources.append("Literature data")
-
-        if missing_sources:
-            st.info(f"Using Sorcero AI to supplement missing data: {', '.join(missing_sources)}")
+    return data, successful_sources, missing_data
 
-            # Use Claude to augment missing data
-            try:
-                augmented_data = augment_drug_data_with_claude(drug_name, data)
 
-                # Merge the augmented data with our existing data
-                data = merge_drug_data(data, augmented_data)
-                st.success(f"Successfully augmented data with Sorcero AI.")
-            except Exception as e:
-                st.error(f"Error augmenting data with Sorcero AI: {str(e)}")
-                traceback_str = traceback.format_exc()
-                st.error(f"Traceback: {traceback_str}")
+def fetch_fda_source(drug_name):
+    """Fetch FDA approval information and openFDA label sections for a drug."""
+    fda_purple_book = {}
 
-    return data
+    # Use the improved openFDA API call
+    fda_data = fetch_openfda_data(drug_name)
+
+    if fda_data and fda_data.get("drug_info"):
+        # Extract relevant information from structured response
+        drug_info = fda_data.get("drug_info", {})
+        latest_submission = drug_info.get("latest_submission", {})
+
+        # Get product info
+        products = drug_info.get("products", [])
+        product_info = products[0] if products else {}
 
+        # Extract key data points
+        brand_name = product_info.get("brand_name", drug_name.upper())
+        manufacturer = drug_info.get("sponsor_name", "Unknown Manufacturer")
+        approval_date = latest_submission.get("submission_status_date", "Unknown")
+        application_number = drug_info.get("application_number", "Unknown")
 
-def fetch_openfda_data(drug_name):
-    """Fetch comprehensive drug data from openFDA API."""
+        regulatory_status = latest_submission.get('submission_status', 'Approved')
+
+        fda_purple_book = {
+            "source": "FDA Purple Book",
+            "text": f"{brand_name} - New Molecular Entity. Approved by FDA on {approval_date}. " +
+                    f"Manufacturer: {manufacturer}. " +
+                    f"BLA/NDA Number: {application_number}. " +
+                    f"Current Regulatory Status: {regulatory_status}.",
+            "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name},
+            "fields": {"brand_name": brand_name, "approval_date": approval_date, "sponsor": manufacturer,
+                       "application_number": application_number, "regulatory_status": regulatory_status}
+        }
+    elif get_label_warehouse() is None or not get_label_warehouse().has_applications:
+        # Fallback to original FDA API method
+        fda_url = f"https://api.fda.gov/drug/drugsfda.json?search=openfda.generic_name:{drug_name}+OR+openfda.brand_name:{drug_name}"
+        fda_response = http_client.get(fda_url)
+
+        # openFDA answers 404 when nothing matches; anything else non-200 is an upstream failure
+        if fda_response.status_code not in (200, 404):
+            raise SourceUnavailableError(f"Could not fetch FDA data (Status: {fda_response.status_code})")
+
+        if fda_response.status_code == 200:
+            fallback_data = fda_response.json()
+            if 'results' in fallback_data and len(fallback_data['results']) > 0:
+                result = fallback_data['results'][0]
+
+                # Extract relevant information
+                brand_name = result.get('openfda', {}).get('brand_name', [drug_name.upper()])[
+                    0] if 'openfda' in result else drug_name.upper()
+                manufacturer = result.get('sponsor_name', 'Unknown Manufacturer')
+                approval_date = result.get('products', [{}])[0].get('approval_date', 'Unknown') if len(
+                    result.get('products', [])) > 0 else 'Unknown'
+                application_number = result.get('application_number', 'Unknown')
+
+                fda_purple_book = {
+                    "source": "FDA Purple Book",
+                    "text": f"{brand_name} - New Molecular Entity. Approved by FDA on {approval_date}. " +
+                            f"Manufacturer: {manufacturer}. " +
+                            f"BLA/NDA Number: {application_number}. " +
+                            f"Current Regulatory Status: Approved.",
+                    "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name},
+                    "fields": {"brand_name": brand_name, "approval_date": approval_date, "sponsor": manufacturer,
+                               "application_number": application_number, "regulatory_status": "Approved"}
+                }
+
+    return {"fda_data": fda_data, "fda_purple_book": fda_purple_book}
+
+
+def fetch_dailymed_source(drug_name):
+    """Fetch indications and mechanism of action from the DailyMed label (search, then label by set ID)."""
+    # DailyMed publishes the same SPL labels as openFDA, so answer from the local warehouse when present
+    warehouse = get_label_warehouse()
+    if warehouse is not None and warehouse.has_labels:
+        label_info = local_label_info(drug_name)
+        if not label_info:
+            return None
+        indications = " ".join(label_info["indications_usage"])
+        mechanism = " ".join(label_info["mechanism_of_action"])
+        if mechanism == "Not available":
+            mechanism = " ".join(label_info["clinical_pharmacology"])
+        return {
+            "indications": indications if indications != "Not available" else "Indications not available.",
+            "mechanism": mechanism if mechanism != "Not available" else "Mechanism of action not available."
+        }
+
+    # First try DailyMed API to get basic data
+    dailymed_url = f"https://dailymed.nlm.nih.gov/dailymed/services/v2/spls.json?drug_name={drug_name}"
+
+    # Add specific headers that DailyMed expects
+    headers = {
+        'Accept': 'application/json',
+        'User-Agent': 'PharmDExplorer/1.0 (research application; contact@example.com)'
+    }
+
+    dailymed_response = http_client.get(dailymed_url, headers=headers)
+    if dailymed_response.status_code != 200:
+        raise SourceUnavailableError(f"Could not fetch DailyMed data (Status: {dailymed_response.status_code})")
+
+    dailymed_data = dailymed_response.json()
+    if 'data' not in dailymed_data or len(dailymed_data['data']) == 0:
+        return None
+
+    # Get the set ID for the first result
+    set_id = dailymed_data['data'][0].get('setid')
+
+    # Fetch the full label using the set ID
+    label_url = f"https://dailymed.nlm.nih.gov/dailymed/services/v2/spls/{set_id}.json"
+    label_response = http_client.get(label_url, headers=headers)
+    if label_response.status_code != 200:
+        raise SourceUnavailableError(f"Could not fetch DailyMed label data (Status: {label_response.status_code})")
+
+    label_data = label_response.json()
+
+    # Extract indications and usage with improved parsing
+    indications = "Indications not available."
+    mechanism = "Mechanism of action not available."
+
+    if 'data' in label_data and 'sections' in label_data['data']:
+        for section in label_data['data']['sections']:
+            if 'title' in section:
+                # More flexible matching for indications section
+                if any(term in section['title'].upper() for term in ['INDICATIONS', 'USAGE', 'USES']):
+                    indications = section.get('text', 'Indications not available.')
+                # More flexible matching for mechanism section
+                elif any(term in section['title'].upper() for term in
+                         ['MECHANISM', 'ACTION', 'PHARMACOLOGY', 'HOW IT WORKS']):
+                    mechanism = section.get('text', 'Mechanism of action not available.')
+                # Look in clinical pharmacology section as fallback for mechanism
+                elif 'CLINICAL PHARMACOLOGY' in section['title'].upper():
+                    if mechanism == "Mechanism of action not available.":
+                        mechanism = section.get('text', 'Mechanism of action not available.')
+
+    return {"indications": indications, "mechanism": mechanism}
+
+
+def fetch_clinical_trials_source(drug_name):
+    """
+    Fetch clinical trial records for a drug, from the local snapshot when ingested or else ClinicalTrials.gov.
+    Returns up to 10 trials together with the total number of registered trials.
+    """
+    # Search under the canonical name and its brand and code names at once
+    drug_names = drug_synonyms(drug_name)
+
+    # Answer from the local snapshot when present; intervention synonyms are already indexed
+    snapshot = get_trials_snapshot()
+    if snapshot is not None and snapshot.has_studies:
+        total, studies = snapshot.find_trials(drug_names)
+        return {"trials": [format_trial(study, drug_name) for study in studies], "total": total}
+
+    # A single OR query replaces one request per name
+    query = quote(" OR ".join(f'"{name}"' if " " in name else name for name in drug_names))
+
+    # Use the updated API format from ClinicalTrials.gov (as of 2023)
+    ct_url = f"https://clinicaltrials.gov/api/v2/studies?query.term={query}&pageSize=10&countTotal=true&format=json"
+    ct_response = http_client.get(ct_url)
+
+    if ct_response.status_code >= 500:
+        raise SourceUnavailableError(f"Could not fetch clinical trials data (Status: {ct_response.status_code})")
+
+    if ct_response.status_code == 200:
+        ct_data = ct_response.json()
+
+        # API v2 has a different structure
+        if 'studies' in ct_data and len(ct_data['studies']) > 0:
+            trials = [format_trial(summarize_study(study), drug_name) for study in ct_data['studies']]
+            return {"trials": trials, "total": ct_data.get('totalCount', len(trials))}
+
+    return {"trials": [], "total": 0}
+
+
+def format_trial(study, name):
+    """Format a summarized study as a clinical trial source record."""
+    phase = study["phase"]
+
+    # Results and safety extraction simplified
+    results = "See ClinicalTrials.gov for complete results."
+
+    return {
+        "source": "ClinicalTrials.gov",
+        "trial_id": study["nct_id"],
+        "text": f"Study {study['nct_id']}: A {phase} study of " +
+                f"{name} in {study['population']}... " +
+                f"Description: {study['summary'][:150]}... " +
+                f"Results: {results}",
+        "metadata": {"drug_name": name.lower(), "phase": phase if phase != 'Unknown' else '',
+                     "status": study["status"], "enrollment": study["enrollment"]},
+        "fields": {"trial_id": study["nct_id"], "title": study.get("title", ""), "phase": phase,
+                   "population": study["population"], "enrollment": study["enrollment"],
+                   "status": study["status"], "summary": study["summary"], "results": results}
+    }
+
+
+def fetch_pubmed_source(drug_name):
+    """
+    Fetch literature records for a drug, from the local PubMed store when ingested
+    or else from PubMed (esearch, then efetch for full abstracts).
+    """
+    # Answer from the local store when present
+    store = get_literature_store()
+    if store is not None and store.has_articles:
+        articles = store.find_articles(drug_name)
+        if not articles:
+            raise SourceEmptyError("No PubMed articles found.")
+        return [format_article(article, drug_name) for article in articles]
+
+    # Use PubMed API to get publication data with more specific query
+    pm_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed&term={drug_name}+AND+(pharmacology[sb]+OR+mechanism+OR+clinical+trial[pt])&retmode=json&retmax=5"
+    pm_response = http_client.get(pm_url)
+
+    if pm_response.status_code != 200:
+        raise SourceUnavailableError(f"Could not fetch PubMed data (Status: {pm_response.status_code}).")
+
+    pm_data = pm_response.json()
+    if 'esearchresult' not in pm_data or 'idlist' not in pm_data['esearchresult']:
+        raise SourceEmptyError("Limited PubMed data found.")
+
+    pmids = pm_data['esearchresult']['idlist']
+    if not pmids:
+        raise SourceEmptyError("No PubMed articles found.")
+
+    # Fetch the full records; esummary does not include abstracts
+    pm_details_url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pubmed&id={','.join(pmids)}&retmode=xml"
+    pm_details_response = http_client.get(pm_details_url)
+
+    if pm_details_response.status_code != 200:
+        raise SourceUnavailableError(
+            f"Could not fetch PubMed article details (Status: {pm_details_response.status_code}).")
+
+    # Keep the search ranking order
+    articles = {article["pmid"]: article for article in parse_pubmed_xml(pm_details_response.content)}
+    return [format_article(articles[pmid], drug_name) for pmid in pmids if pmid in articles]
+
+
+def format_article(article, drug_name):
+    """Format a parsed PubMed article as a literature source record."""
+    title = article["title"] or 'No title available'
+    abstract = article["abstract"] or 'No abstract available'
+
+    # Try to identify mechanistic or pharmacological articles
+    is_mechanism = any(term in title.lower() or term in abstract.lower()
+                       for term in ['mechanism', 'pharmacology', 'receptor', 'binding',
+                                    'agonist', 'antagonist', 'enzyme', 'molecular'])
+
+    return {
+        "source": "PubMed",
+        "pmid": article["pmid"],
+        "text": f"{title}. " +
+                f"Abstract: {abstract[:300]}..." +
+                (f" [MECHANISM/PHARMACOLOGY]" if is_mechanism else ""),
+        "metadata": {"drug_name": drug_name.lower(), "publication_year": article["year"],
+                     "is_mechanism": is_mechanism, "mesh_terms": article.get("mesh", [])},
+        "fields": {"pmid": article["pmid"], "year": article["year"], "title": title, "abstract": abstract}
+    }
+
+
+def fetch_openfda_data(drug_name, include_adverse_events=False):
+    """
+    Fetch comprehensive drug data from openFDA API.
+    Applications and labels are answered from the local label warehouse when it has been ingested.
+    Adverse event reports are large and unused by the profile, so they are only queried on request.
+    """
 
     # Dictionary to store all collected data
     fda_data = {
@@ -625,65 +975,65 @@ def fetch_openfda_data(drug_name):
         "adverse_events": []
     }
 
+    # Answer from the local warehouse where it holds that kind of record; a miss there is final
+    warehouse = get_label_warehouse()
+    local = {}
+    tasks = {}
+    if warehouse is not None and warehouse.has_applications:
+        local["drugsfda"] = warehouse.find_application(drug_name)
+    else:
+        tasks["drugsfda"] = (http_client.get, (
+            f"https://api.fda.gov/drug/drugsfda.json?search=openfda.generic_name:{drug_name}+OR+openfda.brand_name:{drug_name}&limit=3",))
+    if warehouse is not None and warehouse.has_labels:
+        local["label"] = warehouse.find_label(drug_name)
+    else:
+        tasks["label"] = (http_client.get, (
+            f"https://api.fda.gov/drug/label.json?search=openfda.brand_name:{drug_name}+OR+openfda.generic_name:{drug_name}&limit=1",))
+    if include_adverse_events:
+        tasks["events"] = (http_client.get, (
+            f"https://api.fda.gov/drug/event.json?search=patient.drug.medicinalproduct:{drug_name}&limit=5",))
+
+    # Issue the remaining independent openFDA queries concurrently
+    results = _openfda_engine.run(tasks) if tasks else {}
+
     try:
-        # 1. Fetch drug product information
-        drug_url = f"https://api.fda.gov/drug/drugsfda.json?search=openfda.generic_name:{drug_name}+OR+openfda.brand_name:{drug_name}&limit=3"
-        drug_response = requests.get(drug_url)
-
-        if drug_response.status_code == 200:
-            drug_data = drug_response.json()
-            if 'results' in drug_data and len(drug_data['results']) > 0:
-                result = drug_data['results'][0]
-
-                # Extract basic drug info
-                fda_data["drug_info"] = {
-                    "application_number": result.get('application_number', 'Unknown'),
-                    "sponsor_name": result.get('sponsor_name', 'Unknown Manufacturer'),
-                    "products": result.get('products', []),
-                    "submissions": result.get('submissions', [])
-                }
+        # 1. Drug product information
+        result = local["drugsfda"] if "drugsfda" in local else first_openfda_result(results.get("drugsfda"))
+        if result:
+            # Extract basic drug info
+            fda_data["drug_info"] = {
+                "application_number": result.get('application_number', 'Unknown'),
+                "sponsor_name": result.get('sponsor_name', 'Unknown Manufacturer'),
+                "products": result.get('products', []),
+                "submissions": result.get('submissions', [])
+            }
 
-                # Get the most recent submission
-                if result.get('submissions'):
-                    sorted_submissions = sorted(
-                        result['submissions'],
-                        key=lambda x: x.get('submission_status_date', '0'),
-                        reverse=True
-                    )
-                    fda_data["drug_info"]["latest_submission"] = sorted_submissions[0]
-
-        # 2. Fetch detailed label information
-        label_url = f"https://api.fda.gov/drug/label.json?search=openfda.brand_name:{drug_name}+OR+openfda.generic_name:{drug_name}&limit=1"
-        label_response = requests.get(label_url)
-
-        if label_response.status_code == 200:
-            label_data = label_response.json()
-            if 'results' in label_data and len(label_data['results']) > 0:
-                label = label_data['results'][0]
-
-                # Extract key sections from the label
-                fda_data["label_info"] = {
-                    "indications_usage": label.get('indications_and_usage', ['Not available']),
-                    "dosage_administration": label.get('dosage_and_administration', ['Not available']),
-                    "contraindications": label.get('contraindications', ['Not available']),
-                    "warnings": label.get('warnings', ['Not available']),
-                    "adverse_reactions": label.get('adverse_reactions', ['Not available']),
-                    "drug_interactions": label.get('drug_interactions', ['Not available']),
-                    "mechanism_of_action": label.get('mechanism_of_action', ['Not available']),
-                    "clinical_pharmacology": label.get('clinical_pharmacology', ['Not available']),
-                    "clinical_studies": label.get('clinical_studies', ['Not available']),
-                    "how_supplied": label.get('how_supplied', ['Not available'])
-                }
+            # Get the most recent submission
+            if result.get('submissions'):
+                sorted_submissions = sorted(
+                    result['submissions'],
+                    key=lambda x: x.get('submission_status_date', '0'),
+                    reverse=True
+                )
+                fda_data["drug_info"]["latest_submission"] = sorted_submissions[0]
 
-        # 3. Fetch adverse events data (optional - can be large)
-        events_url = f"https://api.fda.gov/drug/event.json?search=patient.drug.medicinalproduct:{drug_name}&limit=5"
-        events_response = requests.get(events_url)
+        # 2. Detailed label information
+        label = local["label"] if "label" in local else first_openfda_result(results.get("label"))
+        if label:
+            fda_data["label_info"] = extract_label_info(label)
 
-        if events_response.status_code == 200:
+        # 3. Adverse events data (optional - can be large)
+        events_result = results.get("events")
+        events_response = events_result.value if events_result is not None else None
+        if events_response is not None and events_response.status_code == 200:
             events_data = events_response.json()
             if 'results' in events_data:
                 fda_data["adverse_events"] = events_data['results']
 
+        for result in results.values():
+            if not result.ok:
+                print(f"Error fetching openFDA {result.name} data: {str(result.error)}")
+
         return fda_data
 
     except Exception as e:
@@ -691,69 +1041,90 @@ def fetch_openfda_data(drug_name):
         return fda_data
 
 
+def first_openfda_result(result):
+    """Return the first record of a successful openFDA query result, or None."""
+    response = result.value if result is not None else None
+    if response is None or response.status_code != 200:
+        return None
+    records = response.json().get('results', [])
+    return records[0] if records else None
+
+
+def extract_label_info(label):
+    """Extract the key sections of an openFDA label record."""
+    return {
+        "indications_usage": label.get('indications_and_usage', ['Not available']),
+        "dosage_administration": label.get('dosage_and_administration', ['Not available']),
+        "contraindications": label.get('contraindications', ['Not available']),
+        "warnings": label.get('warnings', ['Not available']),
+        "adverse_reactions": label.get('adverse_reactions', ['Not available']),
+        "drug_interactions": label.get('drug_interactions', ['Not available']),
+        "mechanism_of_action": label.get('mechanism_of_action', ['Not available']),
+        "clinical_pharmacology": label.get('clinical_pharmacology', ['Not available']),
+        "clinical_studies": label.get('clinical_studies', ['Not available']),
+        "how_supplied": label.get('how_supplied', ['Not available'])
+    }
+
+
+def local_label_info(drug_name):
+    """Return the key label sections for a drug from the local label warehouse, or an empty dict."""
+    warehouse = get_label_warehouse()
+    if warehouse is None or not warehouse.has_labels:
+        return {}
+    label = warehouse.find_label(drug_name)
+    return extract_label_info(label) if label else {}
+
+
 def get_pubchem_info(drug_name):
     """Fetch chemical information from PubChem API."""
     try:
-        # First search for the compound
-        search_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{drug_name}/cids/JSON"
-        response = requests.get(search_url)
-
-        if response.status_code == 200:
-            data = response.json()
-            if 'IdentifierList' in data and 'CID' in data['IdentifierList']:
-                cid = data['IdentifierList']['CID'][0]
-
-                # Get compound properties
-                property_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/property/MolecularFormula,MolecularWeight,CanonicalSMILES,XLogP,Complexity/JSON"
-                prop_response = requests.get(property_url)
-
-                if prop_response.status_code == 200:
-                    prop_data = prop_response.json()
-
-                    if 'PropertyTable' in prop_data and 'Properties' in prop_data['PropertyTable'] and len(
-                            prop_data['PropertyTable']['Properties']) > 0:
-                        properties = prop_data['PropertyTable']['Properties'][0]
-
-                        # Get classification information
-                        structure_type = "Small Molecule"  # Default for most drugs
-                        chemical_class = "Not specified"
-
-                        # Determine chemical classification based on formula or SMILES
-                        formula = properties.get('MolecularFormula', '')
-                        smiles = properties.get('CanonicalSMILES', '')
-
-                        # Determine structure type and class based on molecular features
-                        if formula:
-                            # Check if it's a peptide/protein (contains many C,N,O and has high weight)
-                            if (formula.count('C') > 20 and formula.count('N') > 10 and
-                                    formula.count('O') > 10 and int(properties.get('MolecularWeight', 0)) > 1000):
-                                structure_type = "Peptide/Protein"
-                                chemical_class = "Biologic"
-
-                        if smiles:
-                            # Check for common chemical classes based on SMILES patterns
-                            if 'c1ccccc1' in smiles:  # Contains benzene ring
-                                if 'N' in smiles and 'O' in smiles:
-                                    chemical_class = "Benzene-derived Compound"
-                            elif 'N1CCN' in smiles or 'n1ccn' in smiles:  # Contains piperazine
-                                chemical_class = "Piperazine Derivative"
-                            elif 'C(=O)N' in smiles:  # Contains amide
-                                chemical_class = "Amide Derivative"
-                            elif 'c1ccc2c(c1)' in smiles:  # Contains condensed rings
-                                chemical_class = "Polycyclic Aromatic Compound"
-
-                        return {
-                            "formula": properties.get('MolecularFormula', 'Not available'),
-                            "weight": properties.get('MolecularWeight', 'Not available'),
-                            "smiles": properties.get('CanonicalSMILES', 'Not available'),
-                            "logp": properties.get('XLogP', 'Not available'),
-                            "complexity": properties.get('Complexity', 'Not available'),
-                            "structure_type": structure_type,
-                            "chemical_class": chemical_class,
-                            "cid": cid
-                        }
+        # Resolve the compound through the shared PubChem resolver
+        cid, properties = get_pubchem_resolver().lookup(drug_name)
+
+        if cid is not None and properties:
+            # Get classification information
+            structure_type = "Small Molecule"  # Default for most drugs
+            chemical_class = "Not specified"
+
+            # Determine chemical classification based on formula or SMILES
+            formula = properties.get('MolecularFormula', '')
+            smiles = properties.get('CanonicalSMILES', '')
+
+            # Determine structure type and class based on molecular features
+            if formula:
+                # Check if it's a peptide/protein (contains many C,N,O and has high weight)
+                if (formula.count('C') > 20 and formula.count('N') > 10 and
+                        formula.count('O') > 10 and float(properties.get('MolecularWeight', 0)) > 1000):
+                    structure_type = "Peptide/Protein"
+                    chemical_class = "Biologic"
+
+            if smiles:
+                # Check for common chemical classes based on SMILES patterns
+                if 'c1ccccc1' in smiles:  # Contains benzene ring
+                    if 'N' in smiles and 'O' in smiles:
+                        chemical_class = "Benzene-derived Compound"
+                elif 'N1CCN' in smiles or 'n1ccn' in smiles:  # Contains piperazine
+                    chemical_class = "Piperazine Derivative"
+                elif 'C(=O)N' in smiles:  # Contains amide
+                    chemical_class = "Amide Derivative"
+                elif 'c1ccc2c(c1)' in smiles:  # Contains condensed rings
+                    chemical_class = "Polycyclic Aromatic Compound"
+
+            return {
+                "formula": properties.get('MolecularFormula', 'Not available'),
+                "weight": properties.get('MolecularWeight', 'Not available'),
+                "smiles": properties.get('CanonicalSMILES', 'Not available'),
+                "logp": properties.get('XLogP', 'Not available'),
+                "complexity": properties.get('Complexity', 'Not available'),
+                "structure_type": structure_type,
+                "chemical_class": chemical_class,
+                "cid": cid
+            }
 
         return None
+    except (PubChemLookupError, RequestException):
+        # Let upstream failures reach the PubChem circuit breaker
+        raise
     except Exception as e:
         print(f"Error in PubChem API: {str(e)}")
         return None
@@ -761,35 +1132,27 @@ def get_pubchem_info(drug_name):
 
 def get_molecular_structure(drug_name):
     """Fetch and return molecular structure image URL for a drug."""
+    resolver = get_pubchem_resolver()
     try:
-        # Step 1: Search for the compound to get the CID
-        search_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{drug_name}/cids/JSON"
-        response = requests.get(search_url)
-
-        if response.status_code != 200:
+        # Step 1: Resolve the compound to its CID, under the same canonical name the profile fetch used
+        try:
+            cid = resolver.resolve_cid(canonical_drug_name(drug_name))
+        except PubChemLookupError:
             return None, "Could not find compound in PubChem"
 
-        data = response.json()
-        if 'IdentifierList' not in data or 'CID' not in data['IdentifierList']:
+        if cid is None:
             return None, "No CID found for this compound"
 
-        cid = data['IdentifierList']['CID'][0]
-
         # Step 2: Get the 2D structure image
-        image_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/PNG"
+        image_url = resolver.image_url(cid)
 
-        # Step 3: Get compound properties
-        property_url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/cid/{cid}/property/MolecularFormula,MolecularWeight,CanonicalSMILES,XLogP,Complexity/JSON"
-        prop_response = requests.get(property_url)
-
-        if prop_response.status_code != 200:
+        # Step 3: Get compound properties (already cached if the profile fetched them)
+        try:
+            prop_data = resolver.get_properties(cid)
+        except PubChemLookupError:
             return image_url, "Structure available, but properties could not be retrieved"
 
-        properties = prop_response.json()
-
-        if 'PropertyTable' in properties and 'Properties' in properties['PropertyTable'] and len(
-                properties['PropertyTable']['Properties']) > 0:
-            prop_data = properties['PropertyTable']['Properties'][0]
+        if prop_data:
             formula = prop_data.get('MolecularFormula', 'Not available')
             weight = prop_data.get('MolecularWeight', 'Not available')
             smiles = prop_data.get('CanonicalSMILES', 'Not available')
@@ -822,8 +1185,27 @@ def display_chemical_structure(drug_name):
         st.text(properties)
 
 
-def augment_drug_data_with_claude(drug_name, existing_data):
-    """Use Claude API to fill in missing drug information with improved formatting and parsing."""
+def augment_drug_data_with_claude(drug_name, existing_data, on_update=None, selected_sources=ALL_DATA_SOURCES):
+    """
+    Use Claude API to fill in missing drug information with improved formatting and parsing.
+    Only sections belonging to the selected sources are filled in.
+    Missing sections are requested from Claude concurrently; if given, on_update(data) is called with the
+    merged data as each section arrives.
+    Concurrent augmentations of the same drug, model and known data share the same Claude requests.
+    """
+    flight_key = (
+        canonical_drug_name(drug_name),
+        st.session_state.get('model_option', "claude-3-opus-20240229"),
+        tuple(sorted(selected_sources)),
+        hashlib.sha256(json.dumps(existing_data, sort_keys=True, default=str).encode()).hexdigest()
+    )
+    return get_flight_group("augment_drug_data").do_with_updates(
+        flight_key, _augment_drug_data_with_claude, drug_name, existing_data, selected_sources, on_update=on_update,
+        on_wait=lambda: st.info("Waiting on an identical Sorcero AI request already in progress..."))
+
+
+def _augment_drug_data_with_claude(drug_name, existing_data, selected_sources=ALL_DATA_SOURCES, on_update=None):
+    """Request the missing sections from Claude and merge each answer into the existing data."""
 
     try:
         # Get API key from Streamlit secrets
@@ -841,22 +1223,107 @@ def augment_drug_data_with_claude(drug_name, existing_data):
             "mechanism": "Not available"
         }
 
-        # Extract manufacturer from FDA data if available
-        fda_text = existing_data.get("fda_purple_book", {}).get("text", "")
-        if "Manufacturer:" in fda_text:
+        # Take the manufacturer, indications and mechanism from the structured source fields,
+        # falling back to the record text for records without them
+        fda_record = existing_data.get("fda_purple_book", {})
+        fda_text = fda_record.get("text", "")
+        if fda_record.get("fields"):
+            known_info["manufacturer"] = fda_record["fields"].get("sponsor", "Unknown")
+        elif "Manufacturer:" in fda_text:
             known_info["manufacturer"] = fda_text.split("Manufacturer:")[1].split(".")[0].strip()
 
-        # Extract indications from DailyMed data if available
-        daily_med_text = existing_data.get("daily_med", {}).get("text", "")
-        if "indicated for" in daily_med_text:
-            known_info["indications"] = daily_med_text.split("indicated for")[1].split("Mechanism")[0].strip()
+        daily_med_record = existing_data.get("daily_med", {})
+        daily_med_text = daily_med_record.get("text", "")
+        if daily_med_record.get("fields"):
+            known_info["indications"] = daily_med_record["fields"].get("indications", "Not available")
+            known_info["mechanism"] = daily_med_record["fields"].get("mechanism_of_action", "Not available")
+        else:
+            if "indicated for" in daily_med_text:
+                known_info["indications"] = daily_med_text.split("indicated for")[1].split("Mechanism")[0].strip()
+            if "Mechanism of Action:" in daily_med_text:
+                known_info["mechanism"] = daily_med_text.split("Mechanism of Action:")[1].strip()
+
+        # Only ask for the fields that are still missing, one small request per section
+        missing_fields = find_missing_fields(existing_data, selected_sources)
+        if not missing_fields:
+            return existing_data
+        selected_model = st.session_state.get('model_option', "claude-3-opus-20240229")
+        section_fields = {}
+        for section, fields in AUGMENTATION_SECTIONS.items():
+            requested = [field for field in fields if field in missing_fields]
+            if requested:
+                section_fields[section] = requested
+        tasks = {
+            section: (request_augmentation_section, (drug_name, fields, known_info, api_key, selected_model))
+            for section, fields in section_fields.items()
+        }
 
-        # Extract mechanism from DailyMed data if available
-        if "Mechanism of Action:" in daily_med_text:
-            known_info["mechanism"] = daily_med_text.split("Mechanism of Action:")[1].strip()
+        # Sections are generated concurrently and merged as each one lands. Blocks of a streamed section
+        # are shown as soon as they close, on top of the sections merged so far.
+        augmented_data = existing_data
+        streamed_blocks = {}
+
+        def show_progress():
+            preview = augmented_data
+            for section, blocks in streamed_blocks.items():
+                preview = merge_drug_data(preview, transform_claude_json_to_app_format(
+                    drug_name, complete_augmentation(blocks, section_fields[section], known_info)),
+                    origin="Sorcero AI")
+            on_update(preview)
+
+        for result in _claude_engine.iter_results(tasks, progress=True):
+            if isinstance(result, SourceProgress):
+                key, value = result.value
+                streamed_blocks.setdefault(result.name, {})[key] = value
+                if on_update is not None:
+                    show_progress()
+                continue
+            streamed_blocks.pop(result.name, None)
+            if result.timed_out:
+                st.warning(f"Sorcero AI {result.name} section did not finish in time.")
+                continue
+            if not result.ok:
+                st.error(f"Error from Sorcero AI ({result.name} section): {str(result.error)}")
+                continue
+
+            claude_data, content, model = result.value
+            if model != selected_model:
+                st.info(f"Sorcero AI {result.name} section was answered by {model} because {selected_model} "
+                        f"was unavailable or too slow.")
+            if claude_data is None:
+                # Fall back to the original parsing method
+                st.warning(f"Could not find JSON in Sorcero AI {result.name} section. Falling back to text extraction.")
+                augmented_data = parse_claude_text_response(drug_name, content, augmented_data)
+            else:
+                # Transform the Claude JSON response into our expected format and merge it
+                augmented_data = merge_drug_data(augmented_data, transform_claude_json_to_app_format(
+                    drug_name, complete_augmentation(claude_data, section_fields[result.name], known_info)),
+                    origin="Sorcero AI")
+
+            # Record which model produced each field of the section
+            field_models = dict(augmented_data.get("field_models", {}))
+            field_models.update((field, model) for field in section_fields[result.name])
+            augmented_data = {**augmented_data, "field_models": field_models}
+            if on_update is not None:
+                show_progress()
 
-        # Create a prompt that specifies what data we need and provides context
-        prompt = f"""I need detailed, factual information about the pharmaceutical drug {drug_name} in JSON format.
+        return augmented_data
+
+    except Exception as e:
+        st.error(f"Error in Sorcero AI function: {str(e)}")
+        traceback_str = traceback.format_exc()
+        st.error(f"Traceback: {traceback_str}")
+        return existing_data  # Return existing data instead of empty dict
+
+
+def request_augmentation_section(drug_name, fields, known_info, api_key, selected_model, report=None):
+    """
+    Ask Claude for one section of missing fields and return (parsed JSON or None, response text, model used).
+    Runs on a worker thread, so failures are raised rather than shown. If given, report((key, value)) is
+    called with each top-level JSON block of a streamed answer as soon as it is complete.
+    """
+    # Create a prompt that specifies what data we need and provides context
+    prompt = f"""I need detailed, factual information about the pharmaceutical drug {drug_name} in JSON format.
 
 Here's what I already know:
 - Brand name: {known_info["brand_name"]}
@@ -867,124 +1334,197 @@ Here's what I already know:
 Please provide the following information in valid JSON format only:
 
 ```json
-{{
-  "fda_data": {{
-    "brand_name": "string",
-    "approval_date": "string (format: YYYY-MM-DD)",
-    "manufacturer": "string",
-    "bla_nda_number": "string",
-    "regulatory_status": "string"
-  }},
-  "daily_med_data": {{
-    "indications": "string - detailed list of all approved indications",
-    "mechanism_of_action": "string - detailed molecular explanation with receptor targets"
-  }},
-  "chemical_data": {{
-    "formula": "string - chemical formula using standard notation",
-    "structure_type": "string - chemical structure classification",
-    "chemical_class": "string - broader chemical classification"
-  }},
-  "clinical_trials": [
-    {{
-      "trial_id": "string (NCT number if available)",
-      "phase": "string (e.g., Phase 3)",
-      "population": "string (patient population studied)",
-      "results": "string (key efficacy findings with metrics)",
-      "safety": "string (adverse events and percentages)"
-    }}
-  ]
-}}
+{build_augmentation_schema(fields)}
 ```
 
 Please fill this structure with factual, specific and comprehensive information about {drug_name}. 
-For chemical formula, use standard chemical notation.
-For the mechanism of action, include molecular details about receptor binding, enzyme inhibition, or other relevant processes.
-For clinical trials, focus on pivotal trials that led to approval when available.
-If certain information is not available or cannot be determined, please indicate with "Not available" as the value.
+{"".join(AUGMENTATION_FIELDS[field]["instruction"] for field in fields)}If certain information is not available or cannot be determined, please indicate with "Not available" as the value.
 
 Your response should ONLY include the JSON object with no additional text before or after.
 """
 
-        # API endpoint
-        url = "https://api.anthropic.com/v1/messages"
+    # API endpoint
+    url = f"{ANTHROPIC_API_URL}/v1/messages"
 
-        # Headers
-        headers = {
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
-
-        # Get the selected model from session state or use default
-        selected_model = st.session_state.get('model_option', "claude-3-opus-20240229")
+    # Headers
+    headers = {
+        "x-api-key": api_key,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json"
+    }
 
-        # Request payload using the selected model
+    system_prompt = "You are a pharmaceutical information specialist with extensive knowledge of drugs, their approvals, mechanisms, clinical trials, and research literature. Provide only factual, accurate information. Be precise, detailed and comprehensive. Return your response in valid JSON format only, with no additional text."
+
+    # Pick the model from the latency budget, falling back to faster models on timeout or overload
+    cache = get_augmentation_cache()
+    router = get_model_router()
+    max_tokens = augmentation_max_tokens(fields)
+    section_deadline = (current_deadline() or Deadline(AUGMENT_LATENCY_BUDGET)).child(AUGMENT_LATENCY_BUDGET)
+    # The request is deterministic (temperature 0), so a cached answer to the same prompt is reused,
+    # preferably the one from the selected model
+    if cache is not None:
+        cached_data = cache.get(augmentation_key(selected_model, system_prompt, prompt))
+        if cached_data is not None:
+            return cached_data, None, selected_model
+
+    models = router.route(selected_model, max_tokens, section_deadline.remaining())
+    for attempt, model in enumerate(models):
+        cache_key = augmentation_key(model, system_prompt, prompt)
+        cached_data = cache.get(cache_key) if cache is not None and model != selected_model else None
+        if cached_data is not None:
+            return cached_data, None, model
+
+        # Request payload using the routed model
         data = {
-            "model": selected_model,  # Use the model selected by the user
-            "max_tokens": 4000,
+            "model": model,
+            "max_tokens": max_tokens,
             "temperature": 0,
-            "system": "You are a pharmaceutical information specialist with extensive knowledge of drugs, their approvals, mechanisms, clinical trials, and research literature. Provide only factual, accurate information. Be precise, detailed and comprehensive. Return your response in valid JSON format only, with no additional text.",
+            "system": system_prompt,
             "messages": [
                 {"role": "user", "content": prompt}
             ]
         }
 
-        # Make the request
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-
+        # Leave enough of the budget for the next model to answer if this one is too slow,
+        # but give each model at least half of what is left
+        budget = section_deadline.remaining()
+        if attempt + 1 < len(models):
+            budget = max(budget / 2, budget - router.estimate(models[attempt + 1], max_tokens))
+        attempt_deadline = section_deadline.child(budget)
+        start = time.monotonic()
+        try:
+            with deadline_scope(attempt_deadline):
+                response, content = request_claude_answer(
+                    url, headers, data, on_block=(lambda key, value: report((key, value))) if report else None)
+        except ClaudeSlotTimeoutError:
+            # The model was never asked, so its latency is not penalised
+            if section_deadline.expired:
+                raise
+            continue
+        except (RateLimitedError, ClaudeStreamError):
+            # Overload reported up front or in the middle of a stream
+            router.record_overload(model)
+            continue
+        except RequestException as e:
+            # Only slowness counts against the model's latency; connection and DNS failures do not
+            if isinstance(e, Timeout) or attempt_deadline.expired:
+                router.record_timeout(model, time.monotonic() - start, max_tokens)
+            if section_deadline.expired:
+                raise
+            continue
+        if response.status_code in (429, 503, 529):
+            router.record_overload(model)
+            continue
         if response.status_code != 200:
-            st.error(f"Error from Claude API: Status {response.status_code}")
-            st.error(f"Response: {response.text}")
-            return existing_data  # Return existing data instead of empty dict
-
-        # Parse the response
-        result = response.json()
-        content = result.get("content", [{}])[0].get("text", "")
-
-        #st.success("Successfully received information from Claude!")
+            raise SourceUnavailableError(f"Status {response.status_code}: {response.text}")
+        router.record_success(model, time.monotonic() - start, len(content))
+
+        # Look for JSON within code blocks first, then for a JSON object without code blocks
+        json_match = re.search(r'```(?:json)?\s*({[\s\S]*?})\s*```', content) or re.search(r'({[\s\S]*})', content)
+        if not json_match:
+            return None, content, model
+        try:
+            claude_data = json.loads(json_match.group(1))
+        except json.JSONDecodeError:
+            raise SourceUnavailableError("Failed to parse JSON from Sorcero AI")
+
+        # Keep the parsed answer so repeat profiles skip the call
+        if cache is not None:
+            cache.put(cache_key, model, drug_name, claude_data)
+        return claude_data, content, model
+
+    raise SourceUnavailableError(f"No model answered within the {AUGMENT_LATENCY_BUDGET:.0f}s latency budget "
+                                 f"(tried {', '.join(models)})")
+
+
+def request_claude_answer(url, headers, data, on_block=None):
+    """
+    Send a Messages API request and return the response with its text, which is empty unless the status is 200.
+    If given, on_block(key, value) is called with each top-level JSON member of a streamed answer as it completes.
+    """
+    if ANTHROPIC_STREAMING:
+        data = {**data, "stream": True}
+
+    # Hold one of the shared slots for the whole request, across every session in the process,
+    # but wait for one no longer than the current deadline allows
+    deadline = current_deadline()
+    if not _claude_slots.acquire(timeout=deadline.remaining() if deadline is not None else None):
+        raise ClaudeSlotTimeoutError(f"All {CLAUDE_MAX_CONCURRENCY} Sorcero AI request slots stayed busy")
+    try:
+        response = http_client.post(url, headers=headers, data=json.dumps(data), stream=ANTHROPIC_STREAMING)
+        if response.status_code != 200:
+            return response, ""
 
-        # Try to parse the JSON response
-        # Look for JSON within code blocks first
-        json_match = re.search(r'```(?:json)?\s*({[\s\S]*?})\s*```', content)
-        if json_match:
-            json_str = json_match.group(1)
+        # Parse the response; a stream still running at the deadline counts as a timeout of the model
+        if ANTHROPIC_STREAMING:
             try:
-                claude_data = json.loads(json_str)
-
-                # Transform the Claude JSON response into our expected format
-                augmented_data = transform_claude_json_to_app_format(drug_name, claude_data)
-
-                # Merge the augmented data with existing data
-                return merge_drug_data(existing_data, augmented_data)
-            except json.JSONDecodeError:
-                st.error("Failed to parse JSON from Sorcero AI")
-                return existing_data
-        else:
-            # Try to find JSON object without code blocks
-            json_match = re.search(r'({[\s\S]*})', content)
-            if json_match:
-                json_str = json_match.group(1)
-                try:
-                    claude_data = json.loads(json_str)
-
-                    # Transform the Claude JSON response into our expected format
-                    augmented_data = transform_claude_json_to_app_format(drug_name, claude_data)
-
-                    # Merge the augmented data with existing data
-                    return merge_drug_data(existing_data, augmented_data)
-                except json.JSONDecodeError:
-                    st.error("Failed to parse JSON from Sorcero AI")
-                    return existing_data
-            else:
-                # Fall back to the original parsing method
-                st.warning("Could not find JSON in Sorcero AI. Falling back to text extraction.")
-                return parse_claude_text_response(drug_name, content, existing_data)
-
-    except Exception as e:
-        st.error(f"Error in Sorcero AI function: {str(e)}")
-        traceback_str = traceback.format_exc()
-        st.error(f"Traceback: {traceback_str}")
-        return existing_data  # Return existing data instead of empty dict
+                return response, read_message_stream(response, on_block=on_block)
+            except StreamDeadlineExceededError as e:
+                raise DeadlineExceededError(str(e)) from e
+        return response, response.json().get("content", [{}])[0].get("text", "")
+    finally:
+        _claude_slots.release()
+
+
+def find_missing_fields(existing_data, selected_sources=ALL_DATA_SOURCES):
+    """
+    Return the augmentation fields, in schema order, that the sources did not provide.
+    Fields whose source was deselected are left empty, as the user asked not to query it.
+    """
+    daily_med_text = existing_data.get("daily_med", {}).get("text", "")
+    missing = {
+        "fda_data": not existing_data.get("fda_purple_book"),
+        "indications": not daily_med_text or "Indications not available" in daily_med_text,
+        "mechanism_of_action": not daily_med_text or "Mechanism of action not available" in daily_med_text,
+        "chemical_data": not any(entry.get("pmid") == "CHEM-1" for entry in existing_data.get("pubmed", [])),
+        "clinical_trials": len(existing_data.get("clinical_trials", [])) == 0,
+    }
+    return [field for field in AUGMENTATION_FIELDS
+            if missing[field] and AUGMENTATION_FIELDS[field]["source"] in selected_sources]
+
+
+def build_augmentation_schema(missing_fields):
+    """Build the JSON schema shown to Claude, covering only the missing fields."""
+    blocks = []
+    if "fda_data" in missing_fields:
+        blocks.append(AUGMENTATION_FIELDS["fda_data"]["schema"])
+
+    # Indications and mechanism share the daily_med_data block
+    daily_med_fields = [AUGMENTATION_FIELDS[field]["schema"] for field in ("indications", "mechanism_of_action")
+                        if field in missing_fields]
+    if daily_med_fields:
+        blocks.append('  "daily_med_data": {\n' + ",\n".join(daily_med_fields) + '\n  }')
+
+    for field in ("chemical_data", "clinical_trials"):
+        if field in missing_fields:
+            blocks.append(AUGMENTATION_FIELDS[field]["schema"])
+    return "{\n" + ",\n".join(blocks) + "\n}"
+
+
+def augmentation_max_tokens(missing_fields):
+    """Return an output token limit sized to the requested fields."""
+    tokens = AUGMENTATION_BASE_TOKENS + sum(AUGMENTATION_FIELDS[field]["max_tokens"] for field in missing_fields)
+    return min(tokens, AUGMENTATION_MAX_TOKENS)
+
+
+def complete_augmentation(claude_data, requested_fields, known_info):
+    """
+    Keep only the requested blocks of an answer, filling the parts of daily_med_data that were not requested
+    with what is already known, so merging never replaces known label text with a placeholder.
+    """
+    completed = {key: claude_data[key] for key in ("fda_data", "chemical_data", "clinical_trials")
+                 if key in requested_fields and key in claude_data}
+    if "daily_med_data" in claude_data and ("indications" in requested_fields or
+                                            "mechanism_of_action" in requested_fields):
+        daily_med_data = dict(claude_data["daily_med_data"])
+        if "indications" not in requested_fields:
+            daily_med_data["indications"] = known_info["indications"]
+        if "mechanism_of_action" not in requested_fields:
+            daily_med_data["mechanism_of_action"] = known_info["mechanism"]
+        completed["daily_med_data"] = daily_med_data
+    if "fda_data" not in completed and known_info["brand_name"]:
+        completed["fda_data"] = {"brand_name": known_info["brand_name"]}
+    return completed
 
 
 def transform_claude_json_to_app_format(drug_name, claude_data):
@@ -1013,7 +1553,9 @@ def transform_claude_json_to_app_format(drug_name, claude_data):
                     f"Manufacturer: {manufacturer}. " +
                     f"BLA/NDA Number: {bla_nda}. " +
                     f"Current Regulatory Status: {status}.",
-            "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name}
+            "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name},
+            "fields": {"brand_name": brand_name, "approval_date": approval_date, "sponsor": manufacturer,
+                       "application_number": bla_nda, "regulatory_status": status}
         }
 
     # Extract DailyMed data
@@ -1030,7 +1572,8 @@ def transform_claude_json_to_app_format(drug_name, claude_data):
             "text": f"{brand_name} ({drug_name.lower()}) is a pharmaceutical agent indicated for: " +
                     indications + " " +
                     "Mechanism of Action: " + mechanism,
-            "metadata": {"drug_name": drug_name.lower(), "document_type": "label"}
+            "metadata": {"drug_name": drug_name.lower(), "document_type": "label"},
+            "fields": {"brand_name": brand_name, "indications": indications, "mechanism_of_action": mechanism}
         }
 
     # Extract Clinical Trials data
@@ -1048,7 +1591,9 @@ def transform_claude_json_to_app_format(drug_name, claude_data):
                 "text": f"Study {trial_id}: A {phase} study of {drug_name} in {population}. " +
                         f"Results: {results[:200]}... " +
                         f"Safety: {safety[:150]}...",
-                "metadata": {"drug_name": drug_name.lower(), "phase": phase}
+                "metadata": {"drug_name": drug_name.lower(), "phase": phase},
+                "fields": {"trial_id": trial_id, "phase": phase, "population": population,
+                           "results": results, "safety": safety}
             })
 
     # Extract chemical data and add to PubMed as that's where we typically store this in the app
@@ -1062,48 +1607,58 @@ def transform_claude_json_to_app_format(drug_name, claude_data):
             "source": "PubMed",
             "pmid": "CHEM-1",
             "text": f"Chemical Formula: {formula}. Structure Type: {structure}. Chemical Class: {chem_class}.",
-            "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"}
+            "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"},
+            "fields": {"formula": formula, "structure_type": structure, "chemical_class": chem_class}
         })
 
     return app_data
 
 
-def merge_drug_data(existing_data, new_data):
-    """Merge existing data with new data, preferring existing data when available."""
-
-    # Deep copy existing data to avoid modifying the original
-    merged_data = copy.deepcopy(existing_data)
+def merge_drug_data(existing_data, new_data, origin=None):
+    """
+    Merge existing data with new data, preferring existing data when available.
+    Neither input is modified and nothing is deep-copied: the result shares every unchanged category with
+    existing_data (and every adopted one with new_data), so callers must treat the records as read-only.
+    If given, origin is recorded in data["provenance"] for each category or field that new_data filled.
+    """
+    merged_data = dict(existing_data)
+    filled = []
 
     # For each data category
     for key in new_data:
+        existing_value = merged_data.get(key)
         # If the category is empty in existing data, use the new data
-        if not merged_data.get(key):
-            merged_data[key] = new_data[key]
-        # For list types (clinical_trials, pubmed)
-        elif isinstance(merged_data[key], list):
-            if len(merged_data[key]) == 0:
+        if not existing_value:
+            if new_data[key]:
+                merged_data[key] = new_data[key]
+                filled.append(key)
+            elif key not in merged_data:
                 merged_data[key] = new_data[key]
         # For dict types with specific missing data
-        elif isinstance(merged_data[key], dict):
+        elif key == "daily_med" and isinstance(existing_value, dict):
             # For daily_med, check if specific key phrases are missing
-            if key == "daily_med":
-                if "Indications not available" in merged_data[key].get("text", "") and "indicated for" in new_data[
-                    key].get("text", ""):
-                    merged_data[key] = new_data[key]
-                elif "Mechanism of action not available" in merged_data[key].get("text",
-                                                                                 "") and "Mechanism of Action:" in \
-                        new_data[key].get("text", ""):
-                    # Just update the mechanism part
-                    original_text = merged_data[key].get("text", "")
-                    if "Mechanism of Action:" in original_text:
-                        # Replace just the mechanism part
-                        before_mech = original_text.split("Mechanism of Action:")[0]
-                        new_mech = new_data[key].get("text", "").split("Mechanism of Action:")[1]
-                        merged_data[key]["text"] = before_mech + "Mechanism of Action:" + new_mech
-                    else:
-                        # Append the mechanism
-                        merged_data[key]["text"] = original_text + " Mechanism of Action:" + \
-                                                   new_data[key].get("text", "").split("Mechanism of Action:")[1]
+            existing_text = existing_value.get("text", "")
+            new_text = new_data[key].get("text", "")
+            if "Indications not available" in existing_text and "indicated for" in new_text:
+                merged_data[key] = new_data[key]
+                filled.append(key)
+            elif "Mechanism of action not available" in existing_text and "Mechanism of Action:" in new_text:
+                # Just update the mechanism part, copying only this record
+                new_mech = new_text.split("Mechanism of Action:")[1]
+                if "Mechanism of Action:" in existing_text:
+                    text = existing_text.split("Mechanism of Action:")[0] + "Mechanism of Action:" + new_mech
+                else:
+                    text = existing_text + " Mechanism of Action:" + new_mech
+                record = {**existing_value, "text": text}
+                if "mechanism_of_action" in new_data[key].get("fields", {}):
+                    record["fields"] = {**existing_value.get("fields", {}),
+                                        "mechanism_of_action": new_data[key]["fields"]["mechanism_of_action"]}
+                merged_data[key] = record
+                filled.append("daily_med.mechanism_of_action")
+
+    # Record where the filled categories and fields came from
+    if origin and filled:
+        merged_data["provenance"] = {**existing_data.get("provenance", {}), **{key: origin for key in filled}}
 
     return merged_data
 
@@ -1147,7 +1702,9 @@ def parse_claude_text_response(drug_name, content, existing_data):
                     f"Manufacturer: {manufacturer}. " +
                     f"BLA/NDA Number: {bla_number}. " +
                     f"Current Regulatory Status: {status}.",
-            "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name}
+            "metadata": {"drug_name": drug_name.lower(), "brand_name": brand_name},
+            "fields": {"brand_name": brand_name, "approval_date": approval_date, "sponsor": manufacturer,
+                       "application_number": bla_number, "regulatory_status": status}
         }
 
     # Extract Daily Med data
@@ -1179,7 +1736,8 @@ def parse_claude_text_response(drug_name, content, existing_data):
             "text": f"{brand_name} ({drug_name.lower()}) is a pharmaceutical agent indicated for: " +
                     indications + " " +
                     "Mechanism of Action: " + mechanism,
-            "metadata": {"drug_name": drug_name.lower(), "document_type": "label"}
+            "metadata": {"drug_name": drug_name.lower(), "document_type": "label"},
+            "fields": {"brand_name": brand_name, "indications": indications, "mechanism_of_action": mechanism}
         }
 
     # Extract Clinical Trials data
@@ -1271,7 +1829,9 @@ def parse_claude_text_response(drug_name, content, existing_data):
                 "text": f"Study {trial_id}: A {phase} study of {drug_name} in {population}. " +
                         f"Results: {results[:200]}... " +
                         f"Safety: {safety[:150]}...",
-                "metadata": {"drug_name": drug_name.lower(), "phase": phase}
+                "metadata": {"drug_name": drug_name.lower(), "phase": phase},
+                "fields": {"trial_id": trial_id, "phase": phase, "population": population,
+                           "results": results, "safety": safety}
             })
 
     # Extract chemical data
@@ -1297,10 +1857,11 @@ def parse_claude_text_response(drug_name, content, existing_data):
             "source": "Chemical Data",
             "pmid": "CHEM-1",
             "text": f"Chemical Formula: {formula}. Structure Type: {structure}. Chemical Class: {chem_class}.",
-            "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"}
+            "metadata": {"drug_name": drug_name.lower(), "publication_year": "Current"},
+            "fields": {"formula": formula, "structure_type": structure, "chemical_class": chem_class}
         })
 
-    return merge_drug_data(existing_data, augmented_data)
+    return merge_drug_data(existing_data, augmented_data, origin="Sorcero AI")
 
 
 # Define the main app
@@ -1313,6 +1874,9 @@ def main():
     # Add sidebar and styling
     add_sidebar_and_styling()
 
+    # Show which data sources are currently being skipped
+    render_source_health()
+
     # Check if the API key is set
     try:
         if "ANTHROPIC_API_KEY" in st.secrets:
@@ -1338,6 +1902,12 @@ def main():
             st.session_state.visualization = None
             st.rerun()
 
+    # Add a sidebar option to discard cached Sorcero AI answers, e.g. after a model update
+    if st.sidebar.button("Clear Sorcero AI Cache"):
+        cache = get_augmentation_cache()
+        if cache is not None:
+            st.sidebar.success(f"Removed {cache.invalidate()} cached Sorcero AI answers.")
+
     # Main content area
     st.title("PharmD Agent Explorer")
     st.subheader(
@@ -1370,8 +1940,8 @@ def main():
 
                 data_sources = st.multiselect(
                     "Data Sources to Query",
-                    ["FDA", "DailyMed", "ClinicalTrials.gov", "PubMed", "PubChem", "Sorcero AI"],
-                    default=["FDA", "DailyMed", "ClinicalTrials.gov", "PubMed", "PubChem", "Sorcero AI"],
+                    ALL_DATA_SOURCES,
+                    default=ALL_DATA_SOURCES,
                     help="Select which data sources to query for information"
                 )
 
@@ -1381,17 +1951,34 @@ def main():
             if submit_button and drug_name:
                 # Store advanced options in session state
                 st.session_state.model_option = model_option
-                st.session_state.include_chemical_structure = include_chemical_structure
+                # The structure view is drawn from PubChem, so it is skipped when PubChem is deselected
+                st.session_state.include_chemical_structure = include_chemical_structure and "PubChem" in data_sources
                 st.session_state.data_sources = data_sources
 
+                # Correct misspelled names before any upstream request is made
+                drug_name = correct_drug_name(drug_name)
+
                 with st.spinner(f"Generating profile for {drug_name}..."):
                     try:
                         # Create a status container for progress updates
                         status_container = st.empty()
                         status_container.info(f"Searching for information about {drug_name}...")
 
+                        # Preview the profile as each source lands instead of waiting for the slowest one
+                        profile_placeholder = st.empty()
+                        landed_sources = []
+
+                        def on_source_update(source_name, partial_data):
+                            if source_name not in landed_sources:
+                                landed_sources.append(source_name)
+                            try:
+                                render_progressive_profile(profile_placeholder, drug_name, partial_data,
+                                                           landed_sources)
+                            except Exception as e:
+                                print(f"Error rendering partial profile: {str(e)}")
+
                         # Fetch data for the specified drug
-                        drug_data = fetch_drug_data(drug_name)
+                        drug_data = fetch_drug_data(drug_name, on_update=on_source_update)
                         st.session_state.drug_data = drug_data
 
                         # Store chemical structure information if enabled
@@ -1488,6 +2075,24 @@ def main():
                 if st.session_state.get('drug_data'):
                     drug_data = st.session_state.drug_data
 
+                    # Source status
+                    if drug_data.get('source_status'):
+                        with st.expander("Source Status"):
+                            for source_name, source_status in drug_data['source_status'].items():
+                                st.markdown(f"**{source_name}**: {source_status}")
+
+                    # Categories and fields filled in after the sources were fetched
+                    if drug_data.get('provenance'):
+                        with st.expander("Data Provenance"):
+                            for field_name, origin in drug_data['provenance'].items():
+                                st.markdown(f"**{field_name}**: {origin}")
+
+                    # Models that produced the Sorcero AI fields
+                    if drug_data.get('field_models'):
+                        with st.expander("Sorcero AI Models"):
+                            for field_name, field_model in drug_data['field_models'].items():
+                                st.markdown(f"**{field_name.replace('_', ' ').capitalize()}**: {field_model}")
+
                     # FDA Purple Book
                     with st.expander("FDA Purple Book Data"):
                         if drug_data.get('fda_purple_book'):
@@ -1507,6 +2112,9 @@ def main():
                     # Clinical Trials
                     with st.expander("Clinical Trials Data"):
                         if drug_data.get('clinical_trials') and len(drug_data['clinical_trials']) > 0:
+                            if drug_data.get('clinical_trials_total'):
+                                st.markdown(f"Showing {len(drug_data['clinical_trials'])} of "
+                                            f"{drug_data['clinical_trials_total']} registered trials")
                             for i, trial in enumerate(drug_data['clinical_trials']):
                                 st.markdown(f"**Trial {i + 1}**: {trial.get('trial_id', 'Unknown ID')}")
                                 st.markdown(f"**Source**: {trial.get('source', 'ClinicalTrials.gov')}")
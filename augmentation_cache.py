@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Location of the on-disk cache of parsed Claude augmentation results
+CACHE_PATH = os.getenv(
+    "AUGMENTATION_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "augmentations.sqlite3")
+)
+
+# How long a cached augmentation is reused, and how many are kept before the least recently used are evicted
+CACHE_TTL = float(os.getenv("AUGMENTATION_CACHE_TTL", str(30 * 24 * 60 * 60)))
+MAX_ENTRIES = int(os.getenv("AUGMENTATION_CACHE_MAX_ENTRIES", "5000"))
+
+# Version of the cached payload; bump it whenever the response schema or its parsing changes
+SCHEMA_VERSION = 1
+
+
+def augmentation_key(model, system, prompt, schema_version=SCHEMA_VERSION):
+    """Return the cache key for an augmentation request."""
+    digest = hashlib.sha256(f"{system}\n\n{prompt}".encode("utf-8")).hexdigest()
+    return f"{model}:{schema_version}:{digest}"
+
+
+class AugmentationCache:
+    """SQLite-backed cache of parsed Claude augmentation results with a TTL and LRU size bound."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=MAX_ENTRIES):
+        """Initialize the cache, creating the database on first use."""
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS augmentations (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    drug_name TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS augmentations_by_use ON augmentations (last_used_at)")
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the cached payload for a key, or None if it is missing or has expired."""
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT payload FROM augmentations WHERE key = ? AND stored_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE augmentations SET last_used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, model, drug_name, payload):
+        """Store a payload and evict expired and least recently used entries beyond the size bound."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO augmentations VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, drug_name.lower(), json.dumps(payload), now, now)
+            )
+            conn.execute("DELETE FROM augmentations WHERE stored_at <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM augmentations WHERE key NOT IN "
+                "(SELECT key FROM augmentations ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+    def invalidate(self, drug_name=None, model=None):
+        """Remove every entry, or only those of one drug and/or model; return the number removed."""
+        clauses, params = [], []
+        if drug_name:
+            clauses.append("drug_name = ?")
+            params.append(drug_name.lower())
+        if model:
+            clauses.append("model = ?")
+            params.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._connection() as conn:
+            return conn.execute(f"DELETE FROM augmentations{where}", params).rowcount
+
+    def count(self):
+        """Return the number of cached augmentations."""
+        return self._connection().execute("SELECT COUNT(*) FROM augmentations").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_augmentation_cache():
+    """Return the process-wide augmentation cache, or None if caching is disabled or unavailable."""
+    global _cache
+    if os.getenv("AUGMENTATION_CACHE_DISABLED"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = AugmentationCache()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Augmentation cache unavailable: {str(e)}")
+                    _cache = False
+    return _cache or None
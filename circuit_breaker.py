@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+# Consecutive failures that open a breaker, and how long it stays open before a probe is allowed
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "60"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures of one source and short-circuits calls while it is down."""
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        """Initialize a closed breaker for the named source."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Return True if the source may be called.
+        Once the reset timeout has passed, a single probe call is let through in the half-open state.
+        A probe whose outcome was never recorded is given up on after another reset timeout.
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and (not self.probe_in_flight
+                                            or now - self.probe_started_at >= self.reset_timeout):
+                self.probe_in_flight = True
+                self.probe_started_at = now
+                return True
+            return False
+
+    def record_success(self):
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the breaker at the threshold or when a probe fails."""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+            self.probe_in_flight = False
+
+    def retry_in(self):
+        """Return the number of seconds until the breaker allows a probe."""
+        if self.state == OPEN:
+            since = self.opened_at
+        elif self.state == HALF_OPEN and self.probe_in_flight:
+            since = self.probe_started_at
+        else:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - since))
+
+    def open_error(self):
+        """Return the error reported for calls rejected by this breaker."""
+        return CircuitOpenError(f"{self.name} is unavailable; skipping it for another {self.retry_in():.0f}s")
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name):
+    """Return the process-wide circuit breaker for a source, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+
+def all_circuit_breakers():
+    """Return every circuit breaker created so far, ordered by source name."""
+    with _breakers_lock:
+        return [_breakers[name] for name in sorted(_breakers)]
@@ -0,0 +1,165 @@
+import json
+
+from deadline import current_deadline
+
+
+class ClaudeStreamError(Exception):
+    """Raised when the Messages API reports an error in the middle of a stream."""
+
+
+class StreamDeadlineExceededError(TimeoutError):
+    """Raised when the current deadline passes while a response is still streaming."""
+
+
+def iter_sse_events(lines):
+    """Yield (event, data) pairs from an iterable of server-sent event lines."""
+    event = None
+    data_lines = []
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r")
+
+        # A blank line dispatches the event collected so far
+        if not line:
+            if data_lines:
+                yield event or "message", "\n".join(data_lines)
+            event = None
+            data_lines = []
+        elif line.startswith(":"):
+            continue
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].lstrip(" "))
+
+    if data_lines:
+        yield event or "message", "\n".join(data_lines)
+
+
+def iter_text_deltas(lines):
+    """Yield the text fragments of a streamed Messages API response."""
+    for event, data in iter_sse_events(lines):
+        if event == "content_block_delta":
+            delta = json.loads(data).get("delta", {})
+            if delta.get("type") == "text_delta":
+                yield delta.get("text", "")
+        elif event == "error":
+            error = json.loads(data).get("error", {})
+            raise ClaudeStreamError(f"{error.get('type', 'error')}: {error.get('message', data)}")
+        elif event == "message_stop":
+            return
+
+
+class IncrementalJSONParser:
+    """
+    Incrementally parses a JSON object arriving in text fragments.
+    Each top-level member is returned as soon as its value is complete; any text before the
+    opening brace (such as a ```json fence) and after the closing brace is ignored.
+    """
+
+    def __init__(self):
+        """Initialize the parser before the opening brace has been seen."""
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.state = "start"
+        self.key = None
+        self.key_start = None
+        self.value_start = None
+        self.done = False
+
+    def feed(self, text):
+        """Consume a text fragment and return the (key, value) members completed by it."""
+        self.buffer += text
+        completed = []
+        while self.pos < len(self.buffer) and not self.done:
+            char = self.buffer[self.pos]
+            self._step(char, completed)
+            self.pos += 1
+        return completed
+
+    def _emit(self, end, completed):
+        """Decode the top-level value spanning value_start to end and record it under the current key."""
+        raw = self.buffer[self.value_start:end].strip()
+        self.value_start = None
+        self.state = "after_value"
+        try:
+            completed.append((self.key, json.loads(raw)))
+        except json.JSONDecodeError:
+            # Leave malformed members to the full-text parse at the end of the stream
+            pass
+
+    def _step(self, char, completed):
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                if self.depth == 1 and self.state == "key":
+                    self.key = json.loads(self.buffer[self.key_start:self.pos + 1])
+                    self.state = "colon"
+                elif self.depth == 1 and self.state == "value":
+                    self._emit(self.pos + 1, completed)
+            return
+
+        if self.state == "start":
+            if char == "{":
+                self.depth = 1
+                self.state = "key"
+            return
+
+        if char == '"':
+            self.in_string = True
+            if self.depth == 1 and self.state == "key":
+                self.key_start = self.pos
+            elif self.depth == 1 and self.state == "value" and self.value_start is None:
+                self.value_start = self.pos
+        elif char in "{[":
+            if self.depth == 1 and self.value_start is None:
+                self.value_start = self.pos
+            self.depth += 1
+        elif char in "}]":
+            self.depth -= 1
+            if self.depth == 1 and self.value_start is not None:
+                self._emit(self.pos + 1, completed)
+            elif self.depth == 0:
+                # A trailing scalar member ends at the closing brace
+                if self.value_start is not None:
+                    self._emit(self.pos, completed)
+                self.done = True
+        elif self.depth == 1:
+            if char == ":" and self.state == "colon":
+                self.state = "value"
+            elif char == ",":
+                if self.value_start is not None:
+                    self._emit(self.pos, completed)
+                self.state = "key"
+            elif not char.isspace() and self.state == "value" and self.value_start is None:
+                # Numbers, booleans and null
+                self.value_start = self.pos
+
+
+def read_message_stream(response, on_block=None):
+    """
+    Read a streamed Messages API response and return the full text.
+    on_block(key, value) is called for each top-level JSON member as soon as it is complete.
+    The read timeout only bounds each read, so the current deadline, if any, is checked after every event
+    to stop a model that keeps streaming slowly.
+    """
+    deadline = current_deadline()
+    parser = IncrementalJSONParser()
+    fragments = []
+    for text in iter_text_deltas(response.iter_lines(decode_unicode=True)):
+        if deadline is not None and deadline.expired:
+            response.close()
+            raise StreamDeadlineExceededError(f"Time budget exhausted after {len(fragments)} streamed fragments")
+        fragments.append(text)
+        for key, value in parser.feed(text):
+            if on_block is not None:
+                on_block(key, value)
+    return "".join(fragments)
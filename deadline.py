@@ -0,0 +1,53 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+
+class Deadline:
+    """A point in time by which a pipeline stage must finish."""
+
+    def __init__(self, budget):
+        """Initialize a deadline the given number of seconds from now."""
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self):
+        """Return the number of seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def child(self, budget):
+        """Return a deadline for a sub-stage that ends after budget seconds or at this deadline, if sooner."""
+        child = Deadline(budget)
+        child.expires_at = min(child.expires_at, self.expires_at)
+        child.budget = child.remaining()
+        return child
+
+    def limit(self, timeout):
+        """Cap a requests-style timeout (a number or a (connect, read) tuple) to the remaining time."""
+        remaining = self.remaining()
+        if isinstance(timeout, tuple):
+            return tuple(min(value, remaining) for value in timeout)
+        return min(timeout, remaining)
+
+
+# The deadline of the stage running in the current thread or task, if any
+_current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+def current_deadline():
+    """Return the deadline that applies to the current context, or None."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline):
+    """Apply a deadline to every request made within the block."""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
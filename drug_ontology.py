@@ -1,13 +1,257 @@
 import pandas as pd
+import hashlib
 import json
+import os
 import re
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from keyword_matcher import KeywordMatcher
+from profile_model import (ApprovalStatus, AssetProfile, Evidence, Identifiers, LiteratureRef, RelatedCompound,
+                           Relationship, Target)
+
+# Drug class named in the label, checked in order; an antipsychotic is atypical if the label says so
+DRUG_CLASS_KEYWORDS = [
+    (("antipsychotic",), "Antipsychotic"),
+    (("antidepressant",), "Antidepressant"),
+    (("anxiolytic",), "Anxiolytic"),
+    (("hypnotic", "sedative"), "Sedative-Hypnotic"),
+    (("mood stabilizer",), "Mood Stabilizer"),
+    (("stimulant",), "Stimulant"),
+    (("anticonvulsant", "antiepileptic"), "Anticonvulsant"),
+    (("antimicrobial", "antibiotic"), "Antimicrobial"),
+    (("antiviral",), "Antiviral"),
+    (("antifungal",), "Antifungal"),
+    (("antihypertensive",), "Antihypertensive"),
+    (("antineoplastic", "anticancer"), "Antineoplastic"),
+    (("anti-inflammatory",), "Anti-inflammatory"),
+    (("analgesic", "pain"), "Analgesic"),
+    (("antihistamine",), "Antihistamine"),
+    (("bronchodilator",), "Bronchodilator"),
+]
+
+# Terms suggesting a PubMed abstract describes the mechanism of action
+MECHANISM_HINT_TERMS = ["mechanism", "pharmacology", "receptor", "binding", "agonist", "antagonist"]
+
+# Drug type from the mechanism, checked in order; every group of a rule must have at least one term present
+DRUG_TYPE_RULES = [
+    ((("serotonin-dopamine",),), "Serotonin-Dopamine Activity Modulators (SDAMs)"),
+    ((("partial agonist",), ("antagonist",)), "Partial Agonist-Antagonist"),
+    ((("serotonin", "5-ht"),), "Serotonergic Agent"),
+    ((("dopamine", "d2"),), "Dopaminergic Agent"),
+    ((("cholinergic", "acetylcholine"),), "Cholinergic Agent"),
+    ((("gaba",),), "GABAergic Agent"),
+    ((("histamine", "h1"),), "Histaminergic Agent"),
+    ((("adrenergic", "norepinephrine"),), "Adrenergic Agent"),
+    ((("inhibit",), ("reuptake",)), "Reuptake Inhibitor"),
+]
+
+# Common CNS drug targets: (receptor, family, family adjective)
+RECEPTOR_KEYWORDS = [
+    ("D2", "dopamine", "dopaminergic"),
+    ("5-HT1A", "serotonin", "serotonergic"),
+    ("5-HT2A", "serotonin", "serotonergic"),
+    ("α1", "adrenergic", "noradrenergic"),
+    ("α2", "adrenergic", "noradrenergic"),
+    ("H1", "histamine", "histaminergic"),
+    ("M1", "muscarinic", "cholinergic"),
+    ("GABA", "GABA", "GABAergic"),
+    ("NMDA", "glutamate", "glutamatergic"),
+    ("NK1", "neurokinin", "neurokininergic"),
+    ("μ-opioid", "opioid", "opioidergic"),
+    ("κ-opioid", "opioid", "opioidergic"),
+    ("δ-opioid", "opioid", "opioidergic")
+]
+
+# Activity at the target, in order of precedence
+ACTIVITY_TYPES = ["agonist", "antagonist", "partial agonist", "inverse agonist", "modulator", "inhibitor"]
+
+# Transporters inferred for reuptake inhibitors when no receptor is named
+TRANSPORTER_KEYWORDS = [
+    (("serotonin", "5-ht"), "SERT", "Serotonin Transporters"),
+    (("dopamine",), "DAT", "Dopamine Transporters"),
+    (("norepinephrine", "noradrenaline"), "NET", "Norepinephrine Transporters"),
+]
+
+# Common condition keywords by therapeutic area, checked in order
+THERAPEUTIC_AREA_KEYWORDS = {
+    "Psychiatric Disorders": ["depression", "schizophrenia", "bipolar", "anxiety", "ocd", "adhd", "insomnia",
+                              "psychiatric", "mental", "psychosis", "psychotic", "mood"],
+    "Neurological Disorders": ["alzheimer", "parkinson", "huntington", "dementia", "epilepsy", "seizure",
+                               "multiple sclerosis", "migraine", "headache", "stroke", "cerebral", "brain", "neural",
+                               "neuron", "neuropathic", "neurological"],
+    "Cardiovascular Disorders": ["heart", "cardiac", "cardio", "hypertension", "blood pressure", "arrhythmia",
+                                 "stroke", "cholesterol", "lipid", "angina", "myocardial", "thrombosis", "embolism",
+                                 "vascular"],
+    "Respiratory Disorders": ["asthma", "copd", "bronchitis", "pneumonia", "respiratory", "pulmonary", "lung",
+                              "breath", "breathing", "airway", "bronchial"],
+    "Infectious Diseases": ["infection", "bacterial", "viral", "fungal", "pathogen", "antibiotic", "antimicrobial",
+                            "antiviral", "antifungal", "hiv", "aids", "herpes", "hepatitis"],
+    "Metabolic Disorders": ["diabetes", "thyroid", "metabolism", "metabolic", "obesity", "weight", "glycemic",
+                            "hyperglycemia", "hyperlipidemia", "insulin", "gout"],
+    "Oncology": ["cancer", "tumor", "carcinoma", "sarcoma", "lymphoma", "leukemia", "melanoma", "oncology",
+                 "malignant", "neoplasm"],
+    "Immune Disorders": ["immune", "autoimmune", "allergy", "allergic", "arthritis", "rheumatoid", "psoriasis",
+                         "inflammation", "inflammatory", "transplant"]
+}
+
+# Receptors named by mechanism terms in the ontology relationships
+MECHANISM_TARGET_TERMS = {
+    "dopamine": "Dopamine D2 Receptor",
+    "d2": "Dopamine D2 Receptor",
+    "serotonin": "Serotonin Receptor",
+    "5-ht1a": "Serotonin 5-HT1A Receptor",
+    "5-ht2a": "Serotonin 5-HT2A Receptor",
+    "adrenergic": "Adrenergic Receptor",
+    "alpha1": "Alpha-1 Adrenergic Receptor",
+    "alpha2": "Alpha-2 Adrenergic Receptor",
+    "histamine": "Histamine Receptor",
+    "h1": "Histamine H1 Receptor",
+    "muscarinic": "Muscarinic Receptor",
+    "gaba": "GABA Receptor",
+    "nmda": "NMDA Glutamate Receptor",
+    "opioid": "Opioid Receptor"
+}
+
+# Adverse effects picked out of trial safety summaries
+ADVERSE_EFFECT_TERMS = ["akathisia", "weight gain", "sedation", "insomnia", "headache", "nausea",
+                        "dizziness", "constipation", "diarrhea", "fatigue", "rash", "hypotension"]
+
+# Metabolizing enzymes named in PubMed abstracts
+METABOLISM_TERMS = ["metabolized", "cyp", "cyp3a4", "3a4", "cyp2d6", "2d6"]
+
+# Terms showing that a mechanism of action describes receptor binding
+RECEPTOR_MENTION_TERMS = ['receptor', 'bind', 'agonist', 'antagonist', 'serotonin', 'dopamine',
+                          'adrenergic', 'histamine', 'muscarinic', 'nmda', 'gaba']
+
+# Receptor systems listed in the binding profile of the enhanced markdown
+BINDING_PROFILE_TARGETS = [
+    (('dopamine', 'd2'), "Dopamine D2 receptors"),
+    (('serotonin', '5-ht'), "Serotonin (5-HT) receptors"),
+    (('adrenergic', 'norepinephrine'), "Adrenergic receptors"),
+    (('histamine', 'h1'), "Histamine receptors"),
+    (('muscarinic', 'acetylcholine'), "Muscarinic receptors"),
+    (('gaba',), "GABA receptors"),
+    (('nmda', 'glutamate'), "Glutamate receptors"),
+]
+
+
+def _table_keywords():
+    """Yield every keyword of the tables above."""
+    for keywords, _ in DRUG_CLASS_KEYWORDS:
+        yield from keywords
+    yield "atypical"
+    yield from MECHANISM_HINT_TERMS
+    for groups, _ in DRUG_TYPE_RULES:
+        for group in groups:
+            yield from group
+    for receptor_terms in RECEPTOR_KEYWORDS:
+        yield from receptor_terms
+    yield from ACTIVITY_TYPES
+    yield "reuptake inhibitor"
+    for keywords, _, _ in TRANSPORTER_KEYWORDS:
+        yield from keywords
+    for keywords in THERAPEUTIC_AREA_KEYWORDS.values():
+        yield from keywords
+    yield from MECHANISM_TARGET_TERMS
+    yield from ADVERSE_EFFECT_TERMS
+    yield from METABOLISM_TERMS
+    yield from RECEPTOR_MENTION_TERMS
+    for keywords, _ in BINDING_PROFILE_TARGETS:
+        yield from keywords
+
+
+# One automaton over every vocabulary, so each document is scanned once for all classification heuristics
+KEYWORD_MATCHER = KeywordMatcher(_table_keywords())
+
+
+def find_keywords(text):
+    """Return the set of table keywords occurring in text (case-insensitive)."""
+    return KEYWORD_MATCHER.scan(text or "")
+
+
+def format_phase(phase):
+    """Format a trial phase, e.g. the ClinicalTrials.gov codes PHASE3 and EARLY_PHASE1, for display."""
+    if not phase or phase in ("Unknown", "NA", "N/A"):
+        return "Unknown"
+    return re.sub(r'(?i)phase\s*(\d)', r'Phase \1', phase.replace("_", " ")).replace("EARLY", "Early")
+
+
+def split_label_indications(section):
+    """
+    Split the indications section of a label into individual indications.
+    Section headings (e.g. "1 INDICATIONS AND USAGE") and "... is indicated for:" lead-ins are stripped
+    from each item, so neither is mistaken for an indication.
+    """
+    indications = []
+    subsection_headings = []
+    for part in re.split(r'\n+|(?:^|\s)\d+\.\s+|\•\s*|\*\s*', section):
+        part = part.strip().lstrip(":").strip()
+        numbered = re.match(r'^\d+(?:\.\d+)*\s+', part)
+        part = re.sub(r'^\d+(?:\.\d+)*\.?\s+', '', part)
+        part = re.sub(r'^INDICATIONS\s+(?:AND|&)\s+USAGE\b\s*', '', part, flags=re.IGNORECASE)
+        part = re.sub(r'^.*?\bindicated\s+(?:for|as|in)\b\s*:?\s*', '', part, flags=re.IGNORECASE)
+        if not part or part in [":", ";"]:
+            continue
+        # A numbered subsection heading ("1.1 Schizophrenia") repeats the text under it
+        if numbered:
+            subsection_headings.append(part)
+        else:
+            indications.append(part)
+    return indications or subsection_headings
+
+
+# Number of built ontologies kept in memory; the least recently used are evicted beyond it
+ONTOLOGY_CACHE_SIZE = int(os.getenv("ONTOLOGY_CACHE_SIZE", "256"))
+
+_ontology_cache = OrderedDict()
+_ontology_cache_lock = threading.Lock()
+
+
+def ontology_key(drug_data):
+    """Return a stable hash of every profile field that build_ontology reads."""
+    identifiers = drug_data.get("identifiers", {})
+    content = {
+        "asset_name": drug_data.get("asset_name", ""),
+        "brand_name": identifiers.get("brand_name", ""),
+        "manufacturer": identifiers.get("manufacturer", ""),
+        "chemical_formula": identifiers.get("chemical_formula", ""),
+        "drug_class": drug_data.get("approval_status", {}).get("drug_class", ""),
+        "mechanism": drug_data.get("mechanism_of_action", ""),
+        "indications": list(drug_data.get("indications", [])),
+        "safety": [evidence.get("safety") for evidence in drug_data.get("clinical_evidence", [])
+                   if isinstance(evidence, Mapping)],
+        "pubmed": [article.get("text", "") for article in drug_data.get("pubmed", [])]
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
 
 
 class DrugOntologyBuilder:
     """Builds drug ontologies and taxonomies."""
 
     def build_ontology(self, drug_data):
-        """Build a comprehensive ontology structure for a drug based on its profile data."""
+        """
+        Build a comprehensive ontology structure for a drug based on its profile data.
+        Ontologies are memoized process-wide by a hash of the fields they depend on, so regenerating an
+        unchanged asset reuses the earlier result; callers must treat it as read-only.
+        """
+        key = ontology_key(drug_data)
+        with _ontology_cache_lock:
+            if key in _ontology_cache:
+                _ontology_cache.move_to_end(key)
+                return _ontology_cache[key]
+
+        ontology = self._build_ontology(drug_data)
+
+        with _ontology_cache_lock:
+            _ontology_cache[key] = ontology
+            while len(_ontology_cache) > ONTOLOGY_CACHE_SIZE:
+                _ontology_cache.popitem(last=False)
+        return ontology
+
+    def _build_ontology(self, drug_data):
+        """Build the ontology structure without consulting the cache."""
         drug_name = drug_data.get("asset_name", "")
         brand_name = drug_data.get("identifiers", {}).get("brand_name", "")
 
@@ -66,176 +310,45 @@ class DrugOntologyBuilder:
 
     def _extract_drug_type(self, mechanism):
         """Extract drug type based on mechanism description."""
-        if "serotonin-dopamine" in mechanism.lower():
-            return "Serotonin-Dopamine Activity Modulators (SDAMs)"
-        elif "partial agonist" in mechanism.lower() and "antagonist" in mechanism.lower():
-            return "Partial Agonist-Antagonist"
-        elif "serotonin" in mechanism.lower() or "5-ht" in mechanism.lower():
-            return "Serotonergic Agent"
-        elif "dopamine" in mechanism.lower() or "d2" in mechanism.lower():
-            return "Dopaminergic Agent"
-        elif "cholinergic" in mechanism.lower() or "acetylcholine" in mechanism.lower():
-            return "Cholinergic Agent"
-        elif "gaba" in mechanism.lower():
-            return "GABAergic Agent"
-        elif "histamine" in mechanism.lower() or "h1" in mechanism.lower():
-            return "Histaminergic Agent"
-        elif "adrenergic" in mechanism.lower() or "norepinephrine" in mechanism.lower():
-            return "Adrenergic Agent"
-        elif "inhibit" in mechanism.lower() and "reuptake" in mechanism.lower():
-            return "Reuptake Inhibitor"
-        else:
-            return "Novel Agent"
+        hits = find_keywords(mechanism)
+        for groups, drug_type in DRUG_TYPE_RULES:
+            if all(any(term in hits for term in group) for group in groups):
+                return drug_type
+        return "Novel Agent"
 
     def _extract_targets(self, mechanism):
         """Extract receptor targets from mechanism description."""
         targets = []
+        hits = find_keywords(mechanism)
 
-        # Check for common CNS drug targets
-        receptor_keywords = [
-            ("D2", "dopamine", "dopaminergic"),
-            ("5-HT1A", "serotonin", "serotonergic"),
-            ("5-HT2A", "serotonin", "serotonergic"),
-            ("α1", "adrenergic", "noradrenergic"),
-            ("α2", "adrenergic", "noradrenergic"),
-            ("H1", "histamine", "histaminergic"),
-            ("M1", "muscarinic", "cholinergic"),
-            ("GABA", "GABA", "GABAergic"),
-            ("NMDA", "glutamate", "glutamatergic"),
-            ("NK1", "neurokinin", "neurokininergic"),
-            ("μ-opioid", "opioid", "opioidergic"),
-            ("κ-opioid", "opioid", "opioidergic"),
-            ("δ-opioid", "opioid", "opioidergic")
-        ]
+        # Find the activity type
+        activity = next((act_type for act_type in ACTIVITY_TYPES if act_type in hits), "unknown")
 
-        activity_types = ["agonist", "antagonist", "partial agonist", "inverse agonist", "modulator", "inhibitor"]
-
-        for receptor_terms in receptor_keywords:
-            for term in receptor_terms:
-                if term.lower() in mechanism.lower():
-                    # Find the activity type
-                    activity = "unknown"
-                    for act_type in activity_types:
-                        if act_type.lower() in mechanism.lower():
-                            activity = act_type
-                            break
-
-                    # Add the target
-                    targets.append({
-                        "receptor": receptor_terms[0],
-                        "family": receptor_terms[1].capitalize() + " Receptors",
-                        "activity": activity.capitalize()
-                    })
-                    break
+        # Check for common CNS drug targets
+        for receptor_terms in RECEPTOR_KEYWORDS:
+            if any(term.lower() in hits for term in receptor_terms):
+                targets.append(Target(receptor_terms[0], receptor_terms[1].capitalize() + " Receptors",
+                                      activity.capitalize()))
 
         # If no specific targets found, try to infer from common terms
-        if not targets:
-            if "reuptake inhibitor" in mechanism.lower():
-                if "serotonin" in mechanism.lower() or "5-ht" in mechanism.lower():
-                    targets.append({
-                        "receptor": "SERT",
-                        "family": "Serotonin Transporters",
-                        "activity": "Inhibitor"
-                    })
-                if "dopamine" in mechanism.lower():
-                    targets.append({
-                        "receptor": "DAT",
-                        "family": "Dopamine Transporters",
-                        "activity": "Inhibitor"
-                    })
-                if "norepinephrine" in mechanism.lower() or "noradrenaline" in mechanism.lower():
-                    targets.append({
-                        "receptor": "NET",
-                        "family": "Norepinephrine Transporters",
-                        "activity": "Inhibitor"
-                    })
+        if not targets and "reuptake inhibitor" in hits:
+            for keywords, transporter, family in TRANSPORTER_KEYWORDS:
+                if any(keyword in hits for keyword in keywords):
+                    targets.append(Target(transporter, family, "Inhibitor"))
 
         return targets
 
     def _extract_therapeutic_areas(self, indications):
         """Extract therapeutic areas from indications."""
-        psychiatric = []
-        neurological = []
-        cardiovascular = []
-        respiratory = []
-        infectious = []
-        metabolic = []
-        oncology = []
-        immune = []
-        other = []
-
-        # Common condition keywords by therapeutic area
-        condition_categories = {
-            "psychiatric": ["depression", "schizophrenia", "bipolar", "anxiety", "ocd", "adhd", "insomnia",
-                            "psychiatric", "mental", "psychosis", "psychotic", "mood"],
-            "neurological": ["alzheimer", "parkinson", "huntington", "dementia", "epilepsy", "seizure",
-                             "multiple sclerosis", "migraine", "headache", "stroke", "cerebral", "brain", "neural",
-                             "neuron", "neuropathic", "neurological"],
-            "cardiovascular": ["heart", "cardiac", "cardio", "hypertension", "blood pressure", "arrhythmia", "stroke",
-                               "cholesterol", "lipid", "angina", "myocardial", "thrombosis", "embolism", "vascular"],
-            "respiratory": ["asthma", "copd", "bronchitis", "pneumonia", "respiratory", "pulmonary", "lung", "breath",
-                            "breathing", "airway", "bronchial"],
-            "infectious": ["infection", "bacterial", "viral", "fungal", "pathogen", "antibiotic", "antimicrobial",
-                           "antiviral", "antifungal", "hiv", "aids", "herpes", "hepatitis"],
-            "metabolic": ["diabetes", "thyroid", "metabolism", "metabolic", "obesity", "weight", "glycemic",
-                          "hyperglycemia", "hyperlipidemia", "insulin", "gout"],
-            "oncology": ["cancer", "tumor", "carcinoma", "sarcoma", "lymphoma", "leukemia", "melanoma", "oncology",
-                         "malignant", "neoplasm"],
-            "immune": ["immune", "autoimmune", "allergy", "allergic", "arthritis", "rheumatoid", "psoriasis",
-                       "inflammation", "inflammatory", "transplant"]
-        }
-
+        areas = {}
         for indication in indications:
-            indication_lower = indication.lower()
-
-            # Check which category the indication belongs to
-            matched = False
-            for category, keywords in condition_categories.items():
-                if any(keyword in indication_lower for keyword in keywords):
-                    if category == "psychiatric":
-                        psychiatric.append(indication)
-                    elif category == "neurological":
-                        neurological.append(indication)
-                    elif category == "cardiovascular":
-                        cardiovascular.append(indication)
-                    elif category == "respiratory":
-                        respiratory.append(indication)
-                    elif category == "infectious":
-                        infectious.append(indication)
-                    elif category == "metabolic":
-                        metabolic.append(indication)
-                    elif category == "oncology":
-                        oncology.append(indication)
-                    elif category == "immune":
-                        immune.append(indication)
-                    matched = True
-                    break
+            # Check which category the indication belongs to; if none, add it to other
+            hits = find_keywords(indication)
+            area = next((area for area, keywords in THERAPEUTIC_AREA_KEYWORDS.items()
+                         if any(keyword in hits for keyword in keywords)), "Other Conditions")
+            areas.setdefault(area, []).append(indication)
 
-            # If not matched to any category, add to other
-            if not matched:
-                other.append(indication)
-
-        result = {}
-        if psychiatric:
-            result["Psychiatric Disorders"] = psychiatric
-        if neurological:
-            result["Neurological Disorders"] = neurological
-        if cardiovascular:
-            result["Cardiovascular Disorders"] = cardiovascular
-        if respiratory:
-            result["Respiratory Disorders"] = respiratory
-        if infectious:
-            result["Infectious Diseases"] = infectious
-        if metabolic:
-            result["Metabolic Disorders"] = metabolic
-        if oncology:
-            result["Oncology"] = oncology
-        if immune:
-            result["Immune Disorders"] = immune
-        if other:
-            result["Other Conditions"] = other
-
-        return result
+        return {area: areas[area] for area in list(THERAPEUTIC_AREA_KEYWORDS) + ["Other Conditions"] if area in areas}
 
     def _extract_chemical_class(self, drug_data):
         """Extract chemical classification data."""
@@ -347,11 +460,15 @@ class DrugOntologyBuilder:
                 {"name": "cariprazine", "relation_type": "functional analog"}
             ]
 
+        if not related_compounds:
+            related_compounds = self._identify_related_compounds(drug_name)
+
         return {
             "structure_type": structure_type,
             "chemical_class": chemical_class,
             "formula": formula,
-            "related_compounds": related_compounds if related_compounds else self._identify_related_compounds(drug_name)
+            "related_compounds": [RelatedCompound(compound["name"], compound["relation_type"])
+                                  for compound in related_compounds]
         }
 
     def _identify_related_compounds(self, drug_name):
@@ -459,25 +576,9 @@ class DrugOntologyBuilder:
             })
 
         # Add mechanism relationships based on mechanism text
-        mechanism_terms = {
-            "dopamine": "Dopamine D2 Receptor",
-            "d2": "Dopamine D2 Receptor",
-            "serotonin": "Serotonin Receptor",
-            "5-ht1a": "Serotonin 5-HT1A Receptor",
-            "5-ht2a": "Serotonin 5-HT2A Receptor",
-            "adrenergic": "Adrenergic Receptor",
-            "alpha1": "Alpha-1 Adrenergic Receptor",
-            "alpha2": "Alpha-2 Adrenergic Receptor",
-            "histamine": "Histamine Receptor",
-            "h1": "Histamine H1 Receptor",
-            "muscarinic": "Muscarinic Receptor",
-            "gaba": "GABA Receptor",
-            "nmda": "NMDA Glutamate Receptor",
-            "opioid": "Opioid Receptor"
-        }
-
-        for term, receptor in mechanism_terms.items():
-            if term.lower() in mechanism.lower():
+        hits = find_keywords(mechanism)
+        for term, receptor in MECHANISM_TARGET_TERMS.items():
+            if term in hits:
                 relationships.append({
                     "type": "has_target",
                     "subject": drug_name,
@@ -485,28 +586,28 @@ class DrugOntologyBuilder:
                 })
 
         # Add activity relationships
-        if "partial agonist" in mechanism.lower():
+        if "partial agonist" in hits:
             relationships.append({
                 "type": "has_mechanism",
                 "subject": drug_name,
                 "object": "Partial Agonism"
             })
 
-        if "antagonist" in mechanism.lower():
+        if "antagonist" in hits:
             relationships.append({
                 "type": "has_mechanism",
                 "subject": drug_name,
                 "object": "Antagonism"
             })
 
-        if "agonist" in mechanism.lower() and "partial agonist" not in mechanism.lower():
+        if "agonist" in hits and "partial agonist" not in hits:
             relationships.append({
                 "type": "has_mechanism",
                 "subject": drug_name,
                 "object": "Agonism"
             })
 
-        if "inhibit" in mechanism.lower() and "reuptake" in mechanism.lower():
+        if "inhibit" in hits and "reuptake" in hits:
             relationships.append({
                 "type": "has_mechanism",
                 "subject": drug_name,
@@ -515,19 +616,19 @@ class DrugOntologyBuilder:
 
         # Add common adverse effects
         for evidence in drug_data.get("clinical_evidence", []):
-            if isinstance(evidence, dict) and "safety" in evidence:
+            if isinstance(evidence, Mapping) and "safety" in evidence:
                 safety_info = evidence["safety"]
                 if isinstance(safety_info, str):
-                    for effect in ["akathisia", "weight gain", "sedation", "insomnia", "headache", "nausea",
-                                   "dizziness", "constipation", "diarrhea", "fatigue", "rash", "hypotension"]:
-                        if effect in safety_info.lower():
+                    safety_hits = find_keywords(safety_info)
+                    for effect in ADVERSE_EFFECT_TERMS:
+                        if effect in safety_hits:
                             relationships.append({
                                 "type": "has_adverse_effect",
                                 "subject": drug_name,
                                 "object": effect.title()
                             })
 
-        return relationships
+        return [Relationship(rel["type"], rel["subject"], rel["object"]) for rel in relationships]
 
     def _build_semantic_network(self, drug_data):
         """Build a semantic network representation for visualization."""
@@ -543,20 +644,20 @@ class DrugOntologyBuilder:
             network += "                │─"
 
         # Add mechanisms
-        mechanism = drug_data.get("mechanism_of_action", "")
+        hits = find_keywords(drug_data.get("mechanism_of_action", ""))
         mechanisms_added = 0
 
-        if "d2" in mechanism.lower() or "dopamine" in mechanism.lower():
+        if "d2" in hits or "dopamine" in hits:
             network += "[acts_on]→[Dopamine D2 Receptor]\n"
             network += "                │─"
             mechanisms_added += 1
 
-        if "5-ht1a" in mechanism.lower() or "serotonin" in mechanism.lower():
+        if "5-ht1a" in hits or "serotonin" in hits:
             network += "[acts_on]→[Serotonin 5-HT1A Receptor]\n"
             network += "                │─"
             mechanisms_added += 1
 
-        if "5-ht2a" in mechanism.lower() and mechanisms_added < 3:
+        if "5-ht2a" in hits and mechanisms_added < 3:
             network += "[acts_on]→[Serotonin 5-HT2A Receptor]\n"
             network += "                │─"
             mechanisms_added += 1
@@ -575,16 +676,17 @@ class DrugOntologyBuilder:
         # Add metabolism if available
         metabolism_added = False
         for pubmed in drug_data.get("pubmed", []):
-            if "metabolized" in pubmed.get("text", "").lower() or "cyp" in pubmed.get("text", "").lower():
-                if "cyp3a4" in pubmed.get("text", "").lower() or "3a4" in pubmed.get("text", "").lower():
+            pubmed_hits = find_keywords(pubmed.get("text", ""))
+            if "metabolized" in pubmed_hits or "cyp" in pubmed_hits:
+                if "cyp3a4" in pubmed_hits or "3a4" in pubmed_hits:
                     network += "[metabolized_by]→[CYP3A4]\n                "
                     metabolism_added = True
-                    if "cyp2d6" in pubmed.get("text", "").lower() or "2d6" in pubmed.get("text", "").lower():
+                    if "cyp2d6" in pubmed_hits or "2d6" in pubmed_hits:
                         network += "└─[metabolized_by]→[CYP2D6]"
                     else:
                         network = network[:-17]  # Remove the last line continuation
                     break
-                elif "cyp2d6" in pubmed.get("text", "").lower() or "2d6" in pubmed.get("text", "").lower():
+                elif "cyp2d6" in pubmed_hits or "2d6" in pubmed_hits:
                     network += "[metabolized_by]→[CYP2D6]"
                     metabolism_added = True
                     break
@@ -606,8 +708,12 @@ class DrugAssetProfileGenerator:
         """Initialize the asset profile generator."""
         self.ontology_builder = DrugOntologyBuilder()
 
-    def generate_asset_profile(self, asset_name, source_data):
-        """Generate a comprehensive asset profile for the specified drug."""
+    def generate_asset_profile(self, asset_name, source_data, partial=False):
+        """
+        Generate a comprehensive asset profile for the specified drug.
+        A partial profile, previewed while sources are still landing, has no ontology, so the
+        ontology cache only ever holds complete profiles.
+        """
         # Start building the profile
         profile = {
             "asset_name": asset_name,
@@ -626,23 +732,31 @@ class DrugAssetProfileGenerator:
         manufacturer = "Unknown"
         bla_nda = "Unknown"
 
-        # Extract info from FDA data text
+        # Use the structured FDA fields, or extract them from the text of records without fields
         fda_text = fda_data.get("text", "")
-        if "Approved by FDA on" in fda_text:
-            approval_date = fda_text.split("Approved by FDA on")[1].split(".")[0].strip()
-        if "Manufacturer:" in fda_text:
-            manufacturer = fda_text.split("Manufacturer:")[1].split(".")[0].strip()
-        if "BLA/NDA Number:" in fda_text:
-            bla_nda = fda_text.split("BLA/NDA Number:")[1].split(".")[0].strip()
-
-        # Extract chemical formula from any available source
-        formula = "Not Available"
+        fda_fields = fda_data.get("fields")
+        if fda_fields:
+            approval_date = fda_fields.get("approval_date", approval_date)
+            manufacturer = fda_fields.get("sponsor", manufacturer)
+            bla_nda = fda_fields.get("application_number", bla_nda)
+        else:
+            if "Approved by FDA on" in fda_text:
+                approval_date = fda_text.split("Approved by FDA on")[1].split(".")[0].strip()
+            if "Manufacturer:" in fda_text:
+                manufacturer = fda_text.split("Manufacturer:")[1].split(".")[0].strip()
+            if "BLA/NDA Number:" in fda_text:
+                bla_nda = fda_text.split("BLA/NDA Number:")[1].split(".")[0].strip()
+
+        # Extract chemical formula from any available source, preferring structured chemical fields
+        formula = next((entry["fields"]["formula"] for entry in source_data.get("pubmed", [])
+                        if entry.get("fields", {}).get("formula") not in (None, "", "Not available")),
+                       "Not Available")
 
         # Check in FDA data
-        fda_text = source_data.get("fda_purple_book", {}).get("text", "")
-        formula_match = re.search(r'Chemical Formula:?\s*([A-Za-z0-9]+)', fda_text)
-        if formula_match:
-            formula = formula_match.group(1)
+        if formula == "Not Available":
+            formula_match = re.search(r'Chemical Formula:?\s*([A-Za-z0-9]+)', fda_text)
+            if formula_match:
+                formula = formula_match.group(1)
 
         # If not found, check in DailyMed data
         if formula == "Not Available":
@@ -660,68 +774,46 @@ class DrugAssetProfileGenerator:
                     formula = formula_match.group(1)
                     break
 
-        profile["identifiers"] = {
-            "brand_name": brand_name,
-            "generic_name": asset_name.lower(),
-            "approval_date": approval_date,
-            "manufacturer": manufacturer,
-            "bla_nda": bla_nda,
-            "chemical_formula": formula
-        }
+        profile["identifiers"] = Identifiers(
+            brand_name=brand_name,
+            generic_name=asset_name.lower(),
+            approval_date=approval_date,
+            manufacturer=manufacturer,
+            bla_nda=bla_nda,
+            chemical_formula=formula
+        )
 
         # Process approval status
         status = "Unknown"
-        if "Current Regulatory Status:" in fda_text:
+        if fda_fields:
+            status = fda_fields.get("regulatory_status", status)
+        elif "Current Regulatory Status:" in fda_text:
             status = fda_text.split("Current Regulatory Status:")[1].strip().rstrip(".")
 
         # Try to determine drug class from DailyMed data
         daily_med_data = source_data.get("daily_med", {})
         daily_med_text = daily_med_data.get("text", "")
+        daily_med_fields = daily_med_data.get("fields", {})
 
-        drug_class = "Pharmaceutical Agent"
-        if "antipsychotic" in daily_med_text.lower():
-            drug_class = "Atypical Antipsychotic" if "atypical" in daily_med_text.lower() else "Antipsychotic"
-        elif "antidepressant" in daily_med_text.lower():
-            drug_class = "Antidepressant"
-        elif "anxiolytic" in daily_med_text.lower():
-            drug_class = "Anxiolytic"
-        elif "hypnotic" in daily_med_text.lower() or "sedative" in daily_med_text.lower():
-            drug_class = "Sedative-Hypnotic"
-        elif "mood stabilizer" in daily_med_text.lower():
-            drug_class = "Mood Stabilizer"
-        elif "stimulant" in daily_med_text.lower():
-            drug_class = "Stimulant"
-        elif "anticonvulsant" in daily_med_text.lower() or "antiepileptic" in daily_med_text.lower():
-            drug_class = "Anticonvulsant"
-        elif "antimicrobial" in daily_med_text.lower() or "antibiotic" in daily_med_text.lower():
-            drug_class = "Antimicrobial"
-        elif "antiviral" in daily_med_text.lower():
-            drug_class = "Antiviral"
-        elif "antifungal" in daily_med_text.lower():
-            drug_class = "Antifungal"
-        elif "antihypertensive" in daily_med_text.lower():
-            drug_class = "Antihypertensive"
-        elif "antineoplastic" in daily_med_text.lower() or "anticancer" in daily_med_text.lower():
-            drug_class = "Antineoplastic"
-        elif "anti-inflammatory" in daily_med_text.lower():
-            drug_class = "Anti-inflammatory"
-        elif "analgesic" in daily_med_text.lower() or "pain" in daily_med_text.lower():
-            drug_class = "Analgesic"
-        elif "antihistamine" in daily_med_text.lower():
-            drug_class = "Antihistamine"
-        elif "bronchodilator" in daily_med_text.lower():
-            drug_class = "Bronchodilator"
-
-        profile["approval_status"] = {
-            "status": status,
-            "drug_class": drug_class,
-            "type": "New Molecular Entity" if "New Molecular Entity" in fda_text else "Approved Drug"
-        }
+        label_hits = find_keywords(daily_med_text)
+        drug_class = next((class_name for keywords, class_name in DRUG_CLASS_KEYWORDS
+                           if any(keyword in label_hits for keyword in keywords)), "Pharmaceutical Agent")
+        if drug_class == "Antipsychotic" and "atypical" in label_hits:
+            drug_class = "Atypical Antipsychotic"
+
+        profile["approval_status"] = ApprovalStatus(
+            status=status,
+            drug_class=drug_class,
+            type="New Molecular Entity" if "New Molecular Entity" in fda_text else "Approved Drug"
+        )
 
         # Process indications
         # Extract indications from DailyMed text
         indications = []
-        if "indicated for" in daily_med_text.lower():
+        label_indications = daily_med_fields.get("indications", "")
+        if label_indications and "Indications not available" not in label_indications:
+            indications = split_label_indications(label_indications)
+        elif "indicated for" in daily_med_text.lower():
             ind_text = daily_med_text.split("indicated for")[1].split(".")[0].strip()
             # Split by numbers or bullets
             ind_parts = re.split(r'\d+\.\s*|\•\s*|\*\s*', ind_text)
@@ -751,7 +843,10 @@ class DrugAssetProfileGenerator:
 
         # Process mechanism of action
         mechanism = ""
-        if "Mechanism of Action" in daily_med_text:
+        label_mechanism = daily_med_fields.get("mechanism_of_action", "")
+        if label_mechanism and "Mechanism of action not available" not in label_mechanism:
+            mechanism = label_mechanism.strip()
+        elif "Mechanism of Action" in daily_med_text:
             mech_text = daily_med_text.split("Mechanism of Action:")[1].strip()
             # Take everything up to the next major section
             mechanism = mech_text.split(".")[0] + "."
@@ -760,13 +855,11 @@ class DrugAssetProfileGenerator:
         if not mechanism:
             for article in source_data.get("pubmed", []):
                 article_text = article.get("text", "")
-                if any(term in article_text.lower() for term in
-                       ["mechanism", "pharmacology", "receptor", "binding", "agonist", "antagonist"]):
+                if any(term in find_keywords(article_text) for term in MECHANISM_HINT_TERMS):
                     # Extract relevant sentences
                     sentences = re.split(r'\.', article_text)
                     relevant_sentences = [s for s in sentences if any(term in s.lower() for term in
-                                                                      ["mechanism", "pharmacology", "receptor",
-                                                                       "binding", "agonist", "antagonist"])]
+                                                                      MECHANISM_HINT_TERMS)]
                     if relevant_sentences:
                         mechanism = '. '.join(relevant_sentences) + '.'
                         break
@@ -778,93 +871,112 @@ class DrugAssetProfileGenerator:
         for i, trial in enumerate(clinical_trials):
             trial_text = trial.get("text", "")
             trial_id = trial.get("trial_id", f"Unknown-{i + 1}")
-
-            # Extract phase
-            phase = "Unknown"
-            phase_match = re.search(r'Phase (\d+)', trial_text, re.IGNORECASE)
-            if phase_match:
-                phase = f"Phase {phase_match.group(1)}"
-
-            # Extract population
-            population = "Unknown"
-            if "in" in trial_text and "study" in trial_text:
-                population_match = re.search(r'in ([^\.]+)', trial_text)
-                if population_match:
-                    population = population_match.group(1).strip()
-
-            # Extract results
-            results = "Results not available"
-            if "Results:" in trial_text:
-                results_match = re.search(r'Results: ([^\.]+)', trial_text)
-                if results_match:
-                    results = results_match.group(1).strip()
-
-            # Extract safety information
-            safety = "Safety information not available"
-            if "Safety:" in trial_text:
-                safety_match = re.search(r'Safety: ([^\.]+)', trial_text)
-                if safety_match:
-                    safety = safety_match.group(1).strip()
-
-            # If no specific safety information, look for common terms
-            if safety == "Safety information not available":
-                common_adverse_events = ["adverse", "reaction", "side effect", "tolerability"]
-                for term in common_adverse_events:
-                    if term in trial_text.lower():
-                        safety_section = trial_text.split(term)[1].split(".")[0]
-                        if safety_section:
-                            safety = f"Adverse effects may include: {safety_section.strip()}"
-                            break
-
-            profile["clinical_evidence"].append({
-                "trial_name": f"Study {trial_id}",
-                "phase": phase,
-                "population": population,
-                "key_results": results,
-                "safety": safety
-            })
+            fields = trial.get("fields")
+            enrollment = None
+
+            if fields:
+                # Structured trial fields carry the full population and results, not the truncated text
+                phase = format_phase(fields.get("phase", "Unknown"))
+                population = fields.get("population") or "Unknown"
+                results = fields.get("results") or "Results not available"
+                safety = fields.get("safety") or "Safety information not available"
+                enrollment = fields.get("enrollment")
+            else:
+                # Extract phase
+                phase = "Unknown"
+                phase_match = re.search(r'Phase (\d+)', trial_text, re.IGNORECASE)
+                if phase_match:
+                    phase = f"Phase {phase_match.group(1)}"
+
+                # Extract population
+                population = "Unknown"
+                if "in" in trial_text and "study" in trial_text:
+                    population_match = re.search(r'in ([^\.]+)', trial_text)
+                    if population_match:
+                        population = population_match.group(1).strip()
+
+                # Extract results
+                results = "Results not available"
+                if "Results:" in trial_text:
+                    results_match = re.search(r'Results: ([^\.]+)', trial_text)
+                    if results_match:
+                        results = results_match.group(1).strip()
+
+                # Extract safety information
+                safety = "Safety information not available"
+                if "Safety:" in trial_text:
+                    safety_match = re.search(r'Safety: ([^\.]+)', trial_text)
+                    if safety_match:
+                        safety = safety_match.group(1).strip()
+
+                # If no specific safety information, look for common terms
+                if safety == "Safety information not available":
+                    common_adverse_events = ["adverse", "reaction", "side effect", "tolerability"]
+                    for term in common_adverse_events:
+                        if term in trial_text.lower():
+                            safety_section = trial_text.split(term)[1].split(".")[0]
+                            if safety_section:
+                                safety = f"Adverse effects may include: {safety_section.strip()}"
+                                break
+
+            profile["clinical_evidence"].append(Evidence(
+                trial_name=f"Study {trial_id}",
+                phase=phase,
+                population=population,
+                key_results=results,
+                safety=safety,
+                enrollment=enrollment or None
+            ))
 
         # If no clinical trials were found, add a placeholder
         if not profile["clinical_evidence"]:
-            profile["clinical_evidence"].append({
-                "trial_name": "No specific trial information available",
-                "phase": "Unknown",
-                "population": "Unknown",
-                "key_results": "No results data available",
-                "safety": "No safety data available"
-            })
+            profile["clinical_evidence"].append(Evidence(
+                trial_name="No specific trial information available",
+                phase="Unknown",
+                population="Unknown",
+                key_results="No results data available",
+                safety="No safety data available"
+            ))
+
+        # Key literature from the structured PubMed fields
+        profile["literature"] = [
+            LiteratureRef(entry["fields"]["pmid"], entry["fields"]["year"], entry["fields"]["title"])
+            for entry in source_data.get("pubmed", []) if entry.get("fields", {}).get("pmid")
+        ]
+
+        # Record sources that did not respond, or were skipped while down, so the profile can flag that it is partial
+        profile["data_gaps"] = [
+            f"{name} ({status})" for name, status in source_data.get("source_status", {}).items()
+            if status not in ("ok", "no data", "not selected")
+        ]
+
+        # The semantic network looks for metabolizing enzymes in the literature
+        profile["pubmed"] = source_data.get("pubmed", [])
 
         # Build ontology and taxonomy
-        drug_ontology = self.ontology_builder.build_ontology(profile)
-        profile["ontology"] = drug_ontology
+        if not partial:
+            profile["ontology"] = self.ontology_builder.build_ontology(profile)
 
         # Format the final profile
         return self._format_profile(profile)
 
     def _format_profile(self, profile):
-        """Format the asset profile for presentation."""
-        formatted = {
-            "Asset Profile": profile["asset_name"],
-            "Identifiers": {
-                "Brand Name": profile["identifiers"].get("brand_name", ""),
-                "Generic Name": profile["identifiers"].get("generic_name", ""),
-                "Approval Date": profile["identifiers"].get("approval_date", ""),
-                "Manufacturer": profile["identifiers"].get("manufacturer", ""),
-                "BLA/NDA Number": profile["identifiers"].get("bla_nda", ""),
-                "Chemical Formula": profile["identifiers"].get("chemical_formula", "")
-            },
-            "Approval Status": {
-                "Status": profile["approval_status"].get("status", ""),
-                "Drug Class": profile["approval_status"].get("drug_class", ""),
-                "Type": profile["approval_status"].get("type", "")
-            },
-            "Indications & Usage": profile["indications"],
-            "Mechanism of Action": profile["mechanism_of_action"],
-            "Clinical Evidence Summary": profile["clinical_evidence"],
-            "Drug Ontology": profile.get("ontology", {})
-        }
-
-        return formatted
+        """
+        Format the asset profile for presentation.
+        The records are shared rather than copied; the AssetProfile reads like the display-keyed dict
+        the markdown generators expect.
+        """
+        return AssetProfile(
+            asset_name=profile["asset_name"],
+            identifiers=profile["identifiers"],
+            approval_status=profile["approval_status"],
+            indications=tuple(profile["indications"]),
+            mechanism_of_action=profile["mechanism_of_action"],
+            clinical_evidence=tuple(profile["clinical_evidence"]),
+            literature=tuple(profile.get("literature", [])),
+            ontology=profile.get("ontology", {}),
+            data_gaps=tuple(profile.get("data_gaps", []))
+        )
 
     def visualize_drug_ontology(self, drug_name, ontology_data):
         """
@@ -929,6 +1041,10 @@ def generate_asset_markdown(profile, visualization):
     # Start with the title
     markdown_text = f"# {profile['Asset Profile']} Asset Profile\n\n"
 
+    # Flag a partial profile when some sources did not respond
+    if profile.get("Data Gaps"):
+        markdown_text += f"> **Partial profile:** no data was received from {', '.join(profile['Data Gaps'])}.\n\n"
+
     # Add identifiers section
     identifiers = profile["Identifiers"]
     markdown_text += "## Identifiers\n\n"
@@ -962,9 +1078,18 @@ def generate_asset_markdown(profile, visualization):
         markdown_text += f"### {evidence['trial_name']}\n\n"
         markdown_text += f"**Phase:** {evidence['phase']}  \n"
         markdown_text += f"**Population:** {evidence['population']}  \n"
+        if evidence.get('enrollment'):
+            markdown_text += f"**Enrollment:** {evidence['enrollment']}  \n"
         markdown_text += f"**Key Results:** {evidence['key_results']}  \n"
         markdown_text += f"**Safety:** {evidence['safety']}  \n\n"
 
+    # Add key literature
+    if profile.get("Key Literature"):
+        markdown_text += "## Key Literature\n\n"
+        for article in profile["Key Literature"]:
+            markdown_text += f"- PMID {article['pmid']} ({article['year']}): {article['title']}\n"
+        markdown_text += "\n"
+
     # Add ontology visualization
     markdown_text += "## Drug Ontology\n\n"
     markdown_text += "### Visualization\n\n"
@@ -1039,6 +1164,10 @@ def generate_enhanced_asset_markdown(profile, visualization, chemical_structure=
     # Start with the title
     markdown_text = f"# {profile['Asset Profile']} Asset Profile\n\n"
 
+    # Flag a partial profile when some sources did not respond
+    if profile.get("Data Gaps"):
+        markdown_text += f"> **Partial profile:** no data was received from {', '.join(profile['Data Gaps'])}.\n\n"
+
     # Add identifiers section
     identifiers = profile["Identifiers"]
     markdown_text += "## Identifiers\n\n"
@@ -1077,9 +1206,8 @@ def generate_enhanced_asset_markdown(profile, visualization, chemical_structure=
 
     # Check if mechanism of action contains receptor information
     moa_text = profile['Mechanism of Action']
-    receptors_mentioned = any(term in moa_text.lower() for term in
-                              ['receptor', 'bind', 'agonist', 'antagonist', 'serotonin', 'dopamine',
-                               'adrenergic', 'histamine', 'muscarinic', 'nmda', 'gaba'])
+    moa_hits = find_keywords(moa_text)
+    receptors_mentioned = any(term in moa_hits for term in RECEPTOR_MENTION_TERMS)
 
     markdown_text += f"{moa_text}\n\n"
 
@@ -1089,21 +1217,8 @@ def generate_enhanced_asset_markdown(profile, visualization, chemical_structure=
         markdown_text += "Based on the mechanism of action, this drug likely interacts with:\n\n"
 
         # Extract potential receptor targets from the mechanism text
-        targets = []
-        if 'dopamine' in moa_text.lower() or 'd2' in moa_text.lower():
-            targets.append("Dopamine D2 receptors")
-        if 'serotonin' in moa_text.lower() or '5-ht' in moa_text.lower():
-            targets.append("Serotonin (5-HT) receptors")
-        if 'adrenergic' in moa_text.lower() or 'norepinephrine' in moa_text.lower():
-            targets.append("Adrenergic receptors")
-        if 'histamine' in moa_text.lower() or 'h1' in moa_text.lower():
-            targets.append("Histamine receptors")
-        if 'muscarinic' in moa_text.lower() or 'acetylcholine' in moa_text.lower():
-            targets.append("Muscarinic receptors")
-        if 'gaba' in moa_text.lower():
-            targets.append("GABA receptors")
-        if 'nmda' in moa_text.lower() or 'glutamate' in moa_text.lower():
-            targets.append("Glutamate receptors")
+        targets = [target for keywords, target in BINDING_PROFILE_TARGETS
+                   if any(keyword in moa_hits for keyword in keywords)]
 
         # Add the targets to the markdown
         if targets:
@@ -1120,9 +1235,18 @@ def generate_enhanced_asset_markdown(profile, visualization, chemical_structure=
         markdown_text += f"### {evidence['trial_name']}\n\n"
         markdown_text += f"**Phase:** {evidence['phase']}  \n"
         markdown_text += f"**Population:** {evidence['population']}  \n"
+        if evidence.get('enrollment'):
+            markdown_text += f"**Enrollment:** {evidence['enrollment']}  \n"
         markdown_text += f"**Key Results:** {evidence['key_results']}  \n"
         markdown_text += f"**Safety:** {evidence['safety']}  \n\n"
 
+    # Add key literature
+    if profile.get("Key Literature"):
+        markdown_text += "## Key Literature\n\n"
+        for article in profile["Key Literature"]:
+            markdown_text += f"- PMID {article['pmid']} ({article['year']}): {article['title']}\n"
+        markdown_text += "\n"
+
     # Add ontology visualization
     markdown_text += "## Drug Ontology\n\n"
     markdown_text += "### Visualization\n\n"
@@ -0,0 +1,159 @@
+import contextvars
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from circuit_breaker import CircuitOpenError, get_circuit_breaker
+from deadline import current_deadline, deadline_scope
+
+
+class SourceUnavailableError(Exception):
+    """Raised by a source fetcher when its upstream could not be queried."""
+
+
+class SourceTimeoutError(SourceUnavailableError):
+    """Recorded for a source that did not finish before the fetch deadline."""
+
+
+class SourceEmptyError(Exception):
+    """Raised by a source fetcher when its upstream answered but had nothing for the drug."""
+
+
+class SourceResult:
+    """Outcome of a single source fetch run by the FetchEngine."""
+
+    def __init__(self, name, value=None, error=None, elapsed=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def timed_out(self):
+        return isinstance(self.error, SourceTimeoutError)
+
+    @property
+    def short_circuited(self):
+        return isinstance(self.error, CircuitOpenError)
+
+    @property
+    def upstream_failed(self):
+        """True if the upstream itself failed, as opposed to answering with no data."""
+        return not self.ok and not isinstance(self.error, (SourceEmptyError, CircuitOpenError))
+
+
+class SourceProgress:
+    """A partial value reported by a running task, delivered to the thread iterating the results."""
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class FetchEngine:
+    """Runs independent source fetchers concurrently and collects their results."""
+
+    def __init__(self, max_workers=8, circuit_breakers=False):
+        """
+        Initialize the engine with an upper bound on concurrent fetches.
+        With circuit_breakers enabled, each task name gets a breaker that skips the source while it is down.
+        """
+        self.max_workers = max_workers
+        self.circuit_breakers = circuit_breakers
+
+    def iter_results(self, tasks, deadline=None, progress=False):
+        """
+        Run the given tasks concurrently and yield a SourceResult as each one completes.
+        Tasks map a source name to a (callable, args) tuple; dependent steps belong inside the callable.
+        Tasks still running when the deadline (or the caller's current deadline) passes are
+        reported as timed out. Circuit breakers are fed as each task finishes, whether or not the
+        caller is still consuming the results.
+        With progress enabled, each callable also receives a report(value) keyword argument, and every
+        reported value is yielded as a SourceProgress on the caller's thread, ahead of the task's result.
+        """
+        if deadline is None:
+            deadline = current_deadline()
+
+        # Sources whose breaker is open fail immediately without being called
+        runnable = {}
+        for name, task in tasks.items():
+            breaker = get_circuit_breaker(name) if self.circuit_breakers else None
+            if breaker is not None and not breaker.allow_request():
+                yield SourceResult(name, error=breaker.open_error())
+            else:
+                runnable[name] = task
+
+        if not runnable:
+            return
+
+        # Finished tasks and progress reports arrive on one queue, in the order they happened
+        events = queue.Queue()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(runnable)),
+                                      thread_name_prefix="fetch")
+        try:
+            # Each task runs in a copy of the caller's context so it inherits the deadline
+            pending = {}
+            for name, (func, args) in runnable.items():
+                kwargs = {"report": self._reporter(name, events)} if progress else {}
+                future = executor.submit(contextvars.copy_context().run, self._timed_call, name, func, args,
+                                         deadline, kwargs)
+                pending[future] = name
+                future.add_done_callback(events.put)
+
+            while pending:
+                try:
+                    event = events.get(timeout=deadline.remaining() if deadline is not None else None)
+                except queue.Empty:
+                    for future, name in pending.items():
+                        timeout = SourceResult(name, error=SourceTimeoutError(
+                            f"{name} did not respond within the {deadline.budget:.1f}s time budget"),
+                            elapsed=deadline.budget)
+                        # Tasks still running record their own outcome when they finish
+                        if future.cancel():
+                            self._record(timeout)
+                        yield timeout
+                    return
+                if isinstance(event, SourceProgress):
+                    yield event
+                elif pending.pop(event, None) is not None and not event.cancelled():
+                    yield event.result()
+        finally:
+            # Do not block on stragglers; their results are simply discarded
+            executor.shutdown(wait=False)
+
+    def run(self, tasks, deadline=None):
+        """Run the given tasks concurrently and return a dict of source name to SourceResult."""
+        return {result.name: result for result in self.iter_results(tasks, deadline)}
+
+    def _record(self, result, late=False):
+        """Feed a finished result into the source's circuit breaker; a late result counts as a failure."""
+        if self.circuit_breakers:
+            breaker = get_circuit_breaker(result.name)
+            if result.upstream_failed or late:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+    @staticmethod
+    def _reporter(name, events):
+        """Return the report(value) callable handed to a task that streams progress."""
+        return lambda value: events.put(SourceProgress(name, value))
+
+    def _timed_call(self, name, func, args, deadline, kwargs):
+        """
+        Call a fetcher under the deadline, capturing its value or exception along with the elapsed time,
+        and record the outcome in the source's circuit breaker.
+        """
+        start = time.monotonic()
+        try:
+            with deadline_scope(deadline):
+                value = func(*args, **kwargs)
+            result = SourceResult(name, value=value, elapsed=time.monotonic() - start)
+        except Exception as e:
+            result = SourceResult(name, error=e, elapsed=time.monotonic() - start)
+        self._record(result, late=deadline is not None and deadline.expired)
+        return result
@@ -0,0 +1,178 @@
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from deadline import current_deadline
+from rate_limiter import api_key_for_host, backoff_delay, get_host_limiter, parse_retry_after
+from response_cache import get_response_cache, source_for_url
+
+# Default (connect, read) timeouts in seconds for upstream requests
+DEFAULT_TIMEOUT = (
+    float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+)
+
+# Hosts whose responses routinely take longer than the default read timeout
+HOST_TIMEOUTS = {
+    "api.anthropic.com": (DEFAULT_TIMEOUT[0], float(os.getenv("ANTHROPIC_READ_TIMEOUT", "120")))
+}
+
+# Number of keep-alive connections kept open per upstream host
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))
+
+# Statuses signalling that the upstream is overloaded and the request may be retried
+RETRY_STATUSES = (429, 503, 529)
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+# Give up instead of waiting when an upstream asks us to back off for longer than this
+MAX_RETRY_DELAY = float(os.getenv("HTTP_MAX_RETRY_DELAY", "30"))
+
+
+class RateLimitedError(requests.RequestException):
+    """Raised when an upstream keeps rejecting requests for exceeding its quota."""
+
+
+class DeadlineExceededError(requests.Timeout):
+    """Raised when the caller's time budget runs out before a request could be sent."""
+
+
+# One session (and therefore one connection pool) per upstream host
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _create_session():
+    """Create a keep-alive session with a bounded connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url):
+    """Return the shared session for the host of the given URL, creating it on first use."""
+    host = urlsplit(url).netloc.lower()
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                session = _create_session()
+                _sessions[host] = session
+    return session
+
+
+def request(method, url, timeout=None, **kwargs):
+    """
+    Send a request through the pooled session for the URL's host.
+    Requests wait for the host's rate limiter, and overload responses are retried with
+    jittered backoff that honours Retry-After. Timeouts, rate-limit waits and retries are
+    all capped by the current deadline, if one is set.
+    """
+    host = urlsplit(url).netloc.lower()
+    if timeout is None:
+        timeout = HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+
+    # Use the higher quota tier when an API key is configured for the host
+    api_key = api_key_for_host(host)
+    if api_key:
+        kwargs["params"] = {"api_key": api_key, **(kwargs.get("params") or {})}
+
+    session = get_session(url)
+    limiter = get_host_limiter(host)
+
+    deadline = current_deadline()
+
+    for attempt in range(MAX_RETRIES + 1):
+        max_wait = deadline.remaining() if deadline is not None else None
+        if max_wait is not None and max_wait <= 0:
+            raise DeadlineExceededError(f"Time budget exhausted before requesting {host}")
+        if limiter is not None and not limiter.acquire(max_wait=max_wait):
+            raise DeadlineExceededError(f"Time budget exhausted while waiting for the {host} rate limit")
+
+        # requests rejects a zero timeout with ValueError, so an exhausted budget must be caught here
+        request_timeout = timeout
+        if deadline is not None:
+            if deadline.remaining() <= 0:
+                raise DeadlineExceededError(f"Time budget exhausted before requesting {host}")
+            request_timeout = deadline.limit(timeout)
+
+        response = session.request(method, url, timeout=request_timeout, **kwargs)
+        if response.status_code not in RETRY_STATUSES:
+            if limiter is not None:
+                limiter.recover()
+            return response
+
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        delay = retry_after if retry_after is not None else backoff_delay(attempt)
+        if limiter is not None:
+            # Pauses every caller for this host; the next acquire() waits out the delay, which is capped so
+            # a request that gives up on a very long Retry-After does not block the host for that long
+            limiter.throttle(min(delay, MAX_RETRY_DELAY))
+        if attempt == MAX_RETRIES or delay > MAX_RETRY_DELAY:
+            break
+        if deadline is not None and delay >= deadline.remaining():
+            break
+
+        # Release the pooled connection of the rejected response, which a streamed request leaves open
+        response.close()
+        if limiter is None:
+            time.sleep(delay)
+
+    if response.status_code == 429:
+        response.close()
+        raise RateLimitedError(f"Rate limit exceeded for {host} (Status: 429)", response=response)
+    return response
+
+
+def get(url, **kwargs):
+    """
+    Send a GET request through the pooled session for the URL's host.
+    Responses from known data sources are served from the persistent cache while fresh,
+    and revalidated with ETag/Last-Modified once they expire.
+    """
+    source = source_for_url(url)
+    cache = get_response_cache() if source else None
+    if cache is None:
+        return request("GET", url, **kwargs)
+
+    entry = cache.lookup(url)
+    if entry is not None and entry.fresh:
+        return entry.to_response()
+
+    # Ask the upstream whether our stale copy is still current
+    if entry is not None and entry.validators:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **entry.validators}
+
+    try:
+        response = request("GET", url, **kwargs)
+    except requests.RequestException:
+        # Serve a stale copy rather than nothing when the upstream is unreachable
+        if entry is not None:
+            return entry.to_response()
+        raise
+
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(url, source)
+        return entry.to_response()
+    if response.status_code == 200:
+        cache.store(url, source, response)
+    return response
+
+
+def post(url, **kwargs):
+    """Send a POST request through the pooled session for the URL's host."""
+    return request("POST", url, **kwargs)
+
+
+def close_all():
+    """Close every pooled session, dropping their keep-alive connections."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
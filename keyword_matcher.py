@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from collections import OrderedDict, deque
+
+# Number of recently scanned texts whose matches are remembered, so every consumer of a document shares one pass.
+# Entries are keyed by a digest of the text, so the cache never keeps the documents themselves alive.
+SCAN_CACHE_SIZE = 256
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds every keyword occurring in a text in a single pass.
+    Matching is case-insensitive and has the same substring semantics as `keyword in text.lower()`,
+    so its cost depends on the length of the text, not the number of keywords.
+    """
+
+    def __init__(self, keywords, cache_size=SCAN_CACHE_SIZE):
+        """Build the keyword trie and its failure links."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        # Trie of the lowercased keywords
+        for keyword in set(keyword.lower() for keyword in keywords if keyword):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (keyword,)
+
+        # Breadth-first failure links; each state also reports the keywords of its longest proper suffix state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def scan(self, text):
+        """Return the frozenset of keywords occurring in text, reusing the result of a recent scan of the same text."""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        with self._cache_lock:
+            found = self._cache.get(key)
+            if found is not None:
+                self._cache.move_to_end(key)
+                return found
+
+        found = self._scan(text)
+        with self._cache_lock:
+            self._cache[key] = found
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return found
+
+    def _scan(self, text):
+        """Return the frozenset of keywords occurring in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return frozenset(found)
@@ -0,0 +1,338 @@
+import argparse
+import io
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zipfile
+
+# Location of the local openFDA warehouse; it is only used once it has been populated with `ingest`
+WAREHOUSE_PATH = os.getenv(
+    "LABEL_WAREHOUSE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "openfda.sqlite3")
+)
+
+# Label sections indexed for full-text search
+LABEL_SECTIONS = [
+    "indications_and_usage",
+    "dosage_and_administration",
+    "contraindications",
+    "warnings",
+    "adverse_reactions",
+    "drug_interactions",
+    "mechanism_of_action",
+    "clinical_pharmacology",
+    "clinical_studies",
+    "how_supplied",
+]
+
+# Characters read from a bulk file at a time while streaming its results array
+CHUNK_SIZE = 1 << 20
+
+# Records written per transaction batch during ingestion
+BATCH_SIZE = 500
+
+
+def normalize_name(name):
+    """Normalize a brand or generic name for index lookups."""
+    return " ".join(str(name).strip().lower().split())
+
+
+def iter_bulk_results(stream, chunk_size=CHUNK_SIZE):
+    """
+    Yield the records of an openFDA bulk file's "results" array one at a time.
+    The file is read in chunks and each record is decoded as soon as it is complete,
+    so memory use is bounded by the largest single record rather than the file size.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+
+    # Skip the metadata block up to the opening bracket of the results array
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+        key = buffer.find('"results"')
+        bracket = buffer.find("[", key) if key >= 0 else -1
+        if bracket >= 0:
+            buffer = buffer[bracket + 1:]
+            break
+
+    pos = 0
+    while True:
+        # Step over the separators between records
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        try:
+            record, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The record is cut off at the end of the buffer; read more and try again
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise ValueError("Bulk file ended in the middle of the results array")
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield record
+
+        # Drop consumed text so the buffer does not grow with the file
+        if pos >= chunk_size:
+            buffer = buffer[pos:]
+            pos = 0
+
+
+def iter_bulk_file(path):
+    """Yield every record in an openFDA bulk download, either a .zip archive or an extracted .json file."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.endswith(".json"):
+                    with io.TextIOWrapper(archive.open(member), encoding="utf-8") as stream:
+                        for record in iter_bulk_results(stream):
+                            yield record
+    else:
+        with open(path, encoding="utf-8") as stream:
+            for record in iter_bulk_results(stream):
+                yield record
+
+
+def record_names(record):
+    """Return the normalized brand, generic and substance names of a label or drugsfda record."""
+    openfda = record.get("openfda", {})
+    names = set()
+    for field in ("brand_name", "generic_name", "substance_name"):
+        for name in openfda.get(field, []):
+            names.add(normalize_name(name))
+
+    # drugsfda records without openfda annotations still name their products
+    for product in record.get("products", []):
+        if product.get("brand_name"):
+            names.add(normalize_name(product["brand_name"]))
+        for ingredient in product.get("active_ingredients", []):
+            if ingredient.get("name"):
+                names.add(normalize_name(ingredient["name"]))
+
+    names.discard("")
+    return names
+
+
+class LabelWarehouse:
+    """Local SQLite store of openFDA drug labels and drugsfda applications, indexed by drug name."""
+
+    def __init__(self, path=WAREHOUSE_PATH):
+        """Initialize the warehouse, creating the database on first use."""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS labels (
+                    id TEXT PRIMARY KEY,
+                    set_id TEXT,
+                    effective_time TEXT,
+                    document TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS applications (
+                    application_number TEXT PRIMARY KEY,
+                    document TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS names (
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    record_id TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS names_by_name ON names (kind, name)")
+            conn.execute("CREATE INDEX IF NOT EXISTS names_by_record ON names (record_id)")
+            try:
+                conn.execute("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS label_text USING fts5 (
+                        label_id UNINDEXED, section UNINDEXED, text
+                    )
+                """)
+                self.full_text = True
+            except sqlite3.OperationalError as e:
+                # Some SQLite builds ship without FTS5; name lookups still work
+                print(f"Full-text search unavailable: {str(e)}")
+                self.full_text = False
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self, kind):
+        """Return the number of stored records of a kind ("label" or "drugsfda")."""
+        table = "labels" if kind == "label" else "applications"
+        return self._connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def has_records(self, kind):
+        """Return True if any record of a kind has been ingested; checked on every call, so later ingests count."""
+        table = "labels" if kind == "label" else "applications"
+        return self._connection().execute(f"SELECT EXISTS (SELECT 1 FROM {table})").fetchone()[0] == 1
+
+    @property
+    def has_labels(self):
+        return self.has_records("label")
+
+    @property
+    def has_applications(self):
+        return self.has_records("drugsfda")
+
+    def ingest(self, path):
+        """Stream an openFDA label or drugsfda bulk file into the warehouse; return the number of records."""
+        total = 0
+        batch = []
+        for record in iter_bulk_file(path):
+            batch.append(record)
+            if len(batch) >= BATCH_SIZE:
+                total += self._store_batch(batch)
+                batch = []
+        if batch:
+            total += self._store_batch(batch)
+        return total
+
+    def _store_batch(self, records):
+        """Write a batch of records, replacing earlier versions of the same label or application."""
+        labels, applications, names, texts = [], [], [], []
+        for record in records:
+            if record.get("application_number"):
+                record_id = record["application_number"]
+                kind = "drugsfda"
+                applications.append((record_id, json.dumps(record)))
+            elif record.get("id"):
+                record_id = record["id"]
+                kind = "label"
+                labels.append((record_id, record.get("set_id"), record.get("effective_time", ""),
+                               json.dumps(record)))
+                for section in LABEL_SECTIONS:
+                    if record.get(section):
+                        texts.append((record_id, section, " ".join(record[section])))
+            else:
+                continue
+            for name in record_names(record):
+                names.append((kind, name, record_id))
+
+        record_ids = [(record_id,) for record_id, *_ in labels + applications]
+        with self._connection() as conn:
+            conn.executemany("DELETE FROM names WHERE record_id = ?", record_ids)
+            conn.executemany("INSERT OR REPLACE INTO labels VALUES (?, ?, ?, ?)", labels)
+            conn.executemany("INSERT OR REPLACE INTO applications VALUES (?, ?)", applications)
+            conn.executemany("INSERT INTO names VALUES (?, ?, ?)", names)
+            if self.full_text:
+                conn.executemany("DELETE FROM label_text WHERE label_id = ?", [(row[0],) for row in labels])
+                conn.executemany("INSERT INTO label_text VALUES (?, ?, ?)", texts)
+        return len(record_ids)
+
+    def _find_ids(self, kind, name):
+        """Return record IDs indexed under a name, falling back to names that start with it."""
+        name = normalize_name(name)
+        conn = self._connection()
+        rows = conn.execute("SELECT record_id FROM names WHERE kind = ? AND name = ?", (kind, name)).fetchall()
+        if not rows:
+            rows = conn.execute(
+                "SELECT record_id FROM names WHERE kind = ? AND name > ? AND name < ?",
+                (kind, name + " ", name + " \uffff")
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def find_label(self, name):
+        """Return the most recent label (as an openFDA result dict) for a brand or generic name, or None."""
+        ids = self._find_ids("label", name)
+        if not ids:
+            return None
+        placeholders = ",".join("?" * len(ids))
+        row = self._connection().execute(
+            f"SELECT document FROM labels WHERE id IN ({placeholders}) ORDER BY effective_time DESC LIMIT 1", ids
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_application(self, name):
+        """
+        Return the drugsfda application (as an openFDA result dict) for a brand or generic name, or None.
+        The innovator's NDA or BLA is preferred over generic ANDAs filed under the same name.
+        """
+        ids = self._find_ids("drugsfda", name)
+        if not ids:
+            return None
+        application_number = min(ids, key=lambda number: (not number.upper().startswith(("NDA", "BLA")), number))
+        row = self._connection().execute(
+            "SELECT document FROM applications WHERE application_number = ?", (application_number,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def search(self, query, limit=10):
+        """Full-text search over label sections; return (label_id, section, snippet) tuples."""
+        if not self.full_text:
+            return []
+        return self._connection().execute(
+            "SELECT label_id, section, snippet(label_text, 2, '[', ']', '...', 12) "
+            "FROM label_text WHERE label_text MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+
+def get_label_warehouse():
+    """Return the process-wide label warehouse, or None if it has not been ingested."""
+    global _warehouse
+    if _warehouse is None:
+        with _warehouse_lock:
+            if _warehouse is None:
+                if not os.path.exists(WAREHOUSE_PATH):
+                    return None
+                try:
+                    _warehouse = LabelWarehouse()
+                except sqlite3.Error as e:
+                    print(f"Label warehouse unavailable: {str(e)}")
+                    _warehouse = False
+    return _warehouse or None
+
+
+def main(argv=None):
+    """Command line entry point: `python label_warehouse.py ingest drug-label-*.json.zip`."""
+    parser = argparse.ArgumentParser(description="Build a local openFDA label warehouse from bulk downloads.")
+    parser.add_argument("--db", default=WAREHOUSE_PATH, help="Path of the warehouse database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Ingest openFDA drug label or drugsfda bulk files")
+    ingest_parser.add_argument("paths", nargs="+", help="Bulk .json.zip or .json files")
+
+    search_parser = commands.add_parser("search", help="Full-text search over label sections")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    warehouse = LabelWarehouse(args.db)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            print(f"Ingesting {path}...")
+            print(f"  {warehouse.ingest(path)} records")
+        print(f"Warehouse now holds {warehouse.count('label')} labels and "
+              f"{warehouse.count('drugsfda')} applications")
+    elif args.command == "search":
+        for label_id, section, snippet in warehouse.search(args.query, args.limit):
+            print(f"{label_id} [{section}] {snippet}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+import argparse
+import gzip
+import io
+import os
+import sqlite3
+import sys
+import threading
+import xml.etree.ElementTree as ET
+import zlib
+
+# Location of the local PubMed store; it is only used once it has been populated with `ingest`
+STORE_PATH = os.getenv(
+    "LITERATURE_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "literature.sqlite3")
+)
+
+# Articles written per transaction batch during ingestion
+BATCH_SIZE = 2000
+
+
+def normalize_term(term):
+    """Normalize a MeSH heading or substance name for index lookups."""
+    return " ".join(str(term).strip().lower().split())
+
+
+def _text(element):
+    """Return the full text of an element, including inline markup such as <i> and <sup>."""
+    return "".join(element.itertext()).strip() if element is not None else ""
+
+
+def parse_article(element):
+    """Extract PMID, title, abstract, year, MeSH headings and substances from a <PubmedArticle> element."""
+    citation = element.find("MedlineCitation")
+    article = citation.find("Article")
+
+    # Structured abstracts carry a label per section, e.g. BACKGROUND or RESULTS
+    abstract_parts = []
+    for part in article.findall("Abstract/AbstractText"):
+        label = part.get("Label")
+        abstract_parts.append(f"{label}: {_text(part)}" if label else _text(part))
+
+    pub_date = article.find("Journal/JournalIssue/PubDate")
+    year = "Unknown"
+    if pub_date is not None:
+        year = pub_date.findtext("Year") or (pub_date.findtext("MedlineDate") or "Unknown")[:4]
+
+    return {
+        "pmid": citation.findtext("PMID"),
+        "title": _text(article.find("ArticleTitle")),
+        "abstract": " ".join(abstract_parts),
+        "year": year,
+        "mesh": [_text(heading) for heading in citation.findall("MeshHeadingList/MeshHeading/DescriptorName")],
+        "substances": [_text(chemical) for chemical in citation.findall("ChemicalList/Chemical/NameOfSubstance")]
+    }
+
+
+def iter_pubmed_xml(stream):
+    """
+    Yield ("article", record) and ("delete", pmid) events from a PubMed baseline or update XML stream.
+    Elements are discarded as soon as they are parsed, so memory use stays constant regardless of file size.
+    """
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end":
+            continue
+        if element.tag == "PubmedArticle":
+            yield "article", parse_article(element)
+            root.clear()
+        elif element.tag == "DeleteCitation":
+            for pmid in element.findall("PMID"):
+                yield "delete", pmid.text
+            root.clear()
+
+
+def parse_pubmed_xml(content):
+    """Parse an efetch PubmedArticleSet response into article records."""
+    return [record for kind, record in iter_pubmed_xml(io.BytesIO(content)) if kind == "article"]
+
+
+class LiteratureStore:
+    """Compact local SQLite store of PubMed articles with a MeSH/substance term index and abstract search."""
+
+    def __init__(self, path=STORE_PATH):
+        """Initialize the store, creating the database on first use."""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            # Abstracts are zlib-compressed; they are the bulk of the data
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    pmid INTEGER PRIMARY KEY,
+                    year TEXT,
+                    title TEXT NOT NULL,
+                    abstract BLOB,
+                    mesh TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS terms (
+                    term TEXT NOT NULL,
+                    pmid INTEGER NOT NULL,
+                    PRIMARY KEY (term, pmid)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS terms_by_pmid ON terms (pmid)")
+            try:
+                # Contentless index: the text lives compressed in articles, only the tokens are stored here
+                conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS article_text USING fts5 (title, abstract, content='')")
+                self.full_text = True
+            except sqlite3.OperationalError as e:
+                print(f"Full-text search unavailable: {str(e)}")
+                self.full_text = False
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self):
+        """Return the number of stored articles."""
+        return self._connection().execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    @property
+    def has_articles(self):
+        """True if any article has been ingested; checked on every call, so later ingests count."""
+        return self._connection().execute("SELECT EXISTS (SELECT 1 FROM articles)").fetchone()[0] == 1
+
+    def ingest(self, path):
+        """Stream a PubMed baseline or update file (.xml or .xml.gz) into the store; return articles written."""
+        opener = gzip.open if path.endswith(".gz") else open
+        total = 0
+        changes = 0
+        with opener(path, "rb") as stream:
+            with self._connection() as conn:
+                for kind, value in iter_pubmed_xml(stream):
+                    if kind == "article":
+                        self._store(conn, value)
+                        total += 1
+                    else:
+                        self._remove(conn, int(value))
+                    # Commit periodically so a long ingest does not hold one huge transaction
+                    changes += 1
+                    if changes % BATCH_SIZE == 0:
+                        conn.commit()
+        return total
+
+    def _remove(self, conn, pmid):
+        """Delete an article and its index entries."""
+        row = conn.execute("SELECT title, abstract FROM articles WHERE pmid = ?", (pmid,)).fetchone()
+        if row is None:
+            return
+        if self.full_text:
+            # Contentless FTS rows are removed by replaying the original text
+            conn.execute(
+                "INSERT INTO article_text (article_text, rowid, title, abstract) VALUES ('delete', ?, ?, ?)",
+                (pmid, row[0], zlib.decompress(row[1]).decode("utf-8"))
+            )
+        conn.execute("DELETE FROM terms WHERE pmid = ?", (pmid,))
+        conn.execute("DELETE FROM articles WHERE pmid = ?", (pmid,))
+
+    def _store(self, conn, article):
+        """Write one article, replacing any earlier version (update files revise existing PMIDs)."""
+        pmid = int(article["pmid"])
+        self._remove(conn, pmid)
+        conn.execute(
+            "INSERT INTO articles VALUES (?, ?, ?, ?, ?)",
+            (pmid, article["year"], article["title"], zlib.compress(article["abstract"].encode("utf-8")),
+             "; ".join(article["mesh"]))
+        )
+        terms = set(normalize_term(term) for term in article["mesh"] + article["substances"])
+        conn.executemany("INSERT OR IGNORE INTO terms VALUES (?, ?)", [(term, pmid) for term in terms if term])
+        if self.full_text:
+            conn.execute("INSERT INTO article_text (rowid, title, abstract) VALUES (?, ?, ?)",
+                         (pmid, article["title"], article["abstract"]))
+
+    def find_articles(self, name, limit=5):
+        """
+        Return up to limit of the most recent articles about a drug.
+        Articles indexed under the drug as a MeSH heading or substance come first; titles and abstracts
+        mentioning it are searched when the term index has none.
+        """
+        conn = self._connection()
+        pmids = [row[0] for row in conn.execute(
+            "SELECT pmid FROM terms WHERE term = ? ORDER BY pmid DESC LIMIT ?", (normalize_term(name), limit)
+        )]
+        if not pmids and self.full_text:
+            phrase = '"' + name.replace('"', '') + '"'
+            pmids = [row[0] for row in conn.execute(
+                "SELECT rowid FROM article_text WHERE article_text MATCH ? ORDER BY rowid DESC LIMIT ?",
+                (phrase, limit)
+            )]
+        if not pmids:
+            return []
+
+        placeholders = ",".join("?" * len(pmids))
+        rows = conn.execute(
+            f"SELECT pmid, year, title, abstract, mesh FROM articles WHERE pmid IN ({placeholders}) "
+            f"ORDER BY pmid DESC", pmids
+        ).fetchall()
+        return [
+            {"pmid": str(row[0]), "year": row[1], "title": row[2],
+             "abstract": zlib.decompress(row[3]).decode("utf-8"), "mesh": row[4].split("; ") if row[4] else []}
+            for row in rows
+        ]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_literature_store():
+    """Return the process-wide literature store, or None if it has not been ingested."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if not os.path.exists(STORE_PATH):
+                    return None
+                try:
+                    _store = LiteratureStore()
+                except sqlite3.Error as e:
+                    print(f"Literature store unavailable: {str(e)}")
+                    _store = False
+    return _store or None
+
+
+def main(argv=None):
+    """Command line entry point: `python literature_store.py ingest pubmed25n0001.xml.gz ...`."""
+    parser = argparse.ArgumentParser(description="Build a local PubMed store from baseline and update files.")
+    parser.add_argument("--db", default=STORE_PATH, help="Path of the store database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Ingest PubMed baseline or update XML files")
+    ingest_parser.add_argument("paths", nargs="+", help="PubMed .xml.gz or .xml files, in release order")
+
+    lookup_parser = commands.add_parser("lookup", help="List recent articles about a drug")
+    lookup_parser.add_argument("name")
+    lookup_parser.add_argument("--limit", type=int, default=5)
+
+    args = parser.parse_args(argv)
+    store = LiteratureStore(args.db)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            print(f"Ingesting {path}...")
+            print(f"  {store.ingest(path)} articles")
+        print(f"Store now holds {store.count()} articles")
+    elif args.command == "lookup":
+        for article in store.find_articles(args.name, args.limit):
+            print(f"{article['pmid']} ({article['year']}) {article['title']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+# Expected latency of each model before any has been observed: seconds to the first token and seconds per
+# output token. Models are listed from the slowest and most capable to the fastest, which is the fallback order.
+MODEL_PROFILES = {
+    "claude-3-opus-20240229": (2.5, 1 / 25),
+    "claude-3-5-sonnet-20240620": (1.2, 1 / 70),
+    "claude-3-haiku-20240307": (0.6, 1 / 130),
+}
+
+# Weight of the newest observation in the latency averages
+EWMA_ALPHA = float(os.getenv("MODEL_LATENCY_ALPHA", "0.3"))
+
+# How long a model that reported overload (429/529) or timed out is skipped in favour of a faster one
+OVERLOAD_COOLDOWN = float(os.getenv("MODEL_OVERLOAD_COOLDOWN", "60"))
+
+# Rough size of a token in characters, used to count the output of an answer
+CHARS_PER_TOKEN = 4
+
+
+class ModelRouter:
+    """Chooses a Claude model per request from a latency budget and the observed latency of each model."""
+
+    def __init__(self, profiles=MODEL_PROFILES, alpha=EWMA_ALPHA, overload_cooldown=OVERLOAD_COOLDOWN):
+        """Initialize the latency history from the expected profiles."""
+        self.order = list(profiles)
+        self.alpha = alpha
+        self.overload_cooldown = overload_cooldown
+        self._latency = {model: list(profile) for model, profile in profiles.items()}
+        self._cooling_until = {}
+        self._lock = threading.Lock()
+
+    def estimate(self, model, max_tokens):
+        """Return the expected seconds for a model to generate up to max_tokens."""
+        with self._lock:
+            first_token, per_token = self._latency.get(model, self._latency[self.order[0]])
+        return first_token + max_tokens * per_token
+
+    def candidates(self, preferred):
+        """Return the preferred model followed by the faster models it may fall back to."""
+        if preferred not in self.order:
+            return [preferred] + self.order
+        return self.order[self.order.index(preferred):]
+
+    def cooling_down(self, model):
+        """Return True while a model is skipped after an overload or a timeout."""
+        return self._cooling_until.get(model, 0) > time.monotonic()
+
+    def route(self, preferred, max_tokens, budget):
+        """
+        Return the models to try, in order, for a request that should finish within budget seconds.
+        The preferred model comes first unless it is cooling down after an overload or a timeout. The faster
+        models follow as fallbacks, starting from the most capable one expected to fit the budget.
+        """
+        candidates = self.candidates(preferred)
+        available = [model for model in candidates if not self.cooling_down(model)] or candidates[-1:]
+        first = [preferred] if available[0] == preferred else []
+        fallbacks = available[len(first):]
+        for index, model in enumerate(fallbacks):
+            if self.estimate(model, max_tokens) <= budget:
+                return first + fallbacks[index:]
+        return first + fallbacks[-1:]
+
+    def record_success(self, model, elapsed, output_chars):
+        """Fold the latency of a completed answer into the model's per-token average."""
+        output_tokens = max(1, output_chars // CHARS_PER_TOKEN)
+        with self._lock:
+            latency = self._latency.setdefault(model, list(self._latency[self.order[0]]))
+            sample = max(0.0, elapsed - latency[0]) / output_tokens
+            latency[1] += self.alpha * (sample - latency[1])
+
+    def record_timeout(self, model, elapsed, max_tokens):
+        """
+        Count a timed-out request as having taken at least elapsed seconds for the full max_tokens,
+        and skip the model until its cooldown has passed.
+        """
+        self._cooling_until[model] = time.monotonic() + self.overload_cooldown
+        with self._lock:
+            latency = self._latency.setdefault(model, list(self._latency[self.order[0]]))
+            sample = max(0.0, elapsed - latency[0]) / max(1, max_tokens)
+            if sample > latency[1]:
+                latency[1] += self.alpha * (sample - latency[1])
+
+    def record_overload(self, model):
+        """Skip a model that reported overload until its cooldown has passed."""
+        self._cooling_until[model] = time.monotonic() + self.overload_cooldown
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the process-wide model router, so latency history is shared across sessions."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
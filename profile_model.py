@@ -0,0 +1,153 @@
+import sys
+from collections.abc import Mapping
+
+
+class SlotRecord(Mapping):
+    """
+    Compact, read-only profile record.
+    Values live in __slots__ rather than a per-record dict, vocabulary strings are interned so every profile
+    shares one copy, and the record is a lazy Mapping view keyed by display names (e.g. "Brand Name")
+    for the markdown generators. Field names (e.g. "brand_name") are accepted as keys too.
+    """
+
+    __slots__ = ()
+
+    # Display keys and the matching field (slot) names, in order
+    KEYS = ()
+    FIELDS = ()
+
+    # Fields holding short strings repeated across profiles, such as phases, classes and relation types
+    INTERNED = ()
+
+    # Fields left out of the mapping while they are None
+    OPTIONAL = ()
+
+    def __init_subclass__(cls, **kwargs):
+        """Build the key lookup table of each record type once."""
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_FOR_KEY = dict(zip(cls.KEYS, cls.FIELDS))
+        cls._FIELD_FOR_KEY.update((field, field) for field in cls.FIELDS)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the record from positional values in field order and/or field-name keywords."""
+        values = dict(zip(self.FIELDS, args))
+        values.update(kwargs)
+        for field in self.FIELDS:
+            value = values.get(field, None if field in self.OPTIONAL else "")
+            if field in self.INTERNED and type(value) is str:
+                value = sys.intern(value)
+            object.__setattr__(self, field, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __getitem__(self, key):
+        field = self._FIELD_FOR_KEY.get(key)
+        if field is None:
+            raise KeyError(key)
+        value = getattr(self, field)
+        if value is None and field in self.OPTIONAL:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        for key, field in zip(self.KEYS, self.FIELDS):
+            if field not in self.OPTIONAL or getattr(self, field) is not None:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, field) for field in self.FIELDS)
+
+    def to_dict(self):
+        """Return the record as plain nested dicts and lists, e.g. for JSON export."""
+        return {key: to_plain(value) for key, value in self.items()}
+
+
+def to_plain(value):
+    """Convert records, tuples and nested containers to plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class Identifiers(SlotRecord):
+    """Names, approval and chemical identifiers of an asset."""
+
+    __slots__ = ("brand_name", "generic_name", "approval_date", "manufacturer", "bla_nda", "chemical_formula")
+    KEYS = ("Brand Name", "Generic Name", "Approval Date", "Manufacturer", "BLA/NDA Number", "Chemical Formula")
+    FIELDS = __slots__
+    INTERNED = ("manufacturer",)
+
+
+class ApprovalStatus(SlotRecord):
+    """Regulatory status and class of an asset."""
+
+    __slots__ = ("status", "drug_class", "type")
+    KEYS = ("Status", "Drug Class", "Type")
+    FIELDS = __slots__
+    INTERNED = __slots__
+
+
+class Evidence(SlotRecord):
+    """Summary of one clinical trial."""
+
+    __slots__ = ("trial_name", "phase", "population", "key_results", "safety", "enrollment")
+    KEYS = __slots__
+    FIELDS = __slots__
+    INTERNED = ("phase",)
+    OPTIONAL = ("enrollment",)
+
+
+class LiteratureRef(SlotRecord):
+    """A cited PubMed article."""
+
+    __slots__ = ("pmid", "year", "title")
+    KEYS = __slots__
+    FIELDS = __slots__
+    INTERNED = ("year",)
+
+
+class Target(SlotRecord):
+    """A pharmacological target and the drug's activity at it."""
+
+    __slots__ = ("receptor", "family", "activity")
+    KEYS = __slots__
+    FIELDS = __slots__
+    INTERNED = __slots__
+
+
+class Relationship(SlotRecord):
+    """A subject-predicate-object relationship of the drug ontology."""
+
+    __slots__ = ("type", "subject", "object")
+    KEYS = __slots__
+    FIELDS = __slots__
+    INTERNED = __slots__
+
+
+class RelatedCompound(SlotRecord):
+    """A compound related to the drug."""
+
+    __slots__ = ("name", "relation_type")
+    KEYS = __slots__
+    FIELDS = __slots__
+    INTERNED = __slots__
+
+
+class AssetProfile(SlotRecord):
+    """A formatted asset profile; lists are stored as tuples of records."""
+
+    __slots__ = ("asset_name", "identifiers", "approval_status", "indications", "mechanism_of_action",
+                 "clinical_evidence", "literature", "ontology", "data_gaps")
+    KEYS = ("Asset Profile", "Identifiers", "Approval Status", "Indications & Usage", "Mechanism of Action",
+            "Clinical Evidence Summary", "Key Literature", "Drug Ontology", "Data Gaps")
+    FIELDS = __slots__
+    INTERNED = ("asset_name",)
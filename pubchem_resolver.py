@@ -0,0 +1,93 @@
+import threading
+from urllib.parse import quote
+
+import http_client
+
+PUBCHEM_BASE_URL = "https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound"
+
+# Properties requested for every compound; shared by the profile and the structure view
+PROPERTY_LIST = "MolecularFormula,MolecularWeight,CanonicalSMILES,XLogP,Complexity"
+
+
+class PubChemLookupError(Exception):
+    """Raised when PubChem could not be queried; such failures are never cached."""
+
+
+def normalize_compound_name(name):
+    """Normalize a compound name so that trivially different spellings share cache entries."""
+    return " ".join(name.strip().lower().split())
+
+
+class PubChemResolver:
+    """Resolves compound names to PubChem CIDs and properties, caching both for the process lifetime."""
+
+    def __init__(self):
+        """Initialize empty name->CID and CID->properties caches."""
+        self._cids = {}
+        self._properties = {}
+        self._lock = threading.Lock()
+
+    def resolve_cid(self, drug_name):
+        """Return the PubChem CID for a compound name, or None if PubChem does not know it."""
+        key = normalize_compound_name(drug_name)
+        with self._lock:
+            if key in self._cids:
+                return self._cids[key]
+
+        response = http_client.get(f"{PUBCHEM_BASE_URL}/name/{quote(key)}/cids/JSON")
+        if response.status_code == 404:
+            cid = None
+        elif response.status_code != 200:
+            raise PubChemLookupError(f"Could not find compound in PubChem (Status: {response.status_code})")
+        else:
+            data = response.json()
+            cids = data.get('IdentifierList', {}).get('CID', [])
+            cid = cids[0] if cids else None
+
+        with self._lock:
+            self._cids[key] = cid
+        return cid
+
+    def get_properties(self, cid):
+        """Return the property record for a CID, or None if PubChem has no properties for it."""
+        with self._lock:
+            if cid in self._properties:
+                return self._properties[cid]
+
+        response = http_client.get(f"{PUBCHEM_BASE_URL}/cid/{cid}/property/{PROPERTY_LIST}/JSON")
+        if response.status_code != 200:
+            raise PubChemLookupError(f"Could not retrieve PubChem properties (Status: {response.status_code})")
+
+        data = response.json()
+        properties = data.get('PropertyTable', {}).get('Properties', [])
+        properties = properties[0] if properties else None
+
+        with self._lock:
+            self._properties[cid] = properties
+        return properties
+
+    def lookup(self, drug_name):
+        """Return (cid, properties) for a compound name; either may be None."""
+        cid = self.resolve_cid(drug_name)
+        if cid is None:
+            return None, None
+        return cid, self.get_properties(cid)
+
+    @staticmethod
+    def image_url(cid):
+        """Return the URL of the 2D structure image for a CID."""
+        return f"{PUBCHEM_BASE_URL}/cid/{cid}/PNG"
+
+    def clear(self):
+        """Drop every cached CID and property record."""
+        with self._lock:
+            self._cids.clear()
+            self._properties.clear()
+
+
+_resolver = PubChemResolver()
+
+
+def get_pubchem_resolver():
+    """Return the process-wide PubChem resolver."""
+    return _resolver
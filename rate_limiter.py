@@ -0,0 +1,141 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+DAY = 24 * 60 * 60
+
+# Published request quotas per host; "keyed" values apply once an API key is configured
+HOST_LIMITS = {
+    "api.fda.gov": {"rate": 240 / 60, "burst": 20, "daily": 1000, "keyed_daily": 120000},
+    "eutils.ncbi.nlm.nih.gov": {"rate": 3, "burst": 3, "keyed_rate": 10, "keyed_burst": 10},
+    "pubchem.ncbi.nlm.nih.gov": {"rate": 5, "burst": 5},
+    "dailymed.nlm.nih.gov": {"rate": 10, "burst": 10},
+    "clinicaltrials.gov": {"rate": 50 / 60, "burst": 10},
+}
+
+# Environment variables holding optional API keys, sent as the api_key query parameter
+HOST_API_KEYS = {
+    "api.fda.gov": "OPENFDA_API_KEY",
+    "eutils.ncbi.nlm.nih.gov": "NCBI_API_KEY",
+}
+
+# Backoff parameters for retried requests
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+# Never throttle below this fraction of a host's configured rate
+MIN_RATE_FRACTION = 0.1
+
+
+def api_key_for_host(host):
+    """Return the configured API key for a host, or None."""
+    env_var = HOST_API_KEYS.get(host)
+    return os.getenv(env_var) if env_var else None
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header given in seconds or as an HTTP date; return seconds or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt):
+    """Return a full-jitter exponential backoff delay for the given retry attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate; HostLimiter serializes access to it."""
+
+    def __init__(self, rate, capacity):
+        """Initialize a full bucket with the given refill rate (tokens per second) and capacity."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """Take one token and return how long the caller must wait before using it."""
+        self._refill(now)
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostLimiter:
+    """Adaptive rate limiter for one upstream host, with an optional daily quota."""
+
+    def __init__(self, rate, burst, daily=None):
+        """Initialize per-second and (optionally) per-day buckets for the host."""
+        self.base_rate = rate
+        self.bucket = TokenBucket(rate, burst)
+        self.daily_bucket = TokenBucket(daily / DAY, daily) if daily else None
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=None):
+        """
+        Block until the host's quotas allow one more request and return True.
+        Returns False without waiting if that would take longer than max_wait seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.blocked_until - now, self.bucket.reserve(now))
+            if self.daily_bucket is not None:
+                wait = max(wait, self.daily_bucket.reserve(now))
+            if max_wait is not None and wait > max_wait:
+                # Hand the reserved tokens back; this request will not be sent
+                self.bucket.tokens += 1
+                if self.daily_bucket is not None:
+                    self.daily_bucket.tokens += 1
+                return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def throttle(self, delay):
+        """Halve the request rate and pause the host after it signalled overload."""
+        with self._lock:
+            self.bucket.rate = max(self.base_rate * MIN_RATE_FRACTION, self.bucket.rate / 2)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    def recover(self):
+        """Gradually restore the request rate after a successful response."""
+        with self._lock:
+            if self.bucket.rate < self.base_rate:
+                self.bucket.rate = min(self.base_rate, self.bucket.rate + self.base_rate * MIN_RATE_FRACTION)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_host_limiter(host):
+    """Return the process-wide limiter for a host, or None if the host is not rate limited."""
+    limits = HOST_LIMITS.get(host)
+    if limits is None:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            keyed = api_key_for_host(host) is not None
+            limiter = HostLimiter(
+                rate=limits.get("keyed_rate", limits["rate"]) if keyed else limits["rate"],
+                burst=limits.get("keyed_burst", limits["burst"]) if keyed else limits["burst"],
+                daily=limits.get("keyed_daily", limits.get("daily")) if keyed else limits.get("daily")
+            )
+            _limiters[host] = limiter
+        return limiter
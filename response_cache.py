@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Location of the on-disk cache shared by every Streamlit worker process
+CACHE_PATH = os.getenv(
+    "RESPONSE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "responses.sqlite3")
+)
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Time-to-live in seconds for each cached source; labels change rarely, trial lists more often
+SOURCE_TTLS = {
+    "openfda_drugsfda": 7 * DAY,
+    "openfda_label": 7 * DAY,
+    "openfda_event": 1 * DAY,
+    "dailymed": 7 * DAY,
+    "pubchem": 30 * DAY,
+    "clinicaltrials": 12 * HOUR,
+    "pubmed": 1 * DAY,
+}
+
+# URL fragments identifying which source a GET request belongs to
+SOURCE_URL_PATTERNS = [
+    ("api.fda.gov/drug/drugsfda.json", "openfda_drugsfda"),
+    ("api.fda.gov/drug/label.json", "openfda_label"),
+    ("api.fda.gov/drug/event.json", "openfda_event"),
+    ("dailymed.nlm.nih.gov/", "dailymed"),
+    ("pubchem.ncbi.nlm.nih.gov/", "pubchem"),
+    ("clinicaltrials.gov/api/", "clinicaltrials"),
+    ("eutils.ncbi.nlm.nih.gov/", "pubmed"),
+]
+
+# How long an expired entry with validators is kept around for revalidation
+MAX_STALE_AGE = 30 * DAY
+
+# Response headers worth keeping alongside the cached body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def source_for_url(url):
+    """Return the cache source name for a URL, or None if responses from it are not cached."""
+    for fragment, source in SOURCE_URL_PATTERNS:
+        if fragment in url:
+            return source
+    return None
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response served from the cache."""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class CacheEntry:
+    """A cached response together with its freshness information."""
+
+    def __init__(self, url, status_code, headers, content, expires_at):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+    @property
+    def validators(self):
+        """Return conditional request headers for revalidating this entry."""
+        validators = {}
+        if self.headers.get("ETag"):
+            validators["If-None-Match"] = self.headers["ETag"]
+        if self.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def to_response(self):
+        return CachedResponse(self.url, self.status_code, self.headers, self.content)
+
+
+class ResponseCache:
+    """SQLite-backed HTTP response cache that is safe to share between processes."""
+
+    def __init__(self, path=CACHE_PATH):
+        """Initialize the cache, creating the database on first use."""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    source TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    content BLOB NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+        self.purge()
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            # WAL lets readers in other worker processes proceed while one process writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, url):
+        """Return the CacheEntry stored for a URL, or None."""
+        row = self._connection().execute(
+            "SELECT status_code, headers, content, expires_at FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(url, row[0], json.loads(row[1]), row[2], row[3])
+
+    def store(self, url, source, response):
+        """Store a successful response under the TTL of its source."""
+        headers = {name: response.headers[name] for name in STORED_HEADERS if response.headers.get(name)}
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, source, response.status_code, json.dumps(headers), response.content,
+                 now, now + SOURCE_TTLS.get(source, DAY))
+            )
+
+    def refresh(self, url, source):
+        """Extend the lifetime of an entry after the upstream confirmed it is unchanged."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE responses SET stored_at = ?, expires_at = ? WHERE url = ?",
+                (now, now + SOURCE_TTLS.get(source, DAY), url)
+            )
+
+    def invalidate(self, source=None):
+        """Remove every entry, or only the entries of one source."""
+        with self._connection() as conn:
+            if source:
+                conn.execute("DELETE FROM responses WHERE source = ?", (source,))
+            else:
+                conn.execute("DELETE FROM responses")
+
+    def purge(self):
+        """Remove entries that can no longer be revalidated or have been stale for too long."""
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "DELETE FROM responses WHERE expires_at < ? AND "
+                "(headers NOT LIKE '%ETag%' AND headers NOT LIKE '%Last-Modified%' OR expires_at < ?)",
+                (now, now - MAX_STALE_AGE)
+            )
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Return the process-wide response cache, or None if caching is disabled or unavailable."""
+    global _cache
+    if os.getenv("RESPONSE_CACHE_DISABLED"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = ResponseCache()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Response cache unavailable: {str(e)}")
+                    _cache = False
+    return _cache or None
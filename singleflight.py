@@ -0,0 +1,123 @@
+import threading
+
+# How often a waiting follower checks for progress published by the leader
+UPDATE_POLL_INTERVAL = 0.2
+
+
+class _Call:
+    """An in-flight computation that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # Set when the leader was interrupted (e.g. by a Streamlit rerun) before it produced an outcome
+        self.abandoned = False
+        # Progress published by the leader, replayed by each follower on its own thread
+        self.updates = []
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one in-flight computation."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run func for the key, or wait for the identical call already in flight and share its outcome.
+        Results are not retained once the call completes; later callers start a fresh computation.
+        """
+        return self._do(key, lambda publish: func(*args, **kwargs))
+
+    def do_with_updates(self, key, func, *args, on_update=None, on_wait=None):
+        """
+        Like do, but func receives an on_update callable as its last argument.
+        Updates go to the leader's on_update as they happen. A follower calls on_wait() once, then replays
+        every update with its own on_update on its own thread while it waits, since UI callbacks only work
+        on the thread of the session that registered them.
+        """
+        return self._do(key, lambda publish: func(*args, publish), on_update, on_wait)
+
+    def _do(self, key, run, on_update=None, on_wait=None):
+        """Lead or follow the call for the key until one of them produces an outcome."""
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is not None:
+                    leader = False
+                else:
+                    call = _Call()
+                    self._calls[key] = call
+                    leader = True
+
+            if leader:
+                return self._lead(key, call, run, on_update)
+
+            if on_wait is not None:
+                on_wait()
+            replayed = 0
+            while not call.done.is_set():
+                if on_update is not None:
+                    replayed = self._replay(call, replayed, on_update)
+                call.done.wait(UPDATE_POLL_INTERVAL if on_update is not None else None)
+
+            # An interrupted leader left no outcome to share, so compute it again
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key, call, run, on_update):
+        """Run the computation for the key and share its outcome with the followers."""
+
+        def publish(*update):
+            call.updates.append(update)
+            if on_update is not None:
+                on_update(*update)
+
+        try:
+            call.result = run(publish)
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.abandoned = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    @staticmethod
+    def _replay(call, replayed, on_update):
+        """Pass the updates published since the last replay to a follower's on_update."""
+        updates = call.updates[replayed:]
+        for update in updates:
+            on_update(*update)
+        return replayed + len(updates)
+
+    def in_flight(self):
+        """Return the number of distinct keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+# Named groups live here rather than in app.py so they survive Streamlit script reruns
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_flight_group(name):
+    """Return the process-wide SingleFlight group with the given name."""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = SingleFlight()
+            _groups[name] = group
+        return group
@@ -0,0 +1,246 @@
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+
+from label_warehouse import iter_bulk_file
+
+# Location of the synonym index; without it only the built-in synonyms are known
+INDEX_PATH = os.getenv(
+    "SYNONYM_INDEX_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "synonyms.sqlite3")
+)
+
+# Synonyms that are always known, even before an index has been loaded
+BUILTIN_SYNONYMS = {
+    "keytruda": "pembrolizumab",
+    "mk-3475": "pembrolizumab",
+    "opdivo": "nivolumab",
+    "humira": "adalimumab",
+    "enbrel": "etanercept",
+    "remicade": "infliximab",
+}
+
+# RxNorm term types loaded from RXNCONSO.RRF: ingredients, precise ingredients, brands and synonyms
+RXNORM_TERM_TYPES = ("IN", "PIN", "MIN", "BN", "SY", "TMSY")
+
+# RxNorm relationships linking brands and precise ingredients to their ingredient
+RXNORM_INGREDIENT_RELATIONS = ("tradename_of", "has_tradename", "form_of", "has_form")
+
+
+def normalize_name(name):
+    """Normalize a drug name for index lookups."""
+    return " ".join(str(name).strip().lower().split())
+
+
+def iter_rxnorm_synonyms(conso_path, rel_path):
+    """
+    Yield (name, canonical) pairs from RxNorm RXNCONSO.RRF and RXNREL.RRF files.
+    Every brand, precise ingredient and synonym is mapped to the name of its ingredient concept.
+    """
+    # Collect the strings of each concept of interest
+    concept_names = {}
+    ingredients = {}
+    with open(conso_path, encoding="utf-8") as conso:
+        for fields in csv.reader(conso, delimiter="|", quoting=csv.QUOTE_NONE):
+            rxcui, sab, tty, name = fields[0], fields[11], fields[12], fields[14]
+            if sab != "RXNORM" or tty not in RXNORM_TERM_TYPES:
+                continue
+            concept_names.setdefault(rxcui, set()).add(normalize_name(name))
+            if tty == "IN":
+                ingredients[rxcui] = normalize_name(name)
+
+    # Link brands and precise ingredients to ingredients, whichever direction the relationship is stated in
+    ingredient_of = {rxcui: rxcui for rxcui in ingredients}
+    with open(rel_path, encoding="utf-8") as rel:
+        for fields in csv.reader(rel, delimiter="|", quoting=csv.QUOTE_NONE):
+            first, rela, second = fields[0], fields[7], fields[4]
+            if fields[10] != "RXNORM" or rela not in RXNORM_INGREDIENT_RELATIONS:
+                continue
+            if first in ingredients and second not in ingredients:
+                ingredient_of.setdefault(second, first)
+            elif second in ingredients and first not in ingredients:
+                ingredient_of.setdefault(first, second)
+
+    for rxcui, names in concept_names.items():
+        ingredient = ingredient_of.get(rxcui)
+        if ingredient is None:
+            continue
+        for name in names:
+            yield name, ingredients[ingredient]
+
+
+def iter_openfda_synonyms(path):
+    """Yield (name, canonical) pairs mapping brand and substance names to the generic name of openFDA labels."""
+    for record in iter_bulk_file(path):
+        openfda = record.get("openfda", {})
+        generic_names = openfda.get("generic_name", [])
+        # Combination products list several ingredients; only single-ingredient labels are unambiguous
+        if len(generic_names) != 1 or "," in generic_names[0] or " and " in generic_names[0].lower():
+            continue
+        canonical = normalize_name(generic_names[0])
+        for name in openfda.get("brand_name", []) + openfda.get("substance_name", []) + generic_names:
+            yield normalize_name(name), canonical
+
+
+def iter_tsv_synonyms(path):
+    """Yield (name, canonical) pairs from a two-column tab-separated file, e.g. code names or misspellings."""
+    with open(path, encoding="utf-8") as stream:
+        for line in stream:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, canonical = line.rstrip("\n").split("\t")[:2]
+            yield normalize_name(name), normalize_name(canonical)
+
+
+class SynonymIndex:
+    """SQLite-backed map from brand, generic, code and misspelled drug names to one canonical name."""
+
+    def __init__(self, path=INDEX_PATH):
+        """Initialize the index, creating the database on first use."""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS synonyms (
+                    name TEXT PRIMARY KEY,
+                    canonical TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS synonyms_by_canonical ON synonyms (canonical)")
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self):
+        """Return the number of indexed names."""
+        return self._connection().execute("SELECT COUNT(*) FROM synonyms").fetchone()[0]
+
+    def load(self, pairs, replace=False):
+        """
+        Add (name, canonical) pairs to the index and return how many were written.
+        Existing names keep their mapping unless replace is set, so curated files can be loaded last with replace.
+        """
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._connection() as conn:
+            before = conn.total_changes
+            conn.executemany(f"{verb} INTO synonyms VALUES (?, ?)",
+                             ((name, canonical) for name, canonical in pairs if name and canonical))
+            return conn.total_changes - before
+
+    def canonical(self, name):
+        """Return the canonical name for a drug name, or None if it is not indexed."""
+        row = self._connection().execute(
+            "SELECT canonical FROM synonyms WHERE name = ?", (normalize_name(name),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def synonyms(self, canonical, limit=None):
+        """Return the names that map to a canonical name."""
+        query = "SELECT name FROM synonyms WHERE canonical = ? ORDER BY length(name), name"
+        params = [canonical]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def names(self):
+        """Return every indexed name and canonical name."""
+        conn = self._connection()
+        return ([row[0] for row in conn.execute("SELECT name FROM synonyms")] +
+                [row[0] for row in conn.execute("SELECT DISTINCT canonical FROM synonyms")])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_synonym_index():
+    """Return the process-wide synonym index, or None if none has been loaded."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                if not os.path.exists(INDEX_PATH):
+                    return None
+                try:
+                    _index = SynonymIndex()
+                except sqlite3.Error as e:
+                    print(f"Synonym index unavailable: {str(e)}")
+                    _index = False
+    return _index or None
+
+
+def canonical_drug_name(name):
+    """
+    Return the canonical name for any brand, generic, code or misspelled drug name.
+    Names that are not indexed are returned normalized, so they still make consistent cache keys.
+    """
+    normalized = normalize_name(name)
+    index = get_synonym_index()
+    canonical = index.canonical(normalized) if index is not None else None
+    return canonical or BUILTIN_SYNONYMS.get(normalized, normalized)
+
+
+def drug_synonyms(canonical, limit=5):
+    """Return the canonical name followed by up to limit - 1 of its other names, shortest first."""
+    names = [canonical]
+    index = get_synonym_index()
+    if index is not None:
+        names += [name for name in index.synonyms(canonical, limit * 2) if name != canonical]
+    names += [name for name, target in BUILTIN_SYNONYMS.items() if target == canonical and name not in names]
+    return names[:limit]
+
+
+def main(argv=None):
+    """Command line entry point for loading synonym sources and looking up names."""
+    parser = argparse.ArgumentParser(description="Build the drug synonym index.")
+    parser.add_argument("--db", default=INDEX_PATH, help="Path of the index database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rxnorm_parser = commands.add_parser("load-rxnorm", help="Load RxNorm RXNCONSO.RRF and RXNREL.RRF")
+    rxnorm_parser.add_argument("conso")
+    rxnorm_parser.add_argument("rel")
+
+    openfda_parser = commands.add_parser("load-openfda", help="Load openFDA drug label bulk files")
+    openfda_parser.add_argument("paths", nargs="+")
+
+    tsv_parser = commands.add_parser("load-tsv", help="Load name<TAB>canonical pairs, overriding existing names")
+    tsv_parser.add_argument("paths", nargs="+")
+
+    lookup_parser = commands.add_parser("lookup", help="Show the canonical name and synonyms of a drug")
+    lookup_parser.add_argument("name")
+
+    args = parser.parse_args(argv)
+    index = SynonymIndex(args.db)
+
+    if args.command == "load-rxnorm":
+        print(f"{index.load(iter_rxnorm_synonyms(args.conso, args.rel))} names loaded")
+    elif args.command == "load-openfda":
+        for path in args.paths:
+            print(f"{path}: {index.load(iter_openfda_synonyms(path))} names loaded")
+    elif args.command == "load-tsv":
+        for path in args.paths:
+            print(f"{path}: {index.load(iter_tsv_synonyms(path), replace=True)} names loaded")
+    elif args.command == "lookup":
+        canonical = index.canonical(args.name) or BUILTIN_SYNONYMS.get(normalize_name(args.name))
+        if canonical is None:
+            print(f"{args.name} is not indexed")
+        else:
+            print(f"{canonical}: {', '.join(index.synonyms(canonical))}")
+
+    if args.command.startswith("load"):
+        print(f"Index now holds {index.count()} names")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from claude_stream import ClaudeStreamError, IncrementalJSONParser, StreamDeadlineExceededError, read_message_stream
+from deadline import Deadline, deadline_scope
+
+
+class StubStreamResponse:
+    """Stands in for a streamed requests response, replaying canned server-sent event lines."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.consumed = 0
+        self.closed = False
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            self.consumed += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+def sse_lines(text, chunk_size=7, error=None):
+    """Return the SSE lines of a Messages API stream whose text arrives in chunk_size fragments."""
+    lines = ["event: message_start", 'data: {"type": "message_start"}', ""]
+    for start in range(0, len(text), chunk_size):
+        delta = {"type": "content_block_delta", "index": 0,
+                 "delta": {"type": "text_delta", "text": text[start:start + chunk_size]}}
+        lines += ["event: content_block_delta", f"data: {json.dumps(delta)}", ""]
+    if error is not None:
+        lines += ["event: error", f"data: {json.dumps({'type': 'error', 'error': error})}", ""]
+    lines += ["event: message_stop", 'data: {"type": "message_stop"}', ""]
+    return lines
+
+
+ANSWER = {
+    "fda_data": {"brand_name": "REXULTI", "approval_date": "2015-07-10"},
+    "daily_med_data": {"indications": "Schizophrenia; adjunct in MDD", "mechanism_of_action": "D2 partial agonist"},
+    "chemical_data": {"formula": "C25H27N3O2S"},
+    "clinical_trials": [{"trial_id": "NCT01396421", "phase": "Phase 3", "results": "PANSS {-12.0}"}],
+}
+
+
+def test_blocks_are_delivered_before_the_stream_ends():
+    text = "```json\n" + json.dumps(ANSWER, indent=2) + "\n```"
+    response = StubStreamResponse(sse_lines(text))
+    blocks = []
+
+    content = read_message_stream(response, on_block=lambda key, value: blocks.append((key, value, response.consumed)))
+
+    assert content == text
+    assert [(key, value) for key, value, _ in blocks] == list(ANSWER.items())
+    # Each block is delivered while the stream is still open, not once it has been read to the end
+    assert all(consumed < len(response.lines) for _, _, consumed in blocks)
+    assert blocks[0][2] < blocks[-1][2]
+
+
+def test_scalar_members_and_escaped_quotes():
+    parser = IncrementalJSONParser()
+    completed = []
+    for fragment in ['{"a": 1', ', "b": "say \\"hi\\"", ', '"c": null, "d": tr', 'ue}']:
+        completed += parser.feed(fragment)
+    assert completed == [("a", 1), ("b", 'say "hi"'), ("c", None), ("d", True)]
+
+
+def test_error_event_raises():
+    response = StubStreamResponse(sse_lines('{"fda_data": {', error={"type": "overloaded_error", "message": "Overloaded"}))
+    with pytest.raises(ClaudeStreamError, match="overloaded_error"):
+        read_message_stream(response, on_block=lambda key, value: None)
+
+
+def test_expired_deadline_stops_the_stream():
+    response = StubStreamResponse(sse_lines('{"fda_data": {"brand_name": "REXULTI"}}'))
+    with deadline_scope(Deadline(0)), pytest.raises(StreamDeadlineExceededError):
+        read_message_stream(response, on_block=lambda key, value: None)
+    assert response.closed
+    assert response.consumed < len(response.lines)
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zipfile
+
+# Location of the local ClinicalTrials.gov snapshot; it is only used once it has been populated with `ingest`
+SNAPSHOT_PATH = os.getenv(
+    "TRIALS_SNAPSHOT_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "pharmd_agent_explorer", "trials.sqlite3")
+)
+
+# Studies written per transaction batch during ingestion
+BATCH_SIZE = 1000
+
+
+def normalize_name(name):
+    """Normalize an intervention name for index lookups."""
+    return " ".join(str(name).strip().lower().split())
+
+
+def summarize_study(study):
+    """Reduce a ClinicalTrials.gov API v2 study record to the fields used by the profile."""
+    protocol = study.get('protocolSection', {})
+    identification = protocol.get('identificationModule', {})
+    design = protocol.get('designModule', {})
+    status = protocol.get('statusModule', {})
+
+    # Population is the first line of the eligibility criteria
+    criteria = protocol.get('eligibilityModule', {}).get('eligibilityCriteria', 'Study population not specified')
+    population = criteria.split('\n')[0] if '\n' in criteria else criteria[:100] + '...'
+
+    # Intervention names and their synonyms, e.g. code names and brand names
+    interventions = set()
+    for intervention in protocol.get('armsInterventionsModule', {}).get('interventions', []):
+        for name in [intervention.get('name')] + intervention.get('otherNames', []):
+            if name:
+                interventions.add(normalize_name(name))
+
+    return {
+        "nct_id": identification.get('nctId', 'Unknown'),
+        "title": identification.get('briefTitle', ''),
+        "phase": design.get('phases', ['Unknown'])[0] if design.get('phases') else 'Unknown',
+        "enrollment": design.get('enrollmentInfo', {}).get('count', 0),
+        "status": status.get('overallStatus', 'Unknown'),
+        "summary": protocol.get('descriptionModule', {}).get('briefSummary', 'No description available'),
+        "population": population,
+        "interventions": sorted(interventions)
+    }
+
+
+def iter_studies(path):
+    """Yield every study in a ClinicalTrials.gov JSON export, either a zip of per-study files or a single file."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.namelist():
+                if member.endswith(".json"):
+                    with archive.open(member) as stream:
+                        yield json.load(stream)
+    else:
+        with open(path, encoding="utf-8") as stream:
+            data = json.load(stream)
+        for study in data.get('studies', []) if isinstance(data, dict) else data:
+            yield study
+
+
+class TrialsSnapshot:
+    """Local SQLite snapshot of ClinicalTrials.gov studies, indexed by intervention name and synonyms."""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        """Initialize the snapshot, creating the database on first use."""
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS studies (
+                    nct_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    phase TEXT,
+                    enrollment INTEGER,
+                    status TEXT,
+                    summary TEXT,
+                    population TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS interventions (
+                    name TEXT NOT NULL,
+                    nct_id TEXT NOT NULL,
+                    PRIMARY KEY (name, nct_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _connection(self):
+        """Return this thread's connection; SQLite connections cannot be shared across threads."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def count(self):
+        """Return the number of stored studies."""
+        return self._connection().execute("SELECT COUNT(*) FROM studies").fetchone()[0]
+
+    @property
+    def has_studies(self):
+        """True if any study has been ingested; checked on every call, so later ingests count."""
+        return self._connection().execute("SELECT EXISTS (SELECT 1 FROM studies)").fetchone()[0] == 1
+
+    def ingest(self, path):
+        """Load a ClinicalTrials.gov JSON export into the snapshot; return the number of studies."""
+        total = 0
+        batch = []
+        for study in iter_studies(path):
+            batch.append(summarize_study(study))
+            if len(batch) >= BATCH_SIZE:
+                total += self._store_batch(batch)
+                batch = []
+        if batch:
+            total += self._store_batch(batch)
+        return total
+
+    def _store_batch(self, records):
+        """Write a batch of summarized studies, replacing earlier versions of the same study."""
+        with self._connection() as conn:
+            conn.executemany("DELETE FROM interventions WHERE nct_id = ?", [(r["nct_id"],) for r in records])
+            conn.executemany(
+                "INSERT OR REPLACE INTO studies VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(r["nct_id"], r["title"], r["phase"], r["enrollment"], r["status"], r["summary"], r["population"])
+                 for r in records]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO interventions VALUES (?, ?)",
+                [(name, r["nct_id"]) for r in records for name in r["interventions"]]
+            )
+        return len(records)
+
+    def find_trials(self, names, limit=10):
+        """
+        Return (total, studies) for trials of any of the given intervention names.
+        Total counts every matching study; studies holds up to limit of them, largest enrollment first.
+        """
+        names = sorted(set(normalize_name(name) for name in names))
+        placeholders = ",".join("?" * len(names))
+        conn = self._connection()
+        total = conn.execute(
+            f"SELECT COUNT(DISTINCT nct_id) FROM interventions WHERE name IN ({placeholders})", names
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT nct_id, title, phase, enrollment, status, summary, population FROM studies "
+            f"WHERE nct_id IN (SELECT nct_id FROM interventions WHERE name IN ({placeholders})) "
+            f"ORDER BY enrollment DESC LIMIT ?",
+            names + [limit]
+        ).fetchall()
+        studies = [
+            {"nct_id": row[0], "title": row[1], "phase": row[2], "enrollment": row[3], "status": row[4],
+             "summary": row[5], "population": row[6]}
+            for row in rows
+        ]
+        return total, studies
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def get_trials_snapshot():
+    """Return the process-wide trials snapshot, or None if it has not been ingested."""
+    global _snapshot
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                if not os.path.exists(SNAPSHOT_PATH):
+                    return None
+                try:
+                    _snapshot = TrialsSnapshot()
+                except sqlite3.Error as e:
+                    print(f"Trials snapshot unavailable: {str(e)}")
+                    _snapshot = False
+    return _snapshot or None
+
+
+def main(argv=None):
+    """Command line entry point: `python trials_snapshot.py ingest ctg-studies.json.zip`."""
+    parser = argparse.ArgumentParser(description="Build a local ClinicalTrials.gov snapshot from a JSON export.")
+    parser.add_argument("--db", default=SNAPSHOT_PATH, help="Path of the snapshot database")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="Ingest ClinicalTrials.gov JSON exports")
+    ingest_parser.add_argument("paths", nargs="+", help="Zipped per-study JSON files or a studies .json file")
+
+    lookup_parser = commands.add_parser("lookup", help="List trials for an intervention name")
+    lookup_parser.add_argument("name")
+    lookup_parser.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    snapshot = TrialsSnapshot(args.db)
+
+    if args.command == "ingest":
+        for path in args.paths:
+            print(f"Ingesting {path}...")
+            print(f"  {snapshot.ingest(path)} studies")
+        print(f"Snapshot now holds {snapshot.count()} studies")
+    elif args.command == "lookup":
+        total, studies = snapshot.find_trials([args.name], args.limit)
+        print(f"{total} trials")
+        for study in studies:
+            print(f"{study['nct_id']} [{study['phase']}, {study['status']}, n={study['enrollment']}] {study['title']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import bisect
+import threading
+
+from synonym_index import BUILTIN_SYNONYMS, get_synonym_index, normalize_name
+
+# Largest edit distance corrected, and only the first PREFIX_LENGTH characters of a word are used for
+# delete keys; both bound the size of the spelling index as in SymSpell
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+# Words up to this length are only corrected at edit distance 1, so short names are not mangled
+SHORT_WORD_LENGTH = 5
+
+
+def _deletes(word, max_distance):
+    """Return every string obtained by deleting up to max_distance characters from word."""
+    deletes = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        deletes |= frontier
+    return deletes
+
+
+def edit_distance(a, b, max_distance):
+    """Return the Damerau-Levenshtein (optimal string alignment) distance, or max_distance + 1 if it is larger."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+
+class Typeahead:
+    """In-memory prefix completion and spelling correction over a drug name vocabulary."""
+
+    def __init__(self, words, max_distance=MAX_EDIT_DISTANCE, prefix_length=PREFIX_LENGTH):
+        """Build the prefix array and the symmetric-delete spelling index for the given words."""
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.words = sorted(set(normalize_name(word) for word in words if word))
+        self._known = set(self.words)
+
+        # Map each delete of a word's prefix to the words that produce it
+        self._delete_index = {}
+        for word in self.words:
+            for delete in _deletes(word[:prefix_length], max_distance):
+                self._delete_index.setdefault(delete, []).append(word)
+
+    def is_known(self, name):
+        """Return True if the name is in the vocabulary."""
+        return normalize_name(name) in self._known
+
+    def complete(self, prefix, limit=8):
+        """Return up to limit vocabulary words starting with prefix, shortest first."""
+        prefix = normalize_name(prefix)
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self.words, prefix)
+        end = bisect.bisect_left(self.words, prefix + "\uffff", start)
+        # Cap the scan so a one-letter prefix over a large vocabulary stays fast
+        matches = self.words[start:min(end, start + limit * 50)]
+        return sorted(matches, key=lambda word: (len(word), word))[:limit]
+
+    def suggest(self, name, limit=5):
+        """Return vocabulary words within edit distance of name, closest first."""
+        name = normalize_name(name)
+        max_distance = 1 if len(name) <= SHORT_WORD_LENGTH else self.max_distance
+
+        # Symmetric delete: candidates share a delete with the input's prefix
+        candidates = set()
+        for delete in _deletes(name[:self.prefix_length], max_distance):
+            candidates.update(self._delete_index.get(delete, ()))
+
+        scored = []
+        for candidate in candidates:
+            distance = edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                scored.append((distance, abs(len(candidate) - len(name)), candidate))
+        return [candidate for _, _, candidate in sorted(scored)[:limit]]
+
+    def correct(self, name):
+        """Return the name itself if known, else its single closest vocabulary word, or None."""
+        if self.is_known(name):
+            return normalize_name(name)
+        suggestions = self.suggest(name, limit=1)
+        return suggestions[0] if suggestions else None
+
+
+_typeahead = None
+_typeahead_lock = threading.Lock()
+
+
+def get_typeahead():
+    """Return the process-wide typeahead over the synonym index and built-in synonyms, built on first use."""
+    global _typeahead
+    if _typeahead is None:
+        with _typeahead_lock:
+            if _typeahead is None:
+                words = set(BUILTIN_SYNONYMS) | set(BUILTIN_SYNONYMS.values())
+                index = get_synonym_index()
+                if index is not None:
+                    words.update(index.names())
+                _typeahead = Typeahead(words)
+    return _typeahead
+
+
+_warm_thread = None
+_warm_lock = threading.Lock()
+
+
+def warm_typeahead():
+    """
+    Build the process-wide typeahead on a background thread so the first lookup does not wait for it.
+    Only the first call in the process starts a thread; Streamlit reruns the app script on every interaction.
+    """
+    global _warm_thread
+    with _warm_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=get_typeahead, name="typeahead-warmup", daemon=True)
+            _warm_thread.start()